@@ -0,0 +1,50 @@
+"""0005 full text search
+
+Revision ID: 2f8c5a91d0e4
+Revises: b7d41e29c6a3
+Create Date: 2026-10-16 11:02:17.540918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '2f8c5a91d0e4'
+down_revision: Union[str, None] = 'b7d41e29c6a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (tabla, columna, expresión, índice GIN). Las tablas las crea create_all al arrancar, así que pueden no existir aún.
+SEARCH_COLUMNS = (
+    (
+        'document', 'search_vector',
+        "setweight(to_tsvector('spanish', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('spanish', coalesce(content, '')), 'B')",
+        'ix_document_search',
+    ),
+    (
+        'recording', 'transcript_vector',
+        "setweight(to_tsvector('spanish', coalesce(transcript_text, '')), 'A')",
+        'ix_recording_transcript_search',
+    ),
+)
+
+
+def upgrade() -> None:
+    tables = set(sa.inspect(op.get_bind()).get_table_names())
+    for table, column, expression, index in SEARCH_COLUMNS:
+        if table not in tables:
+            continue
+        op.execute(
+            f'ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column} tsvector '
+            f'GENERATED ALWAYS AS ({expression}) STORED'
+        )
+        op.execute(f'CREATE INDEX IF NOT EXISTS {index} ON {table} USING gin ({column})')
+
+
+def downgrade() -> None:
+    for table, column, _, index in reversed(SEARCH_COLUMNS):
+        op.execute(f'DROP INDEX IF EXISTS {index}')
+        op.execute(f'ALTER TABLE IF EXISTS {table} DROP COLUMN IF EXISTS {column}')
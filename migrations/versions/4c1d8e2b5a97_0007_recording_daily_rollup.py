@@ -0,0 +1,48 @@
+"""0007 recording daily rollup
+
+Revision ID: 4c1d8e2b5a97
+Revises: 9a3e6b0c7f15
+Create Date: 2026-10-16 12:25:09.663120
+
+"""
+import os
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '4c1d8e2b5a97'
+down_revision: Union[str, None] = '9a3e6b0c7f15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+NO_USER_ID = '00000000-0000-0000-0000-000000000000'
+
+
+def upgrade() -> None:
+    op.create_table('recording_daily_rollup',
+    sa.Column('tenant_id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('status', sa.String(length=30), nullable=False),
+    sa.Column('recordings', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('duration_sum', sa.BigInteger(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenant.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('tenant_id', 'user_id', 'day', 'status'),
+    if_not_exists=True,
+    )
+
+    # Backfill desde `recording` (si ya existe; si no, la crea create_all vacía)
+    if 'recording' in sa.inspect(op.get_bind()).get_table_names():
+        op.execute(sa.text(
+            "INSERT INTO recording_daily_rollup (tenant_id, user_id, day, status, recordings, duration_sum) "
+            "SELECT tenant_id, coalesce(user_id, CAST(:no_user AS uuid)), "
+            "CAST(timezone(:tz, created_at) AS date), status, count(*), coalesce(sum(duration_sec), 0) "
+            "FROM recording GROUP BY 1, 2, 3, 4 "
+            "ON CONFLICT DO NOTHING"
+        ).bindparams(no_user=NO_USER_ID, tz=os.getenv('DASHBOARD_TZ', 'UTC')))
+
+
+def downgrade() -> None:
+    op.drop_table('recording_daily_rollup')
@@ -0,0 +1,41 @@
+"""0010 llm response cache
+
+Revision ID: 7f2c4e9a1d36
+Revises: d3a91f6c2b48
+Create Date: 2026-10-16 16:40:12.507921
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '7f2c4e9a1d36'
+down_revision: Union[str, None] = 'd3a91f6c2b48'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('llm_response_cache',
+    sa.Column('key', sa.String(length=64), nullable=False),
+    sa.Column('model', sa.String(length=120), nullable=False),
+    sa.Column('prompt_version', sa.String(length=40), nullable=False),
+    sa.Column('response', sa.Text(), nullable=False),
+    sa.Column('hits', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('created_at', postgresql.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('last_hit_at', postgresql.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('expires_at', postgresql.TIMESTAMP(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('key'),
+    if_not_exists=True,
+    )
+    op.create_index('ix_llm_response_cache_expires', 'llm_response_cache', ['expires_at'], unique=False,
+                    if_not_exists=True)
+    op.create_index('ix_llm_response_cache_last_hit', 'llm_response_cache', ['last_hit_at'], unique=False,
+                    if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_table('llm_response_cache')
@@ -0,0 +1,51 @@
+"""0006 trigram search indexes
+
+Revision ID: 9a3e6b0c7f15
+Revises: 2f8c5a91d0e4
+Create Date: 2026-10-16 11:40:52.107336
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '9a3e6b0c7f15'
+down_revision: Union[str, None] = '2f8c5a91d0e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (tabla, índice, columna trigram). GIN compuesto (tenant_id, columna): btree_gin para el uuid.
+# `patient` la crea create_all al arrancar, así que puede no existir aún.
+# Se crean/borran CONCURRENTLY (fuera de la transacción de la migración): con tenants de
+# ~1M pacientes el build tarda minutos y un CREATE INDEX normal bloquearía las escrituras.
+# Si un build concurrente falla deja el índice INVALID: borrarlo y repetir la migración.
+INDEXES = (
+    ('patient', 'ix_patient_name_trgm', 'full_name'),
+    ('patient', 'ix_patient_identifier_trgm', 'identifier'),
+    ('app_user', 'ix_user_email_trgm', 'email'),
+    ('app_user', 'ix_user_name_trgm', 'full_name'),
+)
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm;')
+    op.execute('CREATE EXTENSION IF NOT EXISTS btree_gin;')
+
+    tables = set(sa.inspect(op.get_bind()).get_table_names())
+    with op.get_context().autocommit_block():
+        for table, name, column in INDEXES:
+            if table in tables:
+                op.create_index(
+                    name, table, ['tenant_id', column], unique=False, if_not_exists=True,
+                    postgresql_using='gin', postgresql_ops={column: 'gin_trgm_ops'},
+                    postgresql_concurrently=True,
+                )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for table, name, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
+    # Las extensiones se dejan instaladas: otras bases/índices pueden depender de ellas
@@ -0,0 +1,35 @@
+"""0004 keyset pagination indexes
+
+Revision ID: b7d41e29c6a3
+Revises: 964e9f16af0e
+Create Date: 2026-10-16 10:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d41e29c6a3'
+down_revision: Union[str, None] = '964e9f16af0e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (tabla, índice, columnas). `document` la crea create_all al arrancar, así que puede no existir aún.
+INDEXES = (
+    ('app_user', 'ix_user_tenant_created', ['tenant_id', 'created_at', 'id']),
+    ('document', 'ix_document_tenant_created', ['tenant_id', 'created_at', 'id']),
+)
+
+
+def upgrade() -> None:
+    tables = set(sa.inspect(op.get_bind()).get_table_names())
+    for table, name, columns in INDEXES:
+        if table in tables:
+            op.create_index(name, table, columns, unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    for table, name, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,59 @@
+"""0011 rollup user delete trigger
+
+Revision ID: c84f1e6b9d20
+Revises: 7f2c4e9a1d36
+Create Date: 2026-10-16 23:10:41.318604
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'c84f1e6b9d20'
+down_revision: Union[str, None] = '7f2c4e9a1d36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+NO_USER_ID = '00000000-0000-0000-0000-000000000000'
+
+# Al borrar un usuario, recording.user_id pasa a NULL (ON DELETE SET NULL) y los deltas
+# siguientes van a la fila NO_USER_ID: sus filas del rollup se mueven ahí en la misma
+# transacción que el DELETE. Si es el borrado en cascada de su tenant no hay nada que
+# mover (las filas del rollup también se borran).
+FORGET_USER_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION recording_rollup_forget_user() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM tenant WHERE id = OLD.tenant_id) THEN
+        RETURN OLD;
+    END IF;
+
+    INSERT INTO recording_daily_rollup AS r (tenant_id, user_id, day, status, recordings, duration_sum)
+    SELECT tenant_id, '{NO_USER_ID}'::uuid, day, status, recordings, duration_sum
+    FROM recording_daily_rollup
+    WHERE tenant_id = OLD.tenant_id AND user_id = OLD.id
+    ORDER BY day, status
+    ON CONFLICT (tenant_id, user_id, day, status) DO UPDATE
+        SET recordings = r.recordings + EXCLUDED.recordings,
+            duration_sum = r.duration_sum + EXCLUDED.duration_sum;
+
+    DELETE FROM recording_daily_rollup WHERE tenant_id = OLD.tenant_id AND user_id = OLD.id;
+    RETURN OLD;
+END;
+$$;
+"""
+
+
+def upgrade() -> None:
+    op.execute(FORGET_USER_FUNCTION)
+    op.execute('DROP TRIGGER IF EXISTS trg_app_user_rollup_forget ON app_user;')
+    op.execute(
+        'CREATE TRIGGER trg_app_user_rollup_forget BEFORE DELETE ON app_user '
+        'FOR EACH ROW EXECUTE FUNCTION recording_rollup_forget_user();'
+    )
+
+
+def downgrade() -> None:
+    op.execute('DROP TRIGGER IF EXISTS trg_app_user_rollup_forget ON app_user;')
+    op.execute('DROP FUNCTION IF EXISTS recording_rollup_forget_user();')
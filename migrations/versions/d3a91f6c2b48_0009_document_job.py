@@ -0,0 +1,60 @@
+"""0009 document generation jobs
+
+Revision ID: d3a91f6c2b48
+Revises: e5b2f7a4c813
+Create Date: 2026-10-16 15:02:41.218334
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3a91f6c2b48'
+down_revision: Union[str, None] = 'e5b2f7a4c813'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PENDING = sa.text("status IN ('queued', 'running')")
+
+
+def upgrade() -> None:
+    # recording/document los crea create_all; si aún no existen, create_all creará también esta tabla
+    tables = set(sa.inspect(op.get_bind()).get_table_names())
+    if not {'recording', 'document'} <= tables or 'document_job' in tables:
+        return
+
+    op.create_table('document_job',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('tenant_id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=True),
+    sa.Column('recording_id', sa.UUID(), nullable=False),
+    sa.Column('document_type', postgresql.ENUM(name='document_type_enum', create_type=False), nullable=False),
+    sa.Column('transcript', sa.Text(), nullable=False),
+    sa.Column('clinical_meta', postgresql.JSONB(astext_type=sa.Text()), server_default='{}', nullable=False),
+    sa.Column('status', sa.String(length=20), server_default='queued', nullable=False),
+    sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('document_id', sa.UUID(), nullable=True),
+    sa.Column('error_message', sa.Text(), nullable=True),
+    sa.Column('created_at', postgresql.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', postgresql.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('started_at', postgresql.TIMESTAMP(timezone=True), nullable=True),
+    sa.Column('finished_at', postgresql.TIMESTAMP(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenant.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['app_user.id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['recording_id'], ['recording.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['document_id'], ['document.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('id'),
+    )
+    op.create_index('ix_document_job_tenant_created', 'document_job', ['tenant_id', 'created_at'], unique=False)
+    op.create_index('uq_document_job_active_recording', 'document_job', ['recording_id'], unique=True,
+                    postgresql_where=PENDING)
+    op.create_index('ix_document_job_pending', 'document_job', ['updated_at'], unique=False,
+                    postgresql_where=PENDING)
+
+
+def downgrade() -> None:
+    op.execute('DROP TABLE IF EXISTS document_job')
@@ -0,0 +1,30 @@
+"""0008 recording processing index
+
+Revision ID: e5b2f7a4c813
+Revises: 4c1d8e2b5a97
+Create Date: 2026-10-16 13:18:44.205771
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b2f7a4c813'
+down_revision: Union[str, None] = '4c1d8e2b5a97'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # `recording` la crea create_all al arrancar, así que puede no existir aún
+    if 'recording' in sa.inspect(op.get_bind()).get_table_names():
+        op.create_index(
+            'ix_recording_processing', 'recording', ['updated_at'], unique=False, if_not_exists=True,
+            postgresql_where=sa.text("status = 'processing'"),
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_recording_processing', table_name='recording', if_exists=True)
@@ -0,0 +1,178 @@
+"""
+Benchmark de GET /dashboard/metrics: 6 consultas sobre `recording` vs rollup.
+
+Crea (una vez) el tenant `bench-dashboard` con N recordings sintéticos repartidos
+en 90 días y estados, reconstruye su recording_daily_rollup y mide con asyncpg:
+  - legacy: las 6 consultas count/sum sobre `recording` que hacía antes
+    get_dashboard_metrics (cast(created_at, Date) por fila);
+  - rollup: AsyncRecordingRepository.dashboard_counts (una consulta con FILTER
+    sobre recording_daily_rollup), la que usa hoy el endpoint.
+Muestra p50/p95/p99, media y consultas por carga del dashboard.
+
+Uso (contra una base de pruebas, con la misma configuración .env que la app):
+    python -m scripts.bench_dashboard_metrics [--recordings 1000000] [--runs 50] [--cleanup]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import Date, cast, event, func, select, text
+
+from src.apps.recordings import rollup
+from src.apps.recordings.models import Recording
+from src.apps.recordings.repository import AsyncRecordingRepository
+from src.core.connections.database import get_async_data_access_layer, get_data_access_layer
+
+TENANT_CODE = "bench-dashboard"
+SEED_BATCH = 100_000
+
+# Mayoría completados, como en producción; el resto reparte pendientes y fallidos
+STATUSES = ("completed",) * 7 + ("uploaded", "processing", "failed")
+
+SEED_SQL = f"""
+INSERT INTO recording (id, tenant_id, bucket, key, content_type, duration_sec, status, created_at, updated_at)
+SELECT gen_random_uuid(), :tenant_id, 'bench', 'bench/' || g || '.wav', 'audio/wav', 30 + g % 600,
+       (ARRAY[{",".join(f"'{s}'" for s in STATUSES)}])[1 + g % {len(STATUSES)}],
+       now() - make_interval(days => g % 90, secs => g % 86400),
+       now()
+FROM generate_series(:start, :stop) AS g
+"""
+
+
+def seed(recordings: int):
+    with get_data_access_layer().session_scope() as db:
+        tenant_id = db.execute(text(
+            "INSERT INTO tenant (id, code, name) VALUES (gen_random_uuid(), :code, 'Benchmark dashboard') "
+            "ON CONFLICT (code) DO UPDATE SET name = EXCLUDED.name RETURNING id"
+        ), {"code": TENANT_CODE}).scalar_one()
+        existing = db.execute(
+            text("SELECT count(*) FROM recording WHERE tenant_id = :t"), {"t": tenant_id}
+        ).scalar_one()
+
+    for start in range(existing + 1, recordings + 1, SEED_BATCH):
+        stop = min(start + SEED_BATCH - 1, recordings)
+        with get_data_access_layer().session_scope() as db:
+            db.execute(text(SEED_SQL), {"tenant_id": tenant_id, "start": start, "stop": stop})
+        print(f"seeded {stop:,}/{recordings:,}")
+
+    with get_data_access_layer().session_scope() as db:
+        rows = rollup.rebuild(db, tenant_id)
+        db.execute(text("ANALYZE recording"))
+        db.execute(text("ANALYZE recording_daily_rollup"))
+    print(f"rollup: {rows:,} filas")
+    return tenant_id
+
+
+async def legacy_counts(db, tenant_id, user_id=None) -> tuple:
+    """Las 6 consultas de get_dashboard_metrics antes del rollup, tal cual."""
+    completed = select(func.count(Recording.id)).where(
+        Recording.tenant_id == tenant_id, Recording.status == "completed"
+    )
+    total = select(func.count(Recording.id)).where(Recording.tenant_id == tenant_id)
+    if user_id:
+        completed = completed.where(Recording.user_id == user_id)
+        total = total.where(Recording.user_id == user_id)
+
+    today = datetime.now().date()
+    thirty_days_ago = datetime.now() - timedelta(days=30)
+    sixty_days_ago = datetime.now() - timedelta(days=60)
+
+    today_documents = (await db.execute(
+        completed.where(cast(Recording.created_at, Date) == today)
+    )).scalar_one()
+    processed_total = (await db.execute(total)).scalar_one()
+    pending = (await db.execute(
+        total.where(Recording.status.in_(["uploaded", "processing"]))
+    )).scalar_one()
+    time_saved_sec = (await db.execute(
+        select(func.coalesce(func.sum(Recording.duration_sec), 0))
+        .where(Recording.tenant_id == tenant_id, Recording.status == "completed")
+    )).scalar_one()
+    last_30_days = (await db.execute(
+        select(func.count(Recording.id)).where(
+            Recording.tenant_id == tenant_id,
+            Recording.status == "completed",
+            Recording.created_at >= thirty_days_ago,
+        )
+    )).scalar_one()
+    previous_30_days = (await db.execute(
+        select(func.count(Recording.id)).where(
+            Recording.tenant_id == tenant_id,
+            Recording.status == "completed",
+            Recording.created_at >= sixty_days_ago,
+            Recording.created_at < thirty_days_ago,
+        )
+    )).scalar_one()
+    return today_documents, processed_total, pending, time_saved_sec, last_30_days, previous_30_days
+
+
+async def rollup_counts(db, tenant_id, user_id=None) -> tuple:
+    today = datetime.now(rollup.dashboard_tz()).date()
+    return tuple(await AsyncRecordingRepository.dashboard_counts(db, tenant_id, user_id, today=today))
+
+
+PATHS = {"legacy": legacy_counts, "rollup": rollup_counts}
+
+
+async def measure(tenant_id, runs: int):
+    dal = get_async_data_access_layer()
+    statements = 0
+
+    def count_statement(*_):
+        nonlocal statements
+        statements += 1
+
+    event.listen(dal.engine.sync_engine, "before_cursor_execute", count_statement)
+    results = {}
+    try:
+        async with dal.session_scope() as db:
+            for name, path in PATHS.items():
+                sample = await path(db, tenant_id)  # calienta cache/plan
+                statements = 0
+                timings = []
+                for _ in range(runs):
+                    started = time.perf_counter()
+                    await path(db, tenant_id)
+                    timings.append((time.perf_counter() - started) * 1000)
+                results[name] = (sorted(timings), statements / runs, sample)
+    finally:
+        event.remove(dal.engine.sync_engine, "before_cursor_execute", count_statement)
+        await dal.close_session()
+    return results
+
+
+def percentile(values, p: float) -> float:
+    return values[min(len(values) - 1, int(round(p * (len(values) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--recordings", type=int, default=1_000_000)
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--cleanup", action="store_true", help="borrar el tenant de benchmark y salir")
+    args = parser.parse_args()
+
+    if args.cleanup:
+        with get_data_access_layer().session_scope() as db:
+            db.execute(text("DELETE FROM tenant WHERE code = :code"), {"code": TENANT_CODE})
+        print("benchmark tenant deleted")
+        return
+
+    tenant_id = seed(args.recordings)
+    results = asyncio.run(measure(tenant_id, args.runs))
+
+    print(f"\n{'path':<10}{'queries':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'mean ms':>9}")
+    for name, (timings, queries, _) in results.items():
+        print(f"{name:<10}{queries:>9.0f}{percentile(timings, .5):>9.2f}{percentile(timings, .95):>9.2f}"
+              f"{percentile(timings, .99):>9.2f}{statistics.fmean(timings):>9.2f}")
+
+    # Mismos números salvo "hoy" y los bordes de las ventanas: el legacy usa la
+    # hora local del servidor e instantes, el rollup días completos en DASHBOARD_TZ
+    for name, (_, _, sample) in results.items():
+        print(f"{name:<10}{sample}")
+
+
+if __name__ == "__main__":
+    main()
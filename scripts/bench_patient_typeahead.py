@@ -0,0 +1,133 @@
+"""
+Benchmark de GET /patients/typeahead sobre un tenant de ~1M pacientes.
+
+Crea (una vez) el tenant `bench-typeahead` con N pacientes sintéticos, ejecuta la
+misma consulta que el endpoint (AsyncPatientRepository.typeahead, asyncpg) para
+varios términos y muestra p50/p95/p99 y el EXPLAIN ANALYZE de cada término.
+Objetivo: p95 < 20 ms con los índices trigram de la migración 0006.
+
+Uso (contra una base de pruebas, con la misma configuración .env que la app):
+    python -m scripts.bench_patient_typeahead [--patients 1000000] [--runs 50] [--cleanup]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+
+from src.apps.patients.repository import AsyncPatientRepository, _typeahead_stmt
+from src.core.connections.database import get_async_data_access_layer, get_data_access_layer
+
+TENANT_CODE = "bench-typeahead"
+SEED_BATCH = 100_000
+
+# Lo que teclea recepción: prefijos, nombre + apellido, errores de tipeo, identificadores
+TERMS = ("mar", "maria", "maria gonz", "gonzales", "rodrigez", "fernan", "00001", "0004271")
+
+FIRST_NAMES = (
+    "Maria", "Jose", "Juan", "Ana", "Luis", "Carmen", "Carlos", "Laura", "Jorge", "Lucia",
+    "Pedro", "Marta", "Miguel", "Sofia", "Javier", "Elena", "Diego", "Paula", "Andres", "Isabel",
+    "Fernando", "Rosa", "Manuel", "Teresa", "Antonio", "Valentina", "Ricardo", "Camila", "Sergio", "Daniela",
+)
+SURNAMES = (
+    "Gonzalez", "Rodriguez", "Gomez", "Fernandez", "Lopez", "Diaz", "Martinez", "Perez", "Garcia", "Sanchez",
+    "Romero", "Sosa", "Torres", "Alvarez", "Ruiz", "Ramirez", "Flores", "Acosta", "Benitez", "Medina",
+    "Herrera", "Suarez", "Aguirre", "Gimenez", "Gutierrez", "Pereyra", "Rojas", "Molina", "Castro", "Ortiz",
+    "Silva", "Nunez", "Luna", "Juarez", "Cabrera", "Rios", "Morales", "Godoy", "Moreno", "Ferreyra",
+)
+
+
+def _pg_array(values) -> str:
+    return "ARRAY[" + ",".join(f"'{v}'" for v in values) + "]"
+
+
+SEED_SQL = f"""
+INSERT INTO patient (id, tenant_id, identifier, full_name, is_active, meta)
+SELECT gen_random_uuid(), :tenant_id, lpad(g::text, 10, '0'),
+       ({_pg_array(FIRST_NAMES)})[1 + (g * 7) % {len(FIRST_NAMES)}] || ' ' ||
+       ({_pg_array(SURNAMES)})[1 + (g * 13) % {len(SURNAMES)}] || ' ' ||
+       ({_pg_array(SURNAMES)})[1 + (g / {len(SURNAMES)}) % {len(SURNAMES)}],
+       g % 20 <> 0, '{{}}'
+FROM generate_series(:start, :stop) AS g
+"""
+
+
+def seed(patients: int):
+    with get_data_access_layer().session_scope() as db:
+        tenant_id = db.execute(text(
+            "INSERT INTO tenant (id, code, name) VALUES (gen_random_uuid(), :code, 'Benchmark typeahead') "
+            "ON CONFLICT (code) DO UPDATE SET name = EXCLUDED.name RETURNING id"
+        ), {"code": TENANT_CODE}).scalar_one()
+        existing = db.execute(
+            text("SELECT count(*) FROM patient WHERE tenant_id = :t"), {"t": tenant_id}
+        ).scalar_one()
+
+    for start in range(existing + 1, patients + 1, SEED_BATCH):
+        stop = min(start + SEED_BATCH - 1, patients)
+        with get_data_access_layer().session_scope() as db:
+            db.execute(text(SEED_SQL), {"tenant_id": tenant_id, "start": start, "stop": stop})
+        print(f"seeded {stop:,}/{patients:,}")
+
+    with get_data_access_layer().session_scope() as db:
+        db.execute(text("ANALYZE patient"))
+    return tenant_id
+
+
+def explain(tenant_id, term: str) -> str:
+    compiled = _typeahead_stmt(tenant_id, term).compile(dialect=postgresql.psycopg2.dialect())
+    with get_data_access_layer().session_scope() as db:
+        rows = db.connection().exec_driver_sql(
+            "EXPLAIN (ANALYZE, BUFFERS) " + str(compiled), compiled.params
+        ).all()
+    return "\n".join(r[0] for r in rows)
+
+
+async def measure(tenant_id, runs: int):
+    dal = get_async_data_access_layer()
+    results = {}
+    async with dal.session_scope() as db:
+        for term in TERMS:
+            await AsyncPatientRepository.typeahead(db, tenant_id, term)  # calienta cache/plan
+            timings = []
+            for _ in range(runs):
+                started = time.perf_counter()
+                await AsyncPatientRepository.typeahead(db, tenant_id, term)
+                timings.append((time.perf_counter() - started) * 1000)
+            results[term] = sorted(timings)
+    await dal.close_session()
+    return results
+
+
+def percentile(values, p: float) -> float:
+    return values[min(len(values) - 1, int(round(p * (len(values) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--patients", type=int, default=1_000_000)
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--cleanup", action="store_true", help="borrar el tenant de benchmark y salir")
+    args = parser.parse_args()
+
+    if args.cleanup:
+        with get_data_access_layer().session_scope() as db:
+            db.execute(text("DELETE FROM tenant WHERE code = :code"), {"code": TENANT_CODE})
+        print("benchmark tenant deleted")
+        return
+
+    tenant_id = seed(args.patients)
+    results = asyncio.run(measure(tenant_id, args.runs))
+
+    print(f"\n{'term':<14}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'mean ms':>9}")
+    for term, timings in results.items():
+        print(f"{term:<14}{percentile(timings, .5):>9.2f}{percentile(timings, .95):>9.2f}"
+              f"{percentile(timings, .99):>9.2f}{statistics.fmean(timings):>9.2f}")
+
+    for term in TERMS:
+        print(f"\n--- EXPLAIN ANALYZE: {term!r}\n{explain(tenant_id, term)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,12 +6,19 @@ from starlette.middleware import Middleware
 from starlette.middleware.cors import CORSMiddleware
 from starlette_context.middleware import RawContextMiddleware
 from pydantic import ValidationError
-import asyncio
 import logging
 import time
+from functools import partial
 
 from src.core.config.app_config import config_by_name
-from src.core.connections.database import DataAccessLayer
+from src.core.config.config import env
+from src.core.connections.database import get_data_access_layer, get_async_data_access_layer
+from src.core.connections.aws import get_aws_clients
+from starlette.concurrency import run_in_threadpool
+from src.utils.loop_watchdog import LoopWatchdog
+from src.apps.recordings.reconciler import TranscriptionReconciler
+from src.apps.document.jobs import get_document_job_runner
+from src.apps.document.services.llm_service import get_default_llm_engine
 
 # -------------------------------------------------------------------
 #                         Rutas de dominio
@@ -27,6 +34,7 @@ from src.apps.dashboard.controller import router as dashboard_router
 from src.apps.document.controllers import router as document_controller
 from src.apps.patients.controller import router as patient_controller
 from src.apps.schedule.controller import router as schedule_controller
+from src.apps.monitoring.controller import router as monitoring_router
 
 # -------------------------------------------------------------------
 log = logging.getLogger("app")
@@ -41,13 +49,58 @@ async def on_startup(app: FastAPI) -> None:
     dal.create_tables()
     log.info("DB tables ensured.")
 
+    # Clientes AWS creados antes de la primera request (resolver credenciales es lento)
+    await run_in_threadpool(app.state.aws.warm_up, ("s3", "transcribe"))
+
+    if env.LOOP_WATCHDOG_THRESHOLD_MS > 0:
+        app.state.loop_watchdog = LoopWatchdog(
+            threshold_ms=env.LOOP_WATCHDOG_THRESHOLD_MS, interval_ms=env.LOOP_WATCHDOG_INTERVAL_MS
+        )
+        app.state.loop_watchdog.start()
+
+    # Red de seguridad del webhook de Transcribe
+    if env.TRANSCRIBE_RECONCILER_INTERVAL_SEC > 0:
+        app.state.transcription_reconciler = TranscriptionReconciler(
+            interval_sec=env.TRANSCRIBE_RECONCILER_INTERVAL_SEC,
+            grace_sec=env.TRANSCRIBE_RECONCILER_GRACE_SEC,
+            concurrency=env.TRANSCRIBE_RECONCILER_CONCURRENCY,
+            max_age_sec=env.TRANSCRIBE_RECONCILER_MAX_AGE_SEC,
+        )
+        app.state.transcription_reconciler.start()
+
+    # Motor LLM compartido (cliente Gemini con keep-alive); sin credenciales no impide el arranque
+    try:
+        app.state.llm_engine = await run_in_threadpool(get_default_llm_engine)
+    except Exception as e:
+        log.warning(f"LLM engine not initialized at startup: {e}")
+
+    # Generación de documentos en segundo plano (retoma los jobs pendientes)
+    if env.DOCUMENT_GENERATION_MODE == "async":
+        app.state.document_jobs = get_document_job_runner()
+        await run_in_threadpool(app.state.document_jobs.start)
+
 
 async def on_shutdown(app: FastAPI) -> None:
     """Cerrar conexiones al apagar."""
+    for task_name in ("transcription_reconciler", "loop_watchdog"):
+        task = getattr(app.state, task_name, None)
+        if task:
+            await task.stop()
+
+    document_jobs = getattr(app.state, "document_jobs", None)
+    if document_jobs:
+        document_jobs.stop()
+
     dal = app.state.db
     dal.close_session()
+    await app.state.async_db.close_session()
     log.info("DB session closed.")
 
+    app.state.aws.close()
+    llm_engine = getattr(app.state, "llm_engine", None)
+    if llm_engine:
+        llm_engine.close()
+
 
 # -------------------------------------------------------------------
 # Middleware solo-DEBUG para ver body y tiempos
@@ -98,12 +151,15 @@ def create_app(config_name: str) -> FastAPI:
     app = FastAPI(
         **cfg.dict(),  # title, description, version, debug, etc.
         middleware=[ctx_middleware],
-        on_startup=[lambda: asyncio.create_task(on_startup(app))],
-        on_shutdown=[lambda: asyncio.create_task(on_shutdown(app))],
     )
+    app.add_event_handler("startup", partial(on_startup, app))
+    app.add_event_handler("shutdown", partial(on_shutdown, app))
 
-    # DB
-    app.state.db = DataAccessLayer()
+    # DB: mismos pools que usan get_db / get_async_db (uno por proceso)
+    app.state.db = get_data_access_layer()
+    app.state.async_db = get_async_data_access_layer()
+    # AWS: clientes boto3 compartidos (StorageService / TranscriptionService)
+    app.state.aws = get_aws_clients()
 
     # CORS
     app.add_middleware(
@@ -112,7 +168,7 @@ def create_app(config_name: str) -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
-        expose_headers=["X-Total-Count"],
+        expose_headers=["X-Total-Count", "X-Total-Count-Type", "X-Next-Cursor"],
     )
 
     # Debug request/response (solo si LOG_LEVEL=DEBUG)
@@ -221,4 +277,11 @@ def create_app(config_name: str) -> FastAPI:
         tags=["Schedule"],
     )
 
+    # Métricas internas del proceso: solo owner/admin (expone pools, cachés y latencias)
+    app.include_router(
+        monitoring_router,
+        prefix="/api/v1",
+        tags=["Monitoring"],
+    )
+
     return app
@@ -1,7 +1,7 @@
 import os
 from fastapi import APIRouter, Depends, status
 from sqlalchemy.orm import Session
-from src.core.connections.deps import get_db, get_current_tenant, get_current_user
+from src.core.connections.deps import get_db, get_current_tenant, get_current_user, get_public_tenant
 from .schemas import LoginInput, TokenOut
 from src.apps.auth.services import AuthService
 from .repository import AuthRepository
@@ -14,7 +14,7 @@ def get_service() -> AuthService:
 
 
 @router.post("/login", response_model=TokenOut, status_code=status.HTTP_200_OK)
-def login(payload: LoginInput, db: Session = Depends(get_db), tenant=Depends(get_current_tenant)):
+def login(payload: LoginInput, db: Session = Depends(get_db), tenant=Depends(get_public_tenant)):
     svc = get_service()
     out = svc.login(db, tenant=tenant, email=payload.email, password=payload.password)
     # Asegura int:
@@ -24,8 +24,8 @@ def login(payload: LoginInput, db: Session = Depends(get_db), tenant=Depends(get
 
 @router.get("/me", summary="Usuario actual (token)", status_code=200)
 # CORRECCIÓN CLAVE: Inyectar 'tenant' como dependencia
-def me(user=Depends(get_current_user), tenant=Depends(get_current_tenant)):
-    # Devuelve algo compacto y útil
+async def me(user=Depends(get_current_user), tenant=Depends(get_current_tenant)):
+    # Devuelve algo compacto y útil: sale directo de los caches de principal/tenant, sin BD ni threadpool
     return {
         "id": str(user.id),
         "email": user.email,
@@ -37,7 +37,7 @@ def me(user=Depends(get_current_user), tenant=Depends(get_current_tenant)):
         "tenant_info": { # Incluir la metadata del Tenant
             "name": tenant.name,
             "code": tenant.code,
-            "meta": tenant.meta
+            "meta": dict(tenant.meta or {})
         }
     }
 
@@ -1,6 +1,8 @@
-from typing import Optional, Sequence
-from sqlalchemy import select
+from typing import Optional, Sequence, Tuple
+from sqlalchemy import select, and_
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.apps.tenant.models import Tenant
 from src.apps.users.models import User
 
 
@@ -19,3 +21,21 @@ class AuthRepository:
         db.refresh(user)
         return user
 
+
+class AsyncAuthRepository:
+    @staticmethod
+    async def get_tenant_and_user(
+            db: AsyncSession, tenant_code: str, user_id: str
+    ) -> Tuple[Optional[Tenant], Optional[User]]:
+        """
+        Tenant por code y usuario por id en una sola sentencia.
+        LEFT JOIN: si el usuario no existe o es de otro tenant, se devuelve (tenant, None).
+        """
+        row = (await db.execute(
+            select(Tenant, User)
+            .outerjoin(User, and_(User.tenant_id == Tenant.id, User.id == user_id))
+            .where(Tenant.code == tenant_code)
+        )).first()
+        if row is None:
+            return None, None
+        return row[0], row[1]
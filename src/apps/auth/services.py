@@ -4,6 +4,7 @@ from src.core.middlewares.security import verify_password, create_access_token
 from src.core.errors.errors import EntityNotFoundError
 from src.apps.auth.repository import AuthRepository
 from src.apps.users.repository import UserRepository
+from src.apps.users.cache import invalidate_principal
 from src.apps.tenant.models import Tenant
 
 
@@ -20,6 +21,7 @@ class AuthService:
             raise EntityNotFoundError("User", "email", email)
         if not verify_password(password, u.password_hash):
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+        invalidate_principal(db, u)  # last_login cambia
         self.repo.set_last_login(db, u)
         token = create_access_token({"sub": str(u.id), "tenant_id": str(tenant.id)})
         return {"access_token": token}
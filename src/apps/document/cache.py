@@ -0,0 +1,12 @@
+# src/apps/document/cache.py
+from src.core.config.config import env
+from src.utils.cache import SingleFlight, SnapshotCache
+
+# Primer nivel del cache de respuestas del LLM (el segundo es la tabla llm_response_cache).
+# Contenido direccionado por hash: nunca se invalida, solo expira (en memoria, como mucho 1 h).
+llm_response_cache: SnapshotCache[str] = SnapshotCache(
+    "llm_response", maxsize=env.LLM_CACHE_MEMORY_MAXSIZE, ttl=min(env.LLM_CACHE_TTL_SEC, 3600)
+)
+
+# Dos generaciones idénticas a la vez (doble clic, reintento) -> una sola llamada al LLM
+llm_response_flight = SingleFlight("llm_response")
@@ -1,17 +1,26 @@
-from typing import List
+import json
+import logging
+from typing import Iterator, List
 from fastapi import APIRouter, Depends, status, HTTPException, Query, Response, BackgroundTasks
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
-from src.core.connections.deps import get_db, get_current_tenant, get_current_user
+from src.core.connections.deps import get_db, get_async_db, get_read_db, get_current_tenant, get_current_user
 from src.core.middlewares.permissions import require_roles
+from src.utils.pagination import set_page_headers
+from src.utils.totals import COUNT_MODES
 from src.apps.recordings.services.recording_service import RecordingService
 from src.apps.recordings.dependencies import get_recording_service
 from src.core.errors.errors import EntityNotFoundError, ConflictError
 from src.apps.document.services.document_services import DocumentService
 from src.apps.document.dependencies import get_document_service # <-- Importamos la que tiene inyección
-from .schemas import DocumentGenerateIn, DocumentOut, DocumentContentUpdate
+from src.apps.document.jobs import get_document_job_runner
+from src.core.config.config import env
+from .schemas import DocumentGenerateIn, DocumentOut, DocumentContentUpdate, DocumentSearchHit, DocumentJobOut
 
 router = APIRouter(prefix="/documents", tags=["Documents"])
+logger = logging.getLogger(__name__)
 
 
 # ELIMINAMOS la función local get_document_service() antigua
@@ -21,13 +30,23 @@ router = APIRouter(prefix="/documents", tags=["Documents"])
 
 @router.post(
     "/generate",
-    response_model=DocumentOut,
-    status_code=status.HTTP_201_CREATED,
+    response_model=None,
+    status_code=status.HTTP_202_ACCEPTED,
     summary="Generar y guardar documento clínico desde una transcripción",
+    description=(
+        "Modo async (DOCUMENT_GENERATION_MODE=async): 202 con el job; consultar "
+        "GET /documents/jobs/{job_id} hasta `succeeded` (document_id) o `failed`. "
+        "Modo sync: 201 con el documento."
+    ),
+    responses={
+        status.HTTP_201_CREATED: {"model": DocumentOut},
+        status.HTTP_202_ACCEPTED: {"model": DocumentJobOut},
+    },
     dependencies=[Depends(require_roles("owner", "admin", "staff"))],
 )
 def generate_document(
         payload: DocumentGenerateIn,
+        response: Response,
         db: Session = Depends(get_db),
         tenant=Depends(get_current_tenant),
         user=Depends(get_current_user),
@@ -44,7 +63,20 @@ def generate_document(
             detail=f"Recording status is '{recording.status}', must be 'completed' to generate document."
         )
 
-    doc = doc_service.generate_and_save_document(
+    if env.DOCUMENT_GENERATION_MODE == "sync":
+        doc = doc_service.generate_and_save_document(
+            db,
+            tenant=tenant,
+            user=user,
+            recording=recording,
+            document_type=payload.document_type,
+            transcript=payload.transcript,
+            clinical_meta=payload.clinical_meta
+        )
+        response.status_code = status.HTTP_201_CREATED
+        return DocumentOut.model_validate(doc)
+
+    job = doc_service.enqueue_generation(
         db,
         tenant=tenant,
         user=user,
@@ -53,24 +85,134 @@ def generate_document(
         transcript=payload.transcript,
         clinical_meta=payload.clinical_meta
     )
-    return DocumentOut.model_validate(doc)
+    if job.status == "queued":
+        get_document_job_runner().submit_on_commit(db, job.id)
+    response.headers["Location"] = f"/api/v1/documents/jobs/{job.id}"
+    return DocumentJobOut.model_validate(job)
+
+
+def _sse(event: str, data: str) -> str:
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+@router.post(
+    "/generate/stream",
+    response_class=StreamingResponse,
+    summary="Generar documento clínico mostrando el texto a medida que se genera (SSE)",
+    description=(
+        "Respuesta `text/event-stream`: eventos `chunk` ({\"text\": ...}) con el Markdown "
+        "generado, luego `done` con el documento guardado, o `error` ({\"detail\": ...}). "
+        "Si el cliente se desconecta antes de `done` no se guarda nada."
+    ),
+    responses={status.HTTP_200_OK: {"content": {"text/event-stream": {}}}},
+    dependencies=[Depends(require_roles("owner", "admin", "staff"))],
+)
+def generate_document_stream(
+        payload: DocumentGenerateIn,
+        db: Session = Depends(get_db),
+        tenant=Depends(get_current_tenant),
+        user=Depends(get_current_user),
+        recording_service: RecordingService = Depends(get_recording_service),
+        doc_service: DocumentService = Depends(get_document_service),
+):
+    recording = recording_service.get(db, payload.recording_id)
+    if not recording or str(recording.tenant_id) != str(tenant.id):
+        raise EntityNotFoundError("Recording", "id", payload.recording_id)
+
+    if recording.status != "completed":
+        raise HTTPException(
+            status_code=409,
+            detail=f"Recording status is '{recording.status}', must be 'completed' to generate document."
+        )
+
+    # Las validaciones fallan como HTTP normal; después, los errores viajan como evento
+    events = doc_service.stream_generation(
+        db,
+        tenant=tenant,
+        user=user,
+        recording=recording,
+        document_type=payload.document_type,
+        transcript=payload.transcript,
+        clinical_meta=payload.clinical_meta
+    )
+
+    # Iterador síncrono: Starlette lo consume en el threadpool. `db` ya está cerrado
+    # cuando empieza (FastAPI cierra las dependencias antes de enviar el cuerpo).
+    def body() -> Iterator[str]:
+        try:
+            for kind, value in events:
+                if kind == "chunk":
+                    yield _sse("chunk", json.dumps({"text": value}, ensure_ascii=False))
+                else:
+                    yield _sse("done", DocumentOut.model_validate(value).model_dump_json())
+        except HTTPException as e:
+            yield _sse("error", json.dumps({"detail": e.detail}, ensure_ascii=False))
+        except Exception:
+            logger.exception("Streaming document generation failed")
+            yield _sse("error", json.dumps({"detail": "Internal error while generating the document."}))
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        # Sin cache ni buffering del proxy (nginx): cada fragmento llega en cuanto se genera
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get(
+    "/jobs/{job_id}",
+    response_model=DocumentJobOut,
+    summary="Estado de una generación de documento en segundo plano",
+    dependencies=[Depends(require_roles("owner", "admin", "staff", "viewer"))],
+)
+async def get_document_job(
+        job_id: UUID,
+        db: AsyncSession = Depends(get_async_db),
+        tenant=Depends(get_current_tenant),
+        doc_service: DocumentService = Depends(get_document_service),
+):
+    job = await doc_service.get_job(db, str(job_id))
+    if not job or str(job.tenant_id) != str(tenant.id):
+        raise EntityNotFoundError("DocumentJob", "id", job_id)
+    return DocumentJobOut.model_validate(job)
 
 
 # [El resto de las rutas GET/PUT/POST en este archivo usan doc_service = Depends(get_document_service) y se mantienen intactas]
 
+@router.get(
+    "/search",
+    response_model=List[DocumentSearchHit],
+    summary="Buscar documentos por texto completo (ordenado por relevancia)",
+    dependencies=[Depends(require_roles("owner", "admin", "staff", "viewer"))],
+)
+async def search_documents(
+        db: AsyncSession = Depends(get_read_db),
+        tenant=Depends(get_current_tenant),
+        q: str = Query(..., min_length=1, description='Palabras, "frase exacta", OR, -excluir'),
+        document_type: str | None = Query(None, description="Filtrar por tipo de documento"),
+        page: int = Query(1, ge=1),
+        page_size: int = Query(20, ge=1, le=50),
+        doc_service: DocumentService = Depends(get_document_service),
+):
+    rows = await doc_service.search_documents(
+        db, str(tenant.id), q, document_type=document_type, page=page, page_size=page_size
+    )
+    return [DocumentSearchHit.model_validate(x) for x in rows]
+
+
 @router.get(
     "/{document_id}",
     response_model=DocumentOut,
     summary="Obtener documento clínico por ID",
     dependencies=[Depends(require_roles("owner", "admin", "staff", "viewer"))],
 )
-def get_document(
+async def get_document(
         document_id: UUID,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_read_db),
         tenant=Depends(get_current_tenant),
         doc_service: DocumentService = Depends(get_document_service),
 ):
-    doc = doc_service.get_by_id(db, str(document_id))
+    doc = await doc_service.get_by_id(db, str(document_id))
     if not doc or str(doc.tenant_id) != str(tenant.id):
         raise EntityNotFoundError("Document", "id", document_id)
     return DocumentOut.model_validate(doc)
@@ -82,26 +224,30 @@ def get_document(
     summary="Listar documentos clínicos del tenant (para Reportes)",
     dependencies=[Depends(require_roles("owner", "admin", "staff", "viewer"))],
 )
-def list_documents(
+async def list_documents(
         response: Response,  # Necesitamos el objeto Response para modificar los headers
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_read_db),
         tenant=Depends(get_current_tenant),
         q: str | None = Query(None, description="Buscar en título o contenido"),
         document_type: str | None = Query(None, description="Filtrar por tipo de documento"),
         page: int = Query(1, ge=1),
         page_size: int = Query(5, ge=1, le=50),  # CAMBIO: Establecemos 5 por defecto
+        cursor: str | None = Query(None, description="X-Next-Cursor de la página anterior; vacío para empezar (sin total)"),
+        count: str = Query("auto", pattern=COUNT_MODES, description="Total: auto (estimado si es grande), exact o none"),
         doc_service: DocumentService = Depends(get_document_service),
 ):
-    rows, total = doc_service.list_documents(
+    rows, total, next_cursor = await doc_service.list_documents(
         db,
         str(tenant.id),
         q=q,
         document_type=document_type,
         page=page,
-        page_size=page_size
+        page_size=page_size,
+        cursor=cursor,
+        count=count,
     )
     # CORRECCIÓN CLAVE: Agregar el header para que el frontend pueda calcular las páginas
-    response.headers["X-Total-Count"] = str(total)
+    set_page_headers(response, total, next_cursor)
 
     return [DocumentOut.model_validate(x) for x in rows]
 
@@ -1,23 +1,10 @@
-from fastapi import Depends
-from src.apps.document.services.llm_service import AbstractLLMEngine, GeminiLlmEngine  # Usamos GeminiLlmEngine
-from src.apps.document.repository import DocumentRepository
+from src.apps.document.repository import DocumentRepository, AsyncDocumentRepository
 from src.apps.document.services.document_services import DocumentService
 
 
-# Factory/Dependency para el motor LLM
-def get_llm_engine() -> AbstractLLMEngine:
+def get_document_service() -> DocumentService:
     """
-    Retorna la implementación real del motor LLM (Gemini).
+    Dependencia que inyecta los repositorios al DocumentService. El motor LLM se
+    resuelve solo si la ruta lo usa (listados/lecturas no lo tocan).
     """
-    # Usamos la implementación REAL de Gemini
-    return GeminiLlmEngine()
-
-
-def get_document_service(
-        llm_engine: AbstractLLMEngine = Depends(get_llm_engine)
-) -> DocumentService:
-    """
-    Dependencia que inyecta el repositorio y el motor LLM al DocumentService.
-    """
-    # El DocumentService necesita el repositorio para las tareas de la base de datos
-    return DocumentService(DocumentRepository(), llm_engine=llm_engine)
+    return DocumentService(DocumentRepository(), async_repo=AsyncDocumentRepository())
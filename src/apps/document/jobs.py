@@ -0,0 +1,231 @@
+# src/apps/document/jobs.py
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Optional
+
+from sqlalchemy import event as orm_event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from src.core.config.config import env
+from src.core.connections.database import get_data_access_layer
+from src.utils.metrics import Histogram, metrics_registry
+from src.apps.users.models import User
+from .repository import DocumentJobRepository, DocumentRepository
+from .services.document_services import DocumentService
+
+log = logging.getLogger(__name__)
+
+# Buckets en segundos: duración de la llamada al LLM por job
+LLM_SECONDS_BUCKETS = (1, 2, 5, 10, 20, 30, 60, 120)
+
+
+class DocumentJobRunner:
+    """
+    Ejecuta los DocumentJob en un pool de hilos propio, fuera del threadpool de
+    requests. Cada job usa dos transacciones cortas (tomar el job / guardar el
+    Document) y ninguna conexión queda abierta durante la llamada al LLM.
+
+    Al arrancar, y luego cada `sweep_sec`, retoma los jobs en cola y los `running`
+    abandonados (worker caído, guardado fallido, cola descartada al apagar);
+    `claim` es atómico, así que con varios procesos un job se ejecuta una sola vez.
+    """
+
+    def __init__(self, *, max_workers: int, stale_sec: float, sweep_sec: float):
+        self.max_workers = max_workers
+        self.stale = timedelta(seconds=stale_sec)
+        self.sweep_sec = sweep_sec
+        self.repo = DocumentJobRepository()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._sweeper: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        self._inflight = set()
+
+        self._pending = 0
+        self._running = 0
+        self._succeeded = 0
+        self._failed = 0
+        self._sweeps = 0
+        self.llm_seconds = Histogram(LLM_SECONDS_BUCKETS)
+        metrics_registry.register("document_jobs", self.stats)
+
+    # -------------------------------------------------------------------
+    # Ciclo de vida (startup/shutdown de la app)
+    # -------------------------------------------------------------------
+    def start(self) -> None:
+        """Llamar fuera del event loop (consulta la DB)."""
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="document-job")
+        self.sweep()
+        if self.sweep_sec > 0:
+            self._sweeper = threading.Thread(target=self._sweep_loop, name="document-job-sweeper", daemon=True)
+            self._sweeper.start()
+
+    def stop(self) -> None:
+        # Lo que no haya empezado queda `queued` y lo retoma el barrido de otro worker o del próximo arranque
+        self._stopping.set()
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def sweep(self) -> None:
+        """Encola los jobs pendientes en la DB que este proceso no tenga ya en curso."""
+        with get_data_access_layer().session_scope() as db:
+            job_ids = self.repo.list_pending_ids(db, stale_before=self._stale_before())
+        with self._lock:
+            job_ids = [job_id for job_id in job_ids if job_id not in self._inflight]
+            self._sweeps += 1
+        for job_id in job_ids:
+            self.submit(job_id)
+        if job_ids:
+            log.info("Resuming %s pending document jobs", len(job_ids))
+
+    def _sweep_loop(self) -> None:
+        while not self._stopping.wait(self.sweep_sec):
+            try:
+                self.sweep()
+            except Exception:
+                log.exception("Document job sweep failed")
+
+    # -------------------------------------------------------------------
+    # Encolado
+    # -------------------------------------------------------------------
+    def submit_on_commit(self, db: Session, job_id) -> None:
+        """Encola tras el commit de `db`: antes el worker no vería la fila."""
+        orm_event.listen(db, "after_commit", lambda _session: self.submit(job_id), once=True)
+
+    def submit(self, job_id) -> None:
+        if self._executor is None:
+            log.warning("Document job runner not started; job %s stays queued", job_id)
+            return
+        with self._lock:
+            if job_id in self._inflight:
+                return
+            self._inflight.add(job_id)
+            self._pending += 1
+        try:
+            future = self._executor.submit(self._run, job_id)
+        except RuntimeError:  # executor ya apagado
+            self._forget(job_id, pending=True)
+            return
+        future.add_done_callback(lambda f: self._forget(job_id, pending=True) if f.cancelled() else None)
+
+    def _forget(self, job_id, *, pending: bool) -> None:
+        with self._lock:
+            self._inflight.discard(job_id)
+            if pending:
+                self._pending -= 1
+
+    # -------------------------------------------------------------------
+    # Un job
+    # -------------------------------------------------------------------
+    def _run(self, job_id) -> None:
+        with self._lock:
+            self._pending -= 1
+            self._running += 1
+        try:
+            self._execute(job_id)
+        except Exception:
+            log.exception("Document job %s crashed", job_id)
+        finally:
+            with self._lock:
+                self._running -= 1
+            self._forget(job_id, pending=False)
+
+    def _execute(self, job_id) -> None:
+        dal = get_data_access_layer()
+
+        # 1) Tomar el job (transacción corta)
+        with dal.session_scope() as db:
+            job = self.repo.claim(db, job_id, stale_before=self._stale_before())
+            if job is None:
+                return
+            document_type, transcript = job.document_type, job.transcript
+            clinical_meta = dict(job.clinical_meta or {})
+
+        # 2) LLM sin conexión a la DB
+        started = time.monotonic()
+        try:
+            document_body = self._service().llm_engine.structure_document(document_type, transcript, clinical_meta)
+        except Exception as e:
+            self._fail(job_id, getattr(e, "detail", None) or str(e))
+            return
+        finally:
+            self.llm_seconds.observe(time.monotonic() - started)
+
+        # 3) Guardar el Document y cerrar el job en la misma transacción
+        try:
+            with dal.session_scope() as db:
+                job = self.repo.get_by_id(db, job_id)
+                if job is None:  # Recording borrado mientras tanto (cascade)
+                    return
+                user = db.get(User, job.user_id) if job.user_id else None
+                try:
+                    with db.begin_nested():
+                        doc = self._service().save_generated_document(
+                            db,
+                            tenant_id=job.tenant_id,
+                            user=user,
+                            recording_id=job.recording_id,
+                            document_type=job.document_type,
+                            clinical_meta=clinical_meta,
+                            document_body=document_body,
+                        )
+                except IntegrityError:
+                    # Otro camino (modo sync) creó el Document de este Recording mientras tanto
+                    self.repo.finish(db, job, status="failed",
+                                     error_message="A Document already exists for this Recording.")
+                    self._count(succeeded=False)
+                    return
+                self.repo.finish(db, job, status="succeeded", document_id=doc.id)
+        except Exception:
+            # La transacción se revirtió: sin esto el job quedaría `running` hasta ser `stale`
+            log.exception("Could not save document for job %s", job_id)
+            self._fail(job_id, "Could not save the generated document.")
+            return
+        self._count(succeeded=True)
+
+    def _fail(self, job_id, message: str) -> None:
+        log.warning("Document job %s failed: %s", job_id, message)
+        with get_data_access_layer().session_scope() as db:
+            job = self.repo.get_by_id(db, job_id)
+            if job is not None:
+                self.repo.finish(db, job, status="failed", error_message=message)
+        self._count(succeeded=False)
+
+    def _count(self, *, succeeded: bool) -> None:
+        with self._lock:
+            if succeeded:
+                self._succeeded += 1
+            else:
+                self._failed += 1
+
+    def _service(self) -> DocumentService:
+        return DocumentService(DocumentRepository())
+
+    def _stale_before(self) -> datetime:
+        return datetime.now(timezone.utc) - self.stale
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "pending": self._pending,
+            "running": self._running,
+            "succeeded": self._succeeded,
+            "failed": self._failed,
+            "sweeps": self._sweeps,
+            "llm_seconds": self.llm_seconds.snapshot(),
+        }
+
+
+@lru_cache(maxsize=None)
+def get_document_job_runner() -> DocumentJobRunner:
+    """Runner del proceso (lo arranca/detiene el lifecycle de la app)."""
+    return DocumentJobRunner(
+        max_workers=env.DOCUMENT_JOB_WORKERS,
+        stale_sec=env.DOCUMENT_JOB_STALE_SEC,
+        sweep_sec=env.DOCUMENT_JOB_SWEEP_SEC,
+    )
@@ -1,8 +1,10 @@
-from sqlalchemy import Column, String, Boolean, ForeignKey, Index, Text, Enum
-from sqlalchemy.dialects.postgresql import UUID, TIMESTAMP, JSONB
+from sqlalchemy import Column, String, Boolean, ForeignKey, Index, Integer, Text, Enum, Computed, text
+from sqlalchemy.dialects.postgresql import UUID, TIMESTAMP, JSONB, TSVECTOR
+from sqlalchemy.orm import deferred
 from sqlalchemy.sql import func
 import uuid
 from src.core.connections.database import Base
+from src.utils.search import tsvector_sql
 
 DOCUMENT_TYPES = (
     "clinical_history",
@@ -12,6 +14,9 @@ DOCUMENT_TYPES = (
     "incapacity",
 )
 
+# Estados de un DocumentJob: queued -> running -> succeeded | failed
+DOCUMENT_JOB_STATUSES = ("queued", "running", "succeeded", "failed")
+
 
 class Document(Base):
     __tablename__ = "document"
@@ -35,6 +40,11 @@ class Document(Base):
 
     is_synced = Column(Boolean, nullable=False, server_default="false")
 
+    # Búsqueda de texto completo (generada por Postgres; el título pesa más que el cuerpo)
+    search_vector = deferred(Column(
+        TSVECTOR, Computed(tsvector_sql(("title", "A"), ("content", "B")), persisted=True)
+    ))
+
     created_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=func.now())
     updated_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
 
@@ -42,4 +52,64 @@ class Document(Base):
         Index("ix_document_tenant_user_type", "tenant_id", "user_id", "document_type"),
         Index("ix_document_tenant_recording", "tenant_id", "recording_id"),
         Index("ix_document_synced", "is_synced"),
+        # Listados paginados por keyset (created_at desc, id desc)
+        Index("ix_document_tenant_created", "tenant_id", "created_at", "id"),
+        Index("ix_document_search", "search_vector", postgresql_using="gin"),
+    )
+
+
+class DocumentJob(Base):
+    """Generación de un Document en segundo plano (POST /documents/generate en modo async)."""
+    __tablename__ = "document_job"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, unique=True, nullable=False)
+    tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenant.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("app_user.id", ondelete="SET NULL"))
+    recording_id = Column(UUID(as_uuid=True), ForeignKey("recording.id", ondelete="CASCADE"), nullable=False)
+
+    # Entrada de la generación
+    document_type = Column(Enum(*DOCUMENT_TYPES, name="document_type_enum"), nullable=False)
+    transcript = Column(Text, nullable=False)
+    clinical_meta = Column(JSONB, nullable=False, server_default='{}')
+
+    status = Column(String(20), nullable=False, server_default="queued")
+    attempts = Column(Integer, nullable=False, server_default="0")
+    document_id = Column(UUID(as_uuid=True), ForeignKey("document.id", ondelete="SET NULL"))
+    error_message = Column(Text)
+
+    created_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=func.now())
+    updated_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
+    started_at = Column(TIMESTAMP(timezone=True))
+    finished_at = Column(TIMESTAMP(timezone=True))
+
+    __table_args__ = (
+        Index("ix_document_job_tenant_created", "tenant_id", "created_at"),
+        # Un solo job activo por Recording
+        Index("uq_document_job_active_recording", "recording_id", unique=True,
+              postgresql_where=text("status IN ('queued', 'running')")),
+        # Recuperación al arrancar: solo las filas pendientes (índice pequeño)
+        Index("ix_document_job_pending", "updated_at", postgresql_where=text("status IN ('queued', 'running')")),
+    )
+
+
+class LlmResponseCache(Base):
+    """
+    Respuestas del LLM por hash de su entrada (modelo, tipo, transcripción normalizada,
+    metadatos y versión del prompt). Solo guarda el hash y la respuesta, no la entrada.
+    """
+    __tablename__ = "llm_response_cache"
+
+    key = Column(String(64), primary_key=True)  # sha256 hex
+    model = Column(String(120), nullable=False)
+    prompt_version = Column(String(40), nullable=False)
+    response = Column(Text, nullable=False)
+    hits = Column(Integer, nullable=False, server_default="0")
+    created_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=func.now())
+    last_hit_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=func.now())
+    expires_at = Column(TIMESTAMP(timezone=True), nullable=False)
+
+    __table_args__ = (
+        Index("ix_llm_response_cache_expires", "expires_at"),
+        # Desalojo por tamaño: primero las menos usadas recientemente
+        Index("ix_llm_response_cache_last_hit", "last_hit_at"),
     )
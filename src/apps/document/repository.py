@@ -1,7 +1,13 @@
-from typing import Optional, Sequence, Tuple
-from sqlalchemy import select, func
+from datetime import datetime
+from typing import Dict, Optional, Sequence, Tuple
+from sqlalchemy import bindparam, select, func, update, delete, or_, and_, Select, Row
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
-from .models import Document
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.utils.pagination import apply_keyset, split_page
+from src.utils.search import ts_headline, ts_query
+from src.utils.totals import TotalCount, count_cache, resolve_total
+from .models import Document, DocumentJob, LlmResponseCache
 
 
 class DocumentRepository:
@@ -11,6 +17,7 @@ class DocumentRepository:
         db.add(p)
         db.flush()
         db.refresh(p)
+        count_cache.invalidate_on_commit(db, "document", p.tenant_id)
         return p
 
     @staticmethod
@@ -25,33 +32,214 @@ class DocumentRepository:
         doc.is_finalized = is_finalized
         doc.is_synced = is_synced
         db.flush()
+        # El contenido entra en el filtro `q` de los listados
+        count_cache.invalidate_on_commit(db, "document", doc.tenant_id)
         db.refresh(doc)
         return doc
 
+
+class DocumentJobRepository:
     @staticmethod
-    def list_by_tenant(
-            db: Session, tenant_id, *, q: Optional[str] = None, document_type: Optional[str] = None,
-            page: int = 1, page_size: int = 5
-    ) -> Tuple[Sequence[Document], int]:
-        """Lista documentos por tenant con filtros básicos y paginación."""
+    def create(db: Session, **data) -> DocumentJob:
+        job = DocumentJob(**data)
+        db.add(job)
+        db.flush()
+        db.refresh(job)
+        return job
 
-        # 1. Crear la base de la sentencia de selección
-        stmt = select(Document).where(Document.tenant_id == tenant_id)
+    @staticmethod
+    def get_by_id(db: Session, job_id) -> Optional[DocumentJob]:
+        return db.get(DocumentJob, job_id)
 
-        if document_type:
-            stmt = stmt.where(Document.document_type == document_type)
+    @staticmethod
+    def get_active_for_recording(db: Session, recording_id) -> Optional[DocumentJob]:
+        return db.execute(
+            select(DocumentJob).where(
+                DocumentJob.recording_id == recording_id,
+                DocumentJob.status.in_(("queued", "running")),
+            )
+        ).scalar_one_or_none()
 
-        if q:
-            search_term = f"%{q.lower()}%"
-            stmt = stmt.where(
-                (Document.title.ilike(search_term)) | (Document.content.ilike(search_term))
+    @staticmethod
+    def claim(db: Session, job_id, *, stale_before: datetime) -> Optional[DocumentJob]:
+        """
+        Pasa el job a `running` de forma atómica (queued, o running abandonado por un
+        worker caído). Devuelve None si otro worker ya lo tomó o ya terminó.
+        """
+        return db.execute(
+            update(DocumentJob)
+            .where(
+                DocumentJob.id == job_id,
+                or_(
+                    DocumentJob.status == "queued",
+                    and_(DocumentJob.status == "running", DocumentJob.updated_at < stale_before),
+                ),
             )
-        total_stmt = select(func.count()).select_from(stmt.subquery())
-        total = db.execute(total_stmt).scalar_one()
+            .values(status="running", attempts=DocumentJob.attempts + 1,
+                    started_at=func.now(), updated_at=func.now())
+            .returning(DocumentJob)
+        ).scalar_one_or_none()
 
-        offset = (page - 1) * page_size
-        rows = db.execute(
-            stmt.order_by(Document.created_at.desc()).offset(offset).limit(page_size)
+    @staticmethod
+    def finish(db: Session, job: DocumentJob, *, status: str, document_id=None,
+               error_message: Optional[str] = None) -> DocumentJob:
+        job.status = status
+        job.document_id = document_id
+        job.error_message = error_message
+        job.finished_at = func.now()
+        db.flush()
+        return job
+
+    @staticmethod
+    def list_pending_ids(db: Session, *, stale_before: datetime, limit: int = 500) -> Sequence:
+        """Jobs a retomar (arranque y barridos): en cola, o `running` sin avances desde `stale_before`."""
+        return db.execute(
+            select(DocumentJob.id)
+            .where(or_(
+                DocumentJob.status == "queued",
+                and_(DocumentJob.status == "running", DocumentJob.updated_at < stale_before),
+            ))
+            .order_by(DocumentJob.updated_at.asc())
+            .limit(limit)
         ).scalars().all()
 
+
+class LlmResponseCacheRepository:
+    @staticmethod
+    def hit(db: Session, key: str) -> Optional[str]:
+        """Respuesta vigente para `key` (y anota el uso para el desalojo LRU)."""
+        return db.execute(
+            update(LlmResponseCache)
+            .where(LlmResponseCache.key == key, LlmResponseCache.expires_at > func.now())
+            .values(hits=LlmResponseCache.hits + 1, last_hit_at=func.now())
+            .returning(LlmResponseCache.response)
+        ).scalar_one_or_none()
+
+    @staticmethod
+    def put(db: Session, *, key: str, model: str, prompt_version: str, response: str, expires_at: datetime) -> None:
+        stmt = insert(LlmResponseCache).values(
+            key=key, model=model, prompt_version=prompt_version, response=response, expires_at=expires_at,
+        )
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[LlmResponseCache.key],
+            set_={"response": stmt.excluded.response, "expires_at": stmt.excluded.expires_at,
+                  "last_hit_at": func.now()},
+        ))
+
+    @staticmethod
+    def touch(db: Session, hits: Dict[str, int]) -> None:
+        """Anota en lote los aciertos servidos desde memoria ({key: aciertos}) para el desalojo LRU."""
+        table = LlmResponseCache.__table__
+        db.execute(
+            update(table)
+            .where(table.c.key == bindparam("cache_key"))
+            .values(hits=table.c.hits + bindparam("new_hits"), last_hit_at=func.now()),
+            [{"cache_key": key, "new_hits": n} for key, n in hits.items()],
+        )
+
+    @staticmethod
+    def prune(db: Session, *, max_rows: int) -> int:
+        """Borra las entradas vencidas y, si sobran, las de uso más antiguo por encima de `max_rows`."""
+        expired = db.execute(delete(LlmResponseCache).where(LlmResponseCache.expires_at <= func.now())).rowcount
+        # Corte = last_hit_at de la fila max_rows+1 (recorre ix_llm_response_cache_last_hit)
+        cutoff = db.execute(
+            select(LlmResponseCache.last_hit_at)
+            .order_by(LlmResponseCache.last_hit_at.desc()).offset(max_rows).limit(1)
+        ).scalar_one_or_none()
+        if cutoff is None:
+            return expired
+        overflow = db.execute(delete(LlmResponseCache).where(LlmResponseCache.last_hit_at <= cutoff)).rowcount
+        return expired + overflow
+
+
+# Orden de listados: más recientes primero (usa ix_document_tenant_created)
+DOCUMENT_LIST_KEYS = (Document.created_at, Document.id)
+
+
+def _list_stmt(tenant_id, *, q: Optional[str] = None, document_type: Optional[str] = None) -> Select:
+    # 1. Crear la base de la sentencia de selección
+    stmt = select(Document).where(Document.tenant_id == tenant_id)
+
+    if document_type:
+        stmt = stmt.where(Document.document_type == document_type)
+
+    if q:
+        # Texto completo sobre título + contenido (índice GIN ix_document_search)
+        stmt = stmt.where(Document.search_vector.op("@@")(ts_query(q)))
+    return stmt
+
+
+class AsyncDocumentRepository:
+    """Lecturas de Document sobre AsyncSession (asyncpg)."""
+
+    @staticmethod
+    async def get_by_id(db: AsyncSession, document_id: str) -> Optional[Document]:
+        return await db.get(Document, document_id)
+
+    @staticmethod
+    async def get_job(db: AsyncSession, job_id) -> Optional[DocumentJob]:
+        return await db.get(DocumentJob, job_id)
+
+    @staticmethod
+    async def list_by_tenant(
+            db: AsyncSession, tenant_id, *, q: Optional[str] = None, document_type: Optional[str] = None,
+            page: int = 1, page_size: int = 5, count: str = "auto"
+    ) -> Tuple[Sequence[Document], Optional[TotalCount]]:
+        """Lista documentos por tenant con filtros básicos y paginación."""
+        stmt = _list_stmt(tenant_id, q=q, document_type=document_type)
+
+        total = await resolve_total(
+            db, stmt, scope="document", tenant_id=tenant_id,
+            filters={"q": q, "document_type": document_type}, mode=count,
+        )
+
+        offset = (page - 1) * page_size
+        rows = (await db.execute(
+            stmt.order_by(Document.created_at.desc(), Document.id.desc()).offset(offset).limit(page_size)
+        )).scalars().all()
+
         return rows, total
+
+    @staticmethod
+    async def list_by_tenant_keyset(
+            db: AsyncSession, tenant_id, *, q: Optional[str] = None, document_type: Optional[str] = None,
+            cursor: Optional[str] = None, page_size: int = 5
+    ) -> Tuple[Sequence[Document], Optional[str]]:
+        """Página por keyset sobre (created_at, id): coste O(page) sin OFFSET ni count."""
+        stmt = apply_keyset(
+            _list_stmt(tenant_id, q=q, document_type=document_type), DOCUMENT_LIST_KEYS,
+            cursor=cursor, page_size=page_size, descending=True,
+        )
+        rows = (await db.execute(stmt)).scalars().all()
+        return split_page(rows, DOCUMENT_LIST_KEYS, page_size)
+
+    @staticmethod
+    async def search(
+            db: AsyncSession, tenant_id, q: str, *, document_type: Optional[str] = None,
+            limit: int = 20, offset: int = 0
+    ) -> Sequence[Row]:
+        """
+        Búsqueda ordenada por relevancia con fragmentos resaltados. Devuelve una
+        proyección compacta (sin `content`); ts_headline solo se calcula para la página.
+        """
+        query = ts_query(q)
+        rank = func.ts_rank_cd(Document.search_vector, query).label("rank")
+
+        stmt = select(
+            Document.id, Document.title, Document.document_type, Document.recording_id,
+            Document.is_finalized, Document.created_at, Document.content, rank,
+        ).where(
+            Document.tenant_id == tenant_id,
+            Document.search_vector.op("@@")(query),
+        )
+        if document_type:
+            stmt = stmt.where(Document.document_type == document_type)
+        page = stmt.order_by(rank.desc(), Document.created_at.desc()).limit(limit).offset(offset).subquery()
+
+        snippet = ts_headline(page.c.content, query).label("snippet")
+        return (await db.execute(
+            select(
+                page.c.id, page.c.title, page.c.document_type, page.c.recording_id,
+                page.c.is_finalized, page.c.created_at, page.c.rank, snippet,
+            ).order_by(page.c.rank.desc(), page.c.created_at.desc())
+        )).all()
@@ -28,6 +28,34 @@ class DocumentOut(BaseModel):
     updated_at: datetime
 
 
+class DocumentJobOut(BaseModel):
+    """Estado de una generación en segundo plano; `document_id` al terminar con éxito."""
+    model_config = ConfigDict(from_attributes=True)
+    id: UUID
+    recording_id: UUID
+    document_type: str
+    status: str
+    attempts: int
+    document_id: Optional[UUID]
+    error_message: Optional[str]
+    created_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+
+
+class DocumentSearchHit(BaseModel):
+    """Resultado de búsqueda: sin `content`, solo el fragmento resaltado."""
+    model_config = ConfigDict(from_attributes=True)
+    id: UUID
+    title: str
+    document_type: str
+    recording_id: Optional[UUID]
+    is_finalized: bool
+    created_at: datetime
+    rank: float
+    snippet: str
+
+
 class DocumentContentUpdate(BaseModel):
     content: str = Field(..., min_length=1)
     is_finalized: bool = Field(False)
@@ -1,15 +1,22 @@
 import logging
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from src.apps.tenant.models import Tenant
 from src.apps.users.models import User
 from src.apps.recordings.models import Recording
 from src.core.errors.errors import EntityNotFoundError, ConflictError
-from src.apps.document.repository import DocumentRepository
-from src.apps.document.models import Document
-from src.apps.document.services.llm_service import AbstractLLMEngine
+from src.core.connections.database import get_data_access_layer, released_connection
+from src.apps.document.repository import (
+    DocumentRepository, AsyncDocumentRepository, DocumentJobRepository, DOCUMENT_LIST_KEYS
+)
+from src.apps.document.models import Document, DocumentJob
+from src.apps.document.services.llm_service import AbstractLLMEngine, get_default_llm_engine
+from src.utils.pagination import next_cursor_for
+from src.utils.totals import TotalCount
 from datetime import datetime
-from typing import Optional, Sequence, Tuple
+from typing import Any, Iterator, Optional, Sequence, Tuple
 from fastapi import BackgroundTasks
 
 logger = logging.getLogger(__name__)
@@ -17,9 +24,20 @@ logger = logging.getLogger(__name__)
 
 class DocumentService:
     # Constructor (intacto)
-    def __init__(self, repo: DocumentRepository, llm_engine: AbstractLLMEngine):
+    def __init__(self, repo: DocumentRepository, llm_engine: AbstractLLMEngine | None = None,
+                 async_repo: AsyncDocumentRepository | None = None,
+                 job_repo: DocumentJobRepository | None = None):
         self.repo = repo
-        self.llm_engine = llm_engine
+        self._llm_engine = llm_engine
+        self.async_repo = async_repo or AsyncDocumentRepository()
+        self.job_repo = job_repo or DocumentJobRepository()
+
+    @property
+    def llm_engine(self) -> AbstractLLMEngine:
+        """Motor LLM perezoso: por defecto el del proceso, solo cuando se genera."""
+        if self._llm_engine is None:
+            self._llm_engine = get_default_llm_engine()
+        return self._llm_engine
 
     # generate_and_save_document (intacto)
     def generate_and_save_document(
@@ -36,40 +54,145 @@ class DocumentService:
         """
         Genera un documento clínico estructurado usando el LLM y lo guarda en la base de datos.
         """
-        if str(recording.tenant_id) != str(tenant.id):
-            raise ConflictError("Recording does not belong to the current tenant.")
-
-        existing_doc = db.execute(
-            select(Document).where(Document.recording_id == recording.id)
-        ).scalar_one_or_none()
+        self._ensure_can_generate(db, tenant, recording)
 
-        if existing_doc:
-            raise ConflictError(f"A Document (ID: {existing_doc.id}) already exists for this Recording.")
+        # --- 1. LLAMADA AL LLM (la conexión vuelve al pool mientras tanto) ---
+        with released_connection(db):
+            document_body = self.llm_engine.structure_document(
+                document_type,
+                transcript,
+                clinical_meta
+            )
 
-        # --- 1. LLAMADA AL LLM ---
-        title = f"{document_type.replace('_', ' ').title()} generado"
+        # --- 2 y 3. CONSTRUIR DOCUMENTO FINAL Y CREACIÓN EN DB ---
+        return self.save_generated_document(
+            db,
+            tenant_id=tenant.id,
+            user=user,
+            recording_id=recording.id,
+            document_type=document_type,
+            clinical_meta=clinical_meta,
+            document_body=document_body,
+        )
 
-        document_body = self.llm_engine.structure_document(
-            document_type,
-            transcript,
-            clinical_meta
+    def stream_generation(
+            self,
+            db: Session,
+            *,
+            tenant: Tenant,
+            user: User,
+            recording: Recording,
+            document_type: str,
+            transcript: str,
+            clinical_meta: dict
+    ) -> Iterator[Tuple[str, Any]]:
+        """
+        Modo streaming: valida ya (con `db`, antes de abrir la respuesta) y devuelve un
+        iterador de eventos ("chunk", texto) a medida que el LLM genera el Markdown,
+        terminado en ("done", Document) una vez guardado. El iterador no usa `db`:
+        el guardado va en una transacción propia y corta al final del stream.
+        """
+        self._ensure_can_generate(db, tenant, recording)
+        return self._stream_and_save(
+            tenant_id=tenant.id,
+            user=user,
+            recording_id=recording.id,
+            document_type=document_type,
+            transcript=transcript,
+            clinical_meta=clinical_meta,
         )
 
-        # --- 2. CONSTRUIR DOCUMENTO FINAL ---
+    def _stream_and_save(
+            self, *, tenant_id, user: User, recording_id, document_type: str, transcript: str, clinical_meta: dict
+    ) -> Iterator[Tuple[str, Any]]:
+        parts = []
+        for chunk in self.llm_engine.stream_document(document_type, transcript, clinical_meta):
+            parts.append(chunk)
+            yield "chunk", chunk
+
+        # Solo se guarda un stream completo (si el cliente se desconecta no se llega aquí)
+        try:
+            with get_data_access_layer().session_scope() as db:
+                doc = self.save_generated_document(
+                    db,
+                    tenant_id=tenant_id,
+                    user=user,
+                    recording_id=recording_id,
+                    document_type=document_type,
+                    clinical_meta=clinical_meta,
+                    document_body="".join(parts),
+                )
+        except IntegrityError:
+            # Otro camino (job o modo sync) creó el Document mientras se generaba
+            raise ConflictError("A Document already exists for this Recording.")
+        yield "done", doc
+
+    def enqueue_generation(
+            self,
+            db: Session,
+            *,
+            tenant: Tenant,
+            user: User,
+            recording: Recording,
+            document_type: str,
+            transcript: str,
+            clinical_meta: dict
+    ) -> DocumentJob:
+        """
+        Modo async: valida y persiste un DocumentJob (queued). El LLM se llama después
+        en DocumentJobRunner, sin ocupar la request ni su conexión. Si ya hay un job
+        activo para el Recording se devuelve ese (reintentos del cliente).
+        """
+        self._ensure_can_generate(db, tenant, recording)
+
+        active = self.job_repo.get_active_for_recording(db, recording.id)
+        if active:
+            return active
+
+        try:
+            with db.begin_nested():
+                return self.job_repo.create(
+                    db,
+                    tenant_id=tenant.id,
+                    user_id=user.id,
+                    recording_id=recording.id,
+                    document_type=document_type,
+                    transcript=transcript,
+                    clinical_meta=clinical_meta,
+                    status="queued",
+                )
+        except IntegrityError:
+            # Dos requests a la vez: uq_document_job_active_recording deja pasar solo una
+            active = self.job_repo.get_active_for_recording(db, recording.id)
+            if active is None:
+                # El job que ganó ya terminó entre el INSERT y esta lectura
+                raise ConflictError("A generation for this Recording just finished; check its document or retry.")
+            return active
+
+    def save_generated_document(
+            self,
+            db: Session,
+            *,
+            tenant_id,
+            user: User | None,
+            recording_id,
+            document_type: str,
+            clinical_meta: dict,
+            document_body: str
+    ) -> Document:
+        """Arma el documento final con el cuerpo devuelto por el LLM y lo guarda."""
+        title = f"{document_type.replace('_', ' ').title()} generado"
         structured_content = self._build_final_document(
             document_type,
-            tenant,
             user,
             clinical_meta,
             document_body
         )
-
-        # --- 3. CREACIÓN EN DB ---
-        doc = self.repo.create(
+        return self.repo.create(
             db,
-            tenant_id=tenant.id,
-            user_id=user.id,
-            recording_id=recording.id,
+            tenant_id=tenant_id,
+            user_id=user.id if user else None,
+            recording_id=recording_id,
             document_type=document_type,
             title=title,
             content=structured_content,
@@ -77,11 +200,37 @@ class DocumentService:
             is_finalized=False,
             is_synced=False
         )
-        return doc
+
+    async def get_job(self, db: AsyncSession, job_id: str) -> DocumentJob | None:
+        return await self.async_repo.get_job(db, job_id)
 
     # list_documents (intacto)
-    def list_documents(self, db: Session, tenant_id: str, **kwargs) -> Tuple[Sequence[Document], int]:
-        return self.repo.list_by_tenant(db, tenant_id, **kwargs)
+    async def list_documents(
+            self, db: AsyncSession, tenant_id: str, *, cursor: Optional[str] = None, page: int = 1,
+            page_size: int = 5, count: str = "auto", **filters
+    ) -> Tuple[Sequence[Document], Optional[TotalCount], Optional[str]]:
+        """
+        Devuelve (rows, total, next_cursor). Con `cursor` (aunque sea "") pagina por
+        keyset y no calcula el total; sin él mantiene page/page_size para clientes antiguos.
+        """
+        if cursor is not None:
+            rows, next_cursor = await self.async_repo.list_by_tenant_keyset(
+                db, tenant_id, cursor=cursor, page_size=page_size, **filters
+            )
+            return rows, None, next_cursor
+
+        rows, total = await self.async_repo.list_by_tenant(
+            db, tenant_id, page=page, page_size=page_size, count=count, **filters
+        )
+        return rows, total, next_cursor_for(rows, DOCUMENT_LIST_KEYS, page_size)
+
+    async def search_documents(
+            self, db: AsyncSession, tenant_id: str, q: str, *, document_type: Optional[str] = None,
+            page: int = 1, page_size: int = 20
+    ):
+        return await self.async_repo.search(
+            db, tenant_id, q, document_type=document_type, limit=page_size, offset=(page - 1) * page_size
+        )
 
     # update_document_content (intacto)
     def update_document_content(
@@ -118,14 +267,26 @@ class DocumentService:
     # LÓGICA INTERNA Y FORMATO
     # -----------------------------------------------------------
 
+    @staticmethod
+    def _ensure_can_generate(db: Session, tenant: Tenant, recording: Recording) -> None:
+        if str(recording.tenant_id) != str(tenant.id):
+            raise ConflictError("Recording does not belong to the current tenant.")
+
+        existing_doc = db.execute(
+            select(Document).where(Document.recording_id == recording.id)
+        ).scalar_one_or_none()
+
+        if existing_doc:
+            raise ConflictError(f"A Document (ID: {existing_doc.id}) already exists for this Recording.")
+
     def _build_final_document(
-            self, doc_type: str, tenant: Tenant, user: User, meta: dict, document_body: str
+            self, doc_type: str, user: User | None, meta: dict, document_body: str
     ) -> str:
         """
         Construye el contenido final. Quitamos toda la estructura Markdown/HTML de aquí
         para que el LLM lo maneje. Solo insertamos marcadores y el cuerpo.
         """
-        doctor_name = user.full_name
+        doctor_name = user.full_name if user else ""
         current_time = datetime.now().strftime('%H:%M:%S')
 
         # Marcador de Encabezado (para que el frontend sepa que es el documento oficial)
@@ -137,8 +298,8 @@ class DocumentService:
         # Devolvemos: Marcador + Cuerpo LLM + Pie de página
         return official_header + document_body + footer
 
-    def get_by_id(self, db: Session, document_id: str) -> Document:
-        doc = self.repo.get_by_id(db, document_id)
+    async def get_by_id(self, db: AsyncSession, document_id: str) -> Document:
+        doc = await self.async_repo.get_by_id(db, document_id)
         if not doc:
             raise EntityNotFoundError("Document", "id", document_id)
         return doc
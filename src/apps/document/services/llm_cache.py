@@ -0,0 +1,206 @@
+# src/apps/document/services/llm_cache.py
+import hashlib
+import json
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, Optional
+
+from src.core.connections.database import get_data_access_layer
+from src.utils.metrics import Histogram, metrics_registry
+from ..cache import llm_response_cache, llm_response_flight
+from ..repository import LlmResponseCacheRepository
+from .llm_service import AbstractLLMEngine, PROMPT_VERSION
+
+logger = logging.getLogger(__name__)
+
+# Cada cuántas escrituras se purgan entradas vencidas/sobrantes de la tabla
+PRUNE_EVERY_PUTS = 100
+# Aciertos en memoria pendientes de anotar en la tabla: se vuelcan al juntar tantas
+# keys, pasado ese tiempo o antes de purgar (si no, las más usadas parecerían frías)
+TOUCH_BATCH_KEYS = 100
+TOUCH_EVERY_SEC = 60
+
+
+def normalize_transcript(transcript: str) -> str:
+    """Espacios y saltos de línea no cambian el documento: no deben cambiar la clave."""
+    return " ".join(transcript.split())
+
+
+def cache_key(model: str, document_type: str, transcript: str, clinical_meta: Dict[str, Any]) -> str:
+    payload = json.dumps(
+        {
+            "model": model,
+            "prompt_version": PROMPT_VERSION,
+            "document_type": document_type,
+            "transcript": normalize_transcript(transcript),
+            "clinical_meta": clinical_meta,
+        },
+        sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CachedLLMEngine(AbstractLLMEngine):
+    """
+    Cache de respuestas delante de otro motor, direccionado por contenido:
+      1. LRU/TTL en memoria del proceso (llm_response_cache).
+      2. Tabla llm_response_cache (compartida entre workers), con TTL y tope de filas.
+      3. El motor real; llamadas idénticas concurrentes se agrupan (single-flight).
+
+    Los aciertos en memoria se anotan en la tabla por lotes (last_hit_at), para que
+    la purga por uso no desaloje justo las entradas más calientes. Los fallos del
+    cache se registran y no impiden generar; los errores del motor no se cachean.
+    """
+
+    def __init__(self, inner: AbstractLLMEngine, *, ttl_sec: float, max_rows: int):
+        self.inner = inner
+        self.model = getattr(inner, "model", type(inner).__name__)
+        self.ttl = timedelta(seconds=ttl_sec)
+        self.max_rows = max_rows
+        self.repo = LlmResponseCacheRepository()
+        self._lock = threading.Lock()
+        self._touched: Dict[str, int] = {}
+        self._touched_at = time.monotonic()
+        self._puts = 0
+        self._db_hits = 0
+        self._misses = 0
+        self._errors = 0
+        self._evicted = 0
+        self.llm_ms = Histogram()
+        metrics_registry.register("llm_cache", self.stats)
+
+    def structure_document(self, document_type: str, transcript: str, clinical_meta: Dict[str, Any]) -> str:
+        key = cache_key(self.model, document_type, transcript, clinical_meta)
+
+        cached = llm_response_cache.get(key)
+        if cached is not None:
+            self._touch(key)
+            return cached
+
+        version = llm_response_cache.version(key)
+        stored = self._load(key)
+        if stored is not None:
+            self._count("_db_hits")
+            llm_response_cache.set(key, stored, version)
+            return stored
+
+        def generate() -> str:
+            self._count("_misses")
+            started = time.perf_counter()
+            response = self.inner.structure_document(document_type, transcript, clinical_meta)
+            self.llm_ms.observe((time.perf_counter() - started) * 1000)
+            self._store(key, response)
+            llm_response_cache.set(key, response, version)
+            return response
+
+        return llm_response_flight.do(key, generate)
+
+    def stream_document(
+            self, document_type: str, transcript: str, clinical_meta: Dict[str, Any]
+    ) -> Iterator[str]:
+        """
+        Un acierto se entrega como un único fragmento. En un fallo se reenvía el stream
+        del motor real y solo se guarda si termina completo (sin single-flight: cada
+        cliente recibe su propio stream).
+        """
+        key = cache_key(self.model, document_type, transcript, clinical_meta)
+
+        cached = llm_response_cache.get(key)
+        if cached is not None:
+            self._touch(key)
+            yield cached
+            return
+
+        version = llm_response_cache.version(key)
+        stored = self._load(key)
+        if stored is not None:
+            self._count("_db_hits")
+            llm_response_cache.set(key, stored, version)
+            yield stored
+            return
+
+        self._count("_misses")
+        started = time.perf_counter()
+        parts = []
+        for chunk in self.inner.stream_document(document_type, transcript, clinical_meta):
+            parts.append(chunk)
+            yield chunk
+        self.llm_ms.observe((time.perf_counter() - started) * 1000)
+        response = "".join(parts)
+        self._store(key, response)
+        llm_response_cache.set(key, response, version)
+
+    def close(self) -> None:
+        self._flush_touches()
+        self.inner.close()
+
+    # -------------------------------------------------------------------
+    # Segundo nivel (Postgres), con sesiones propias y cortas
+    # -------------------------------------------------------------------
+    def _load(self, key: str) -> Optional[str]:
+        try:
+            with get_data_access_layer().session_scope() as db:
+                return self.repo.hit(db, key)
+        except Exception:
+            self._count("_errors")
+            logger.warning("LLM cache read failed", exc_info=True)
+            return None
+
+    def _store(self, key: str, response: str) -> None:
+        try:
+            with get_data_access_layer().session_scope() as db:
+                self.repo.put(
+                    db, key=key, model=self.model, prompt_version=PROMPT_VERSION, response=response,
+                    expires_at=datetime.now(timezone.utc) + self.ttl,
+                )
+            with self._lock:
+                self._puts += 1
+                prune = self._puts % PRUNE_EVERY_PUTS == 0
+            if prune:
+                self._flush_touches()
+                with get_data_access_layer().session_scope() as db:
+                    evicted = self.repo.prune(db, max_rows=self.max_rows)
+                with self._lock:
+                    self._evicted += evicted
+        except Exception:
+            self._count("_errors")
+            logger.warning("LLM cache write failed", exc_info=True)
+
+    def _touch(self, key: str) -> None:
+        with self._lock:
+            self._touched[key] = self._touched.get(key, 0) + 1
+            due = (len(self._touched) >= TOUCH_BATCH_KEYS
+                   or time.monotonic() - self._touched_at >= TOUCH_EVERY_SEC)
+        if due:
+            self._flush_touches()
+
+    def _flush_touches(self) -> None:
+        with self._lock:
+            touched, self._touched = self._touched, {}
+            self._touched_at = time.monotonic()
+        if not touched:
+            return
+        try:
+            with get_data_access_layer().session_scope() as db:
+                self.repo.touch(db, touched)
+        except Exception:
+            self._count("_errors")
+            logger.warning("LLM cache touch failed", exc_info=True)
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def stats(self) -> dict:
+        return {
+            "model": self.model,
+            "prompt_version": PROMPT_VERSION,
+            "db_hits": self._db_hits,
+            "misses": self._misses,
+            "puts": self._puts,
+            "evicted": self._evicted,
+            "errors": self._errors,
+            "llm_ms": self.llm_ms.snapshot(),
+        }
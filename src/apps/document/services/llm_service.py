@@ -2,7 +2,9 @@ import abc
 import json
 import logging
 import os
-from typing import Dict, Any
+from functools import lru_cache
+from typing import Dict, Any, Iterator
+import httpx
 # Importaciones para Gemini
 from google import genai
 from google.genai import types
@@ -11,6 +13,9 @@ from src.core.errors.errors import ConflictError
 
 logger = logging.getLogger(__name__)
 
+# Versión de `_generate_prompt`: subirla al cambiar el prompt invalida el cache de respuestas
+PROMPT_VERSION = "1"
+
 
 class AbstractLLMEngine(abc.ABC):
     """
@@ -21,14 +26,29 @@ class AbstractLLMEngine(abc.ABC):
     def structure_document(self, document_type: str, transcript: str, clinical_meta: Dict[str, Any]) -> str:
         raise NotImplementedError
 
+    def stream_document(
+            self, document_type: str, transcript: str, clinical_meta: Dict[str, Any]
+    ) -> Iterator[str]:
+        """
+        Igual que `structure_document` pero entrega el Markdown por fragmentos a medida
+        que se genera. Por defecto, un único fragmento con el documento completo.
+        """
+        yield self.structure_document(document_type, transcript, clinical_meta)
+
+    def close(self) -> None:
+        """Libera conexiones del motor (apagado de la app)."""
+
 
 # Implementación de LLM (NUBE): Google Gemini
 class GeminiLlmEngine(AbstractLLMEngine):
     """
     Implementación del motor LLM utilizando la API de Google Gemini.
+
+    Una instancia por proceso (`get_default_llm_engine`): el cliente httpx interno
+    mantiene conexiones keep-alive a la API entre requests. Es thread-safe.
     """
 
-    def __init__(self):
+    def __init__(self, *, timeout_sec: float = 60, max_connections: int = 20, retry_attempts: int = 3):
         # CAMBIO: Usamos las variables de entorno de Gemini
         self.api_key = os.getenv("GEMINI_API_KEY")
         self.model = os.getenv("GEMINI_MODEL", "gemini-2.5-pro")
@@ -37,12 +57,22 @@ class GeminiLlmEngine(AbstractLLMEngine):
             logger.error("GEMINI_API_KEY no configurada.")
             raise ValueError("GEMINI_API_KEY no está configurada. Necesaria para la integración de LLM.")
 
+        http_options = types.HttpOptions(
+            timeout=int(timeout_sec * 1000),  # milisegundos
+            client_args={
+                "limits": httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            },
+            retry_options=types.HttpRetryOptions(attempts=retry_attempts),
+        )
         try:
-            self.client = genai.Client(api_key=self.api_key)
+            self.client = genai.Client(api_key=self.api_key, http_options=http_options)
         except Exception as e:
             logger.error(f"Error inicializando cliente Gemini: {e}")
             raise ValueError(f"Error en credenciales Gemini: {e}")
 
+    def close(self) -> None:
+        self.client.close()
+
     # [Resto de los métodos _generate_prompt y structure_document con la lógica de conexión Gemini]
     # ... (Se asume que esta lógica es la que generó el informe estructurado) ...
     def _generate_prompt(self, document_type: str, transcript: str, clinical_meta: Dict[str, Any]) -> str:
@@ -119,11 +149,64 @@ INSTRUCCIÓN ESPECÍFICA:
             if response.text:
                 return response.text
             else:
-                raise APIError("Respuesta de Gemini vacía o bloqueada por seguridad.")
+                raise ConflictError("Respuesta de Gemini vacía o bloqueada por seguridad.")
+
+        except ConflictError:
+            raise
+        except APIError as e:
+            logger.error(f"Error de la API de Gemini: {e}")
+            raise ConflictError(f"Error en el motor de IA (Gemini API): No se pudo generar el documento. Detalle: {e}")
+        except Exception as e:
+            logger.exception(f"Error inesperado al conectar con Gemini: {e}")
+            raise ConflictError(f"Error interno al conectar con el servicio LLM. Detalle: {e}")
 
+    def stream_document(
+            self, document_type: str, transcript: str, clinical_meta: Dict[str, Any]
+    ) -> Iterator[str]:
+        """
+        Llama a Gemini con generate_content_stream y entrega los fragmentos de texto.
+        """
+        prompt = self._generate_prompt(document_type, transcript, clinical_meta)
+
+        try:
+            logger.info(f"Llamando a Gemini (Nube, streaming) con modelo {self.model} para {document_type}...")
+
+            received = False
+            for chunk in self.client.models.generate_content_stream(
+                    model=self.model,
+                    contents=prompt,
+                    config=types.GenerateContentConfig(
+                        temperature=0.01,
+                    )
+            ):
+                if chunk.text:
+                    received = True
+                    yield chunk.text
+
+            if not received:
+                raise ConflictError("Respuesta de Gemini vacía o bloqueada por seguridad.")
+
+        except ConflictError:
+            raise
         except APIError as e:
             logger.error(f"Error de la API de Gemini: {e}")
             raise ConflictError(f"Error en el motor de IA (Gemini API): No se pudo generar el documento. Detalle: {e}")
         except Exception as e:
             logger.exception(f"Error inesperado al conectar con Gemini: {e}")
             raise ConflictError(f"Error interno al conectar con el servicio LLM. Detalle: {e}")
+
+
+@lru_cache(maxsize=None)
+def get_default_llm_engine() -> AbstractLLMEngine:
+    """Motor del proceso; se crea al arrancar la app (o en el primer uso) y se cierra al apagarla."""
+    from src.core.config.config import env
+    from .llm_cache import CachedLLMEngine
+
+    engine = GeminiLlmEngine(
+        timeout_sec=env.GEMINI_TIMEOUT_SEC,
+        max_connections=env.GEMINI_MAX_CONNECTIONS,
+        retry_attempts=env.GEMINI_RETRY_ATTEMPTS,
+    )
+    if env.LLM_CACHE_TTL_SEC > 0:
+        return CachedLLMEngine(engine, ttl_sec=env.LLM_CACHE_TTL_SEC, max_rows=env.LLM_CACHE_MAX_ROWS)
+    return engine
@@ -0,0 +1,15 @@
+# src/apps/monitoring/controller.py
+from fastapi import APIRouter, Depends
+from src.core.middlewares.permissions import require_roles
+from src.utils.metrics import metrics_registry
+
+router = APIRouter(prefix="/monitoring", tags=["Monitoring"])
+
+
+@router.get(
+    "/metrics",
+    summary="Métricas internas del proceso (pools de BD, etc.)",
+    dependencies=[Depends(require_roles("owner", "admin"))],
+)
+def get_process_metrics():
+    return metrics_registry.snapshot()
@@ -1,17 +1,19 @@
 from typing import List
 from fastapi import APIRouter, Depends, Query, Response, status
 from sqlalchemy.orm import Session
-from src.core.connections.deps import get_db, get_current_tenant, get_current_user
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.core.connections.deps import get_db, get_read_db, get_current_tenant, get_current_user
 from src.core.middlewares.permissions import require_roles
-from .schemas import PatientCreate, PatientOut, PatientUpdate
+from src.utils.pagination import set_page_headers
+from .schemas import PatientCreate, PatientOut, PatientUpdate, PatientLookup
 from .services import PatientService
-from .repository import PatientRepository
+from .repository import PatientRepository, AsyncPatientRepository
 
 router = APIRouter(prefix="/patients", tags=["Patients"])
 
 
 def get_service() -> PatientService:
-    return PatientService(PatientRepository())
+    return PatientService(PatientRepository(), AsyncPatientRepository())
 
 
 @router.post(
@@ -45,25 +47,45 @@ def create_patient(
     summary="Listar y buscar pacientes del tenant",
     dependencies=[Depends(require_roles("owner", "admin", "staff", "viewer"))],
 )
-def list_patients(
+async def list_patients(
         response: Response,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_read_db),
         tenant=Depends(get_current_tenant),
         _=Depends(get_current_user),
         q: str | None = Query(None, description="Buscar por email/full_name"),
         page: int = Query(1, ge=1),
         page_size: int = Query(5, ge=1, le=50),  # Establecemos 5 por defecto
+        cursor: str | None = Query(None, description="X-Next-Cursor de la página anterior; vacío para empezar (sin total)"),
         svc: PatientService = Depends(get_service),
 ):
-    rows, total = svc.search_patients(
-        db, tenant=tenant, q=q, page=page, page_size=page_size
+    rows, total, next_cursor = await svc.search_patients(
+        db, tenant=tenant, q=q, page=page, page_size=page_size, cursor=cursor
     )
     # CORRECCIÓN CLAVE: Agregar el header para que el frontend pueda calcular las páginas
-    response.headers["X-Total-Count"] = str(total)
+    set_page_headers(response, total, next_cursor)
 
     return [PatientOut.model_validate(x) for x in rows]
 
 
+@router.get(
+    "/typeahead",
+    response_model=List[PatientLookup],
+    summary="Autocompletar pacientes por nombre o identificador",
+    dependencies=[Depends(require_roles("owner", "admin", "staff", "viewer"))],
+)
+async def typeahead_patients(
+        db: AsyncSession = Depends(get_read_db),
+        tenant=Depends(get_current_tenant),
+        _=Depends(get_current_user),
+        # Los índices trigram necesitan al menos 3 caracteres para acotar la búsqueda
+        q: str = Query(..., min_length=3, max_length=120, description="Nombre o identificador (parcial)"),
+        limit: int = Query(10, ge=1, le=25),
+        svc: PatientService = Depends(get_service),
+):
+    rows = await svc.typeahead(db, tenant=tenant, q=q, limit=limit)
+    return [PatientLookup.model_validate(x) for x in rows]
+
+
 @router.get(
     "/{patient_id}",
     response_model=PatientOut,
@@ -29,4 +29,9 @@ class Patient(Base):
         # Identificador único por Tenant
         UniqueConstraint("tenant_id", "identifier", name="uq_patient_tenant_id"),
         Index("ix_patient_tenant_name", "tenant_id", "full_name"),
+        # Búsqueda por subcadena/similitud (pg_trgm + btree_gin para filtrar por tenant en el mismo índice)
+        Index("ix_patient_name_trgm", "tenant_id", "full_name", postgresql_using="gin",
+              postgresql_ops={"full_name": "gin_trgm_ops"}),
+        Index("ix_patient_identifier_trgm", "tenant_id", "identifier", postgresql_using="gin",
+              postgresql_ops={"identifier": "gin_trgm_ops"}),
     )
\ No newline at end of file
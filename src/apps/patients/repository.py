@@ -1,6 +1,8 @@
 from typing import Optional, Sequence, Tuple
-from sqlalchemy import select, func
+from sqlalchemy import select, func, or_, Select, Row
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.utils.pagination import apply_keyset, split_page
 from .models import Patient
 
 
@@ -27,34 +29,89 @@ class PatientRepository:
         ).scalar_one_or_none()
 
     @staticmethod
-    def list_by_tenant(
-            db: Session, tenant_id, *, q: Optional[str] = None, page: int = 1, page_size: int = 5
-    ) -> Tuple[Sequence[Patient], int]:
-        stmt = select(Patient).where(Patient.tenant_id == tenant_id)
+    def update(db: Session, patient: Patient, **data) -> Patient:
+        for key, value in data.items():
+            if value is not None:
+                setattr(patient, key, value)
+        db.flush()
+        db.refresh(patient)
+        return patient
 
-        if q:
-            # Búsqueda por nombre o identificador
-            search_term = f"%{q.lower()}%"
-            stmt = stmt.where(
-                (Patient.full_name.ilike(search_term)) | (Patient.identifier.ilike(search_term))
-            )
+
+# Orden de listados: alfabético (usa ix_patient_tenant_name)
+PATIENT_LIST_KEYS = (Patient.full_name, Patient.id)
+
+
+def _list_stmt(tenant_id, *, q: Optional[str] = None) -> Select:
+    stmt = select(Patient).where(Patient.tenant_id == tenant_id)
+
+    if q:
+        # Búsqueda por nombre o identificador
+        search_term = f"%{q.lower()}%"
+        stmt = stmt.where(
+            (Patient.full_name.ilike(search_term)) | (Patient.identifier.ilike(search_term))
+        )
+    return stmt
+
+
+class AsyncPatientRepository:
+    """Lecturas de Patient sobre AsyncSession (asyncpg)."""
+
+    @staticmethod
+    async def get_by_id(db: AsyncSession, patient_id: str) -> Optional[Patient]:
+        return await db.get(Patient, patient_id)
+
+    @staticmethod
+    async def list_by_tenant(
+            db: AsyncSession, tenant_id, *, q: Optional[str] = None, page: int = 1, page_size: int = 5
+    ) -> Tuple[Sequence[Patient], int]:
+        stmt = _list_stmt(tenant_id, q=q)
 
         # Obtener el total
         # CORRECCIÓN: Usar .subquery() para el conteo y evitar el producto cartesiano (SAWarning)
         count_stmt = select(func.count()).select_from(stmt.subquery())
-        total = db.execute(count_stmt).scalar_one()
+        total = (await db.execute(count_stmt)).scalar_one()
 
         offset = (page - 1) * page_size
-        rows = db.execute(
-            stmt.order_by(Patient.full_name.asc()).offset(offset).limit(page_size)
-        ).scalars().all()
+        rows = (await db.execute(
+            stmt.order_by(Patient.full_name.asc(), Patient.id.asc()).offset(offset).limit(page_size)
+        )).scalars().all()
         return rows, total
 
     @staticmethod
-    def update(db: Session, patient: Patient, **data) -> Patient:
-        for key, value in data.items():
-            if value is not None:
-                setattr(patient, key, value)
-        db.flush()
-        db.refresh(patient)
-        return patient
\ No newline at end of file
+    async def list_by_tenant_keyset(
+            db: AsyncSession, tenant_id, *, q: Optional[str] = None,
+            cursor: Optional[str] = None, page_size: int = 5
+    ) -> Tuple[Sequence[Patient], Optional[str]]:
+        """Página por keyset sobre (full_name, id): coste O(page) sin OFFSET ni count."""
+        stmt = apply_keyset(
+            _list_stmt(tenant_id, q=q), PATIENT_LIST_KEYS,
+            cursor=cursor, page_size=page_size, descending=False,
+        )
+        rows = (await db.execute(stmt)).scalars().all()
+        return split_page(rows, PATIENT_LIST_KEYS, page_size)
+
+    @staticmethod
+    async def typeahead(db: AsyncSession, tenant_id, q: str, *, limit: int = 10) -> Sequence[Row]:
+        return (await db.execute(_typeahead_stmt(tenant_id, q, limit=limit))).all()
+
+
+def _typeahead_stmt(tenant_id, q: str, *, limit: int = 10) -> Select:
+    """
+    Autocompletado: pacientes activos cuyo nombre contiene/se parece a `q` o cuyo
+    identificador empieza por `q`, ordenados por similitud. Todas las condiciones
+    las resuelven los índices trigram (ix_patient_name_trgm / ix_patient_identifier_trgm).
+    """
+    score = func.greatest(
+        func.word_similarity(q, Patient.full_name),
+        func.similarity(q, Patient.identifier),
+    ).label("score")
+    return select(Patient.id, Patient.identifier, Patient.full_name, score).where(
+        Patient.tenant_id == tenant_id,
+        Patient.is_active.is_(True),
+        or_(
+            Patient.full_name.ilike(f"%{q}%"),
+            Patient.full_name.op("%>")(q),  # q <% full_name: tolera errores de tipeo
+            Patient.identifier.ilike(f"{q}%"),
+        ),
+    ).order_by(score.desc(), Patient.full_name.asc()).limit(limit)
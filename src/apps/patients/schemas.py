@@ -24,6 +24,15 @@ class PatientOut(BaseModel):
     updated_at: datetime
 
 
+class PatientLookup(BaseModel):
+    """Proyección compacta para autocompletado."""
+    model_config = ConfigDict(from_attributes=True)
+    id: UUID
+    identifier: str
+    full_name: str
+    score: float
+
+
 class PatientUpdate(BaseModel):
     full_name: Optional[str] = Field(None, max_length=255)
     date_of_birth: Optional[datetime] = None
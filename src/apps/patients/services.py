@@ -1,16 +1,19 @@
 from datetime import datetime
 
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from src.core.errors.errors import EntityAlreadyExistsError, EntityNotFoundError
 from src.apps.tenant.models import Tenant
-from .repository import PatientRepository
+from src.utils.pagination import next_cursor_for
+from .repository import PatientRepository, AsyncPatientRepository, PATIENT_LIST_KEYS
 from .models import Patient
 from typing import Optional, Tuple, Sequence
 
 
 class PatientService:
-    def __init__(self, repo: PatientRepository):
+    def __init__(self, repo: PatientRepository, async_repo: AsyncPatientRepository | None = None):
         self.repo = repo
+        self.async_repo = async_repo or AsyncPatientRepository()
 
     def create_patient(
             self, db: Session, *, tenant: Tenant, identifier: str, full_name: str,
@@ -29,16 +32,31 @@ class PatientService:
             meta=meta
         )
 
-    def search_patients(
+    async def search_patients(
             self,
-            db: Session,
+            db: AsyncSession,
             *,
             tenant: Tenant,
             q: Optional[str] = None,
             page: int = 1,
-            page_size: int = 50
-    ) -> Tuple[Sequence[Patient], int]:
-        return self.repo.list_by_tenant(db, tenant.id, q=q, page=page, page_size=page_size)
+            page_size: int = 50,
+            cursor: Optional[str] = None,
+    ) -> Tuple[Sequence[Patient], Optional[int], Optional[str]]:
+        """
+        Devuelve (rows, total, next_cursor). Con `cursor` (aunque sea "") pagina por
+        keyset y no calcula el total; sin él mantiene page/page_size para clientes antiguos.
+        """
+        if cursor is not None:
+            rows, next_cursor = await self.async_repo.list_by_tenant_keyset(
+                db, tenant.id, q=q, cursor=cursor, page_size=page_size
+            )
+            return rows, None, next_cursor
+
+        rows, total = await self.async_repo.list_by_tenant(db, tenant.id, q=q, page=page, page_size=page_size)
+        return rows, total, next_cursor_for(rows, PATIENT_LIST_KEYS, page_size)
+
+    async def typeahead(self, db: AsyncSession, *, tenant: Tenant, q: str, limit: int = 10):
+        return await self.async_repo.typeahead(db, tenant.id, q.strip(), limit=limit)
 
     def get_patient(self, db: Session, patient_id: str, tenant_id: str) -> Patient:
         p = self.repo.get_by_id(db, patient_id)
@@ -0,0 +1,14 @@
+# src/apps/recordings/cache.py
+from typing import Any, Dict
+
+from src.core.config.config import env
+from src.utils.cache import SingleFlight, SnapshotCache
+
+# Estado de jobs de Transcribe en curso, por recording_id (lo consultan los clientes en polling).
+# Los estados terminales no se cachean aquí: salen de la BD.
+transcription_status_cache: SnapshotCache[Dict[str, Any]] = SnapshotCache(
+    "transcription_status", maxsize=10_000, ttl=env.TRANSCRIPTION_STATUS_TTL_SEC
+)
+
+# Varias pestañas consultando el mismo recording -> una sola llamada a AWS
+transcription_status_flight = SingleFlight("transcription_status")
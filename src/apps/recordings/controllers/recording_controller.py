@@ -2,9 +2,15 @@
 from typing import List
 from fastapi import APIRouter, Depends, Query, Response, status, HTTPException
 from sqlalchemy.orm import Session
-from src.core.connections.deps import get_db, get_current_tenant, get_current_user
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.core.connections.database import released_connection
+from src.core.connections.deps import get_db, get_read_db, get_current_tenant, get_current_user
 from src.core.middlewares.permissions import require_roles
-from ..schemas import RecordingCreate, RecordingOut, RecordingUpdateStatus, RecordingAttachTranscript
+from src.utils.pagination import set_page_headers
+from src.utils.totals import COUNT_MODES
+from ..schemas import (
+    RecordingCreate, RecordingOut, RecordingUpdateStatus, RecordingAttachTranscript, RecordingSearchHit
+)
 from ..dependencies import get_recording_service, get_transcription_service
 from ..services.recording_service import RecordingService
 from ..services.transcription_service import TranscriptionService  # Importado pero no usado
@@ -64,22 +70,45 @@ def register_recording(
     summary="Listar recordings",
     dependencies=[Depends(require_roles("owner", "admin", "staff", "viewer"))],
 )
-def list_recordings(
+async def list_recordings(
         response: Response,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_read_db),
         tenant=Depends(get_current_tenant),
         _=Depends(get_current_user),
         q: str | None = Query(None, description="Buscar por key"),
         status_q: str | None = Query(None, pattern="^(uploaded|processing|completed|failed)$"),
         page: int = Query(1, ge=1),
         page_size: int = Query(50, ge=1, le=200),
+        cursor: str | None = Query(None, description="X-Next-Cursor de la página anterior; vacío para empezar (sin total)"),
+        count: str = Query("auto", pattern=COUNT_MODES, description="Total: auto (estimado si es grande), exact o none"),
         recording_service: RecordingService = Depends(get_recording_service),
 ):
-    rows, total = recording_service.list(db, tenant=tenant, q=q, status=status_q, page=page, page_size=page_size)
-    response.headers["X-Total-Count"] = str(total)
+    rows, total, next_cursor = await recording_service.list(
+        db, tenant=tenant, q=q, status=status_q, page=page, page_size=page_size, cursor=cursor, count=count
+    )
+    set_page_headers(response, total, next_cursor)
     return [RecordingOut.model_validate(x) for x in rows]
 
 
+@router.get(
+    "/search",
+    response_model=List[RecordingSearchHit],
+    summary="Buscar en transcripciones por texto completo (ordenado por relevancia)",
+    dependencies=[Depends(require_roles("owner", "admin", "staff", "viewer"))],
+)
+async def search_recordings(
+        db: AsyncSession = Depends(get_read_db),
+        tenant=Depends(get_current_tenant),
+        _=Depends(get_current_user),
+        q: str = Query(..., min_length=1, description='Palabras, "frase exacta", OR, -excluir'),
+        page: int = Query(1, ge=1),
+        page_size: int = Query(20, ge=1, le=50),
+        recording_service: RecordingService = Depends(get_recording_service),
+):
+    rows = await recording_service.search_transcripts(db, tenant=tenant, q=q, page=page, page_size=page_size)
+    return [RecordingSearchHit.model_validate(x) for x in rows]
+
+
 @router.get(
     "/{recording_id}",
     response_model=RecordingOut,
@@ -160,8 +189,9 @@ def start_transcription(
     if not recording or str(recording.tenant_id) != str(tenant.id):
         raise HTTPException(status_code=404, detail="Recording not found")
 
-    # Iniciar transcripción
-    success = transcription_service.start_transcription_job(recording)
+    # Iniciar transcripción (sin retener la conexión durante las llamadas a AWS)
+    with released_connection(db):
+        success = transcription_service.start_transcription_job(recording)
 
     if not success:
         raise HTTPException(status_code=500, detail="Failed to start transcription")
@@ -189,12 +219,8 @@ def get_transcription_status(
     if not recording or str(recording.tenant_id) != str(tenant.id):
         raise HTTPException(status_code=404, detail="Recording not found")
 
-    # Obtener estado de la transcripción
-    result = transcription_service.get_transcription_status(recording)
-
-    # Si la transcripción está completada, actualizar el recording
-    if result["transcription_status"] == "COMPLETED" and result["transcript_text"]:
-        recording = recording_service.set_transcript(db, recording, result["transcript_text"])
+    # Obtener estado de la transcripción (BD primero; AWS solo para jobs en curso)
+    result = recording_service.get_transcription_status(db, recording, transcription_service)
 
     return {
         "recording_id": recording_id,
@@ -2,17 +2,109 @@
 from fastapi import APIRouter, Request, HTTPException, Depends
 import json
 import logging
+import threading
+from cachetools import TTLCache
+from sqlalchemy import event as orm_event
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from starlette.responses import JSONResponse
+from src.core.config.config import env
+from src.core.connections.database import released_connection
 from src.core.connections.deps import get_db
 from ..dependencies import get_recording_service, get_transcription_service
+from ..models import TRANSCRIBING
 from ..services.recording_service import RecordingService
 from ..services.transcription_service import TranscriptionService
+from ..services.sns_verifier import SnsMessageVerifier, SnsVerificationError
 
 router = APIRouter(prefix="/webhook", tags=["Webhooks"])
 logger = logging.getLogger(__name__)
 
 
+_verifier = SnsMessageVerifier(
+    allowed_topic_arns=tuple(arn.strip() for arn in env.TRANSCRIBE_SNS_TOPIC_ARNS.split(",") if arn.strip())
+)
+
+# MessageId ya procesados: SNS reintenta y puede entregar más de una vez
+_seen_messages: TTLCache = TTLCache(maxsize=10_000, ttl=3600)
+_seen_lock = threading.Lock()
+
+
+def _already_seen(message_id: str) -> bool:
+    with _seen_lock:
+        return message_id in _seen_messages
+
+
+def _mark_seen(message_id: str) -> None:
+    with _seen_lock:
+        _seen_messages[message_id] = True
+
+
+def _process_notification(
+        db: Session,
+        body: bytes,
+        recording_service: RecordingService,
+        transcription_service: TranscriptionService,
+) -> dict:
+    """
+    Parte bloqueante del webhook (parseo, Session síncrona, llamadas a AWS).
+    Se ejecuta en el threadpool: nunca directamente en el event loop.
+
+    Acepta eventos "Transcribe Job State Change" de EventBridge entregados por SNS.
+    """
+    envelope = json.loads(body)
+    _verifier.verify(envelope)
+
+    if envelope["Type"] == "SubscriptionConfirmation":
+        _verifier.confirm_subscription(envelope)
+        return {"status": "subscribed"}
+    if envelope["Type"] != "Notification":
+        return {"status": "ignored"}
+
+    message_id = envelope["MessageId"]
+    if _already_seen(message_id):
+        return {"status": "duplicate"}
+
+    event = json.loads(envelope["Message"])
+    detail = event.get("detail") or {}
+    job_name = detail.get("TranscriptionJobName")
+    job_status = detail.get("TranscriptionJobStatus")
+    if event.get("source") != "aws.transcribe" or job_status not in ("COMPLETED", "FAILED"):
+        _mark_seen(message_id)
+        return {"status": "ignored"}
+
+    recording_id = TranscriptionService.recording_id_from_job_name(job_name)
+    recording = recording_service.get(db, recording_id) if recording_id else None
+    # El nombre incluye created_at: descarta jobs de otro entorno o de un recording recreado
+    if not recording or TranscriptionService.job_name_for(recording) != job_name:
+        logger.warning(f"Transcribe event for unknown job: {job_name}")
+        _mark_seen(message_id)
+        return {"status": "ignored"}
+
+    if job_status == "COMPLETED":
+        if recording.status == "completed" and recording.transcript_text:
+            _mark_seen(message_id)
+            return {"status": "duplicate"}
+        # Única lectura del transcript: los clientes leen el resultado de la BD
+        with released_connection(db):
+            transcript_text = transcription_service.fetch_transcript(job_name)
+        applied = recording_service.set_transcript(db, recording, transcript_text, only_from=TRANSCRIBING)
+    else:
+        reason = detail.get("FailureReason") or "Transcription failed"
+        applied = recording_service.update_status(db, recording, "failed", error_message=reason,
+                                                  only_from=TRANSCRIBING)
+
+    if applied is None:
+        # El reconciliador o una consulta de estado lo cerró mientras tanto
+        _mark_seen(message_id)
+        return {"status": "duplicate"}
+
+    # Marcar solo tras el commit de get_db: si fallara, el reintento de SNS se procesa de nuevo
+    orm_event.listen(db, "after_commit", lambda _session: _mark_seen(message_id), once=True)
+    logger.info(f"Transcription {job_status} applied to recording {recording.id}")
+    return {"status": "processed"}
+
+
 @router.post("/transcription")
 async def handle_transcription_webhook(
         request: Request,
@@ -27,19 +119,22 @@ async def handle_transcription_webhook(
             logger.warning("Empty webhook body received")
             return JSONResponse(status_code=400, content={"error": "Empty body"})
 
-        # Intentar parsear como JSON
+        # Intentar parsear como JSON (dentro del threadpool, junto con el resto del trabajo síncrono)
         try:
-            data = await request.json()
+            result = await run_in_threadpool(
+                _process_notification, db, body, recording_service, transcription_service
+            )
         except json.JSONDecodeError as e:
             logger.error(f"Invalid JSON in webhook: {e}")
             return JSONResponse(status_code=400, content={"error": "Invalid JSON"})
+        except SnsVerificationError as e:
+            logger.warning(f"Rejected webhook message: {e}")
+            return JSONResponse(status_code=403, content={"error": "Invalid SNS message"})
 
-        # Procesar el webhook de Transcribe
-        # (Aquí puedes agregar lógica para procesar notificaciones de Transcribe)
-        logger.info(f"Received webhook: {data}")
-
-        return JSONResponse(status_code=200, content={"status": "processed"})
+        return JSONResponse(status_code=200, content=result)
 
     except Exception as e:
         logger.error(f"Webhook processing error: {e}")
-        return JSONResponse(status_code=500, content={"error": "Webhook processing failed"})
+        # Lanzar (no devolver) el 500: get_db hace rollback y el MessageId no se marca
+        # como visto, así que el reintento de SNS se procesa de nuevo
+        raise HTTPException(status_code=500, detail="Webhook processing failed") from e
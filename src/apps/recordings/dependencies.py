@@ -1,11 +1,11 @@
 # src/apps/recordings/dependencies.py
 from .services.recording_service import RecordingService
 from .services.transcription_service import TranscriptionService
-from .repository import RecordingRepository
+from .repository import RecordingRepository, AsyncRecordingRepository
 
 
 def get_recording_service() -> RecordingService:
-    return RecordingService(RecordingRepository())
+    return RecordingService(RecordingRepository(), AsyncRecordingRepository())
 
 
 def get_transcription_service() -> TranscriptionService:
@@ -1,11 +1,15 @@
-from sqlalchemy import Column, String, Boolean, Integer, ForeignKey, UniqueConstraint, Index
-from sqlalchemy.dialects.postgresql import UUID, TIMESTAMP
+from sqlalchemy import Column, String, Boolean, Integer, BigInteger, Date, ForeignKey, UniqueConstraint, Index, Computed
+from sqlalchemy.dialects.postgresql import UUID, TIMESTAMP, TSVECTOR
+from sqlalchemy.orm import deferred
 from sqlalchemy.sql import func
-from sqlalchemy import Text  # NEW
+from sqlalchemy import Text, text  # NEW
 import uuid
 from src.core.connections.database import Base
+from src.utils.search import tsvector_sql
 
 RECORDING_STATUS = ("uploaded", "processing", "completed", "failed")
+# Estados que el resultado de un job de Transcribe puede cerrar (completed/failed)
+TRANSCRIBING = ("processing",)
 
 
 class Recording(Base):
@@ -25,6 +29,9 @@ class Recording(Base):
     transcript_text = Column(Text)
     error_message = Column(Text)
 
+    # Búsqueda de texto completo sobre la transcripción (generada por Postgres)
+    transcript_vector = deferred(Column(TSVECTOR, Computed(tsvector_sql(("transcript_text", "A")), persisted=True)))
+
     created_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=func.now())
     updated_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
 
@@ -35,4 +42,29 @@ class Recording(Base):
         Index("ix_recording_tenant_created", "tenant_id", "created_at"),
         Index("ix_recording_tenant_status", "tenant_id", "status"),
         Index("ix_recording_tenant_key", "tenant_id", "key"),
+        Index("ix_recording_transcript_search", "transcript_vector", postgresql_using="gin"),
+        # Reconciliador de transcripciones: solo las filas en curso (índice pequeño)
+        Index("ix_recording_processing", "updated_at", postgresql_where=text("status = 'processing'")),
     )
+
+
+# user_id de las filas del rollup para recordings sin usuario (la PK no admite NULL)
+NO_USER_ID = uuid.UUID(int=0)
+
+
+class RecordingDailyRollup(Base):
+    """
+    Agregado diario por (tenant, usuario, día, estado) que mantiene RecordingRepository
+    en la misma transacción que cada cambio de Recording. Lo lee el dashboard.
+    """
+    __tablename__ = "recording_daily_rollup"
+
+    tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenant.id", ondelete="CASCADE"), primary_key=True)
+    # Sin FK: al borrar un usuario sus filas pasan a NO_USER_ID, como sus recordings
+    # (user_id NULL); lo hace el trigger trg_app_user_rollup_forget (migración 0011)
+    user_id = Column(UUID(as_uuid=True), primary_key=True)
+    day = Column(Date, primary_key=True)
+    status = Column(String(30), primary_key=True)
+
+    recordings = Column(Integer, nullable=False, server_default="0")
+    duration_sum = Column(BigInteger, nullable=False, server_default="0")
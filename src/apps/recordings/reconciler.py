@@ -0,0 +1,282 @@
+# src/apps/recordings/reconciler.py
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from botocore.exceptions import ClientError
+from starlette.concurrency import run_in_threadpool
+
+from src.core.connections.database import get_data_access_layer
+from src.utils.metrics import Histogram, metrics_registry
+from .models import TRANSCRIBING
+from .repository import RecordingRepository
+from .services.recording_service import RecordingService
+from .services.transcription_service import TranscriptionService
+
+log = logging.getLogger(__name__)
+
+THROTTLING_CODES = {
+    "ThrottlingException", "Throttling", "LimitExceededException",
+    "TooManyRequestsException", "RequestLimitExceeded",
+}
+MAX_BACKOFF_SEC = 300.0
+MAX_ATTEMPTS = 5
+
+# Buckets en segundos: cuánto tardamos en enterarnos de un job terminado (eventos perdidos)
+DETECTION_LAG_BUCKETS_SEC = (30, 60, 120, 300, 600, 1800, 3600, 7200, 21600)
+
+# job_name -> (recording_id, created_at)
+Pending = Dict[str, Tuple[str, datetime]]
+
+
+class TranscriptionReconciler:
+    """
+    Red de seguridad del webhook de Transcribe: cada `interval_sec` busca recordings
+    en `processing` (sin cambios desde hace `grace_sec`) y resuelve su estado con
+    ListTranscriptionJobs por estado (100 jobs por llamada) en vez de un
+    GetTranscriptionJob por recording. Descarga los transcripts con concurrencia
+    acotada y retrocede de forma adaptativa cuando AWS limita la tasa.
+
+    Cada ciclo lee una página (`batch_size`) y el siguiente continúa donde quedó,
+    así que filas que no se resuelven no tapan a las demás. Las que superan
+    `max_age_sec` (job nunca creado o ya purgado de ListTranscriptionJobs) se
+    consultan una a una con GetTranscriptionJob y, si el job no existe, pasan a
+    `failed`; tampoco alargan el recorrido del listado.
+
+    Es idempotente: con varios workers la peor consecuencia es trabajo repetido.
+    """
+
+    def __init__(
+            self, *, interval_sec: float, grace_sec: float, concurrency: int, max_age_sec: float,
+            batch_size: int = 500, max_pages: int = 20,
+    ):
+        self.interval = interval_sec
+        self.grace = grace_sec
+        self.concurrency = concurrency
+        self.max_age = timedelta(seconds=max_age_sec)
+        self.batch_size = batch_size
+        self.max_pages = max_pages
+        self.recording_service = RecordingService(RecordingRepository())
+        self._transcription: Optional[TranscriptionService] = None
+        self._task: Optional[asyncio.Task] = None
+        self._cursor: Optional[str] = None
+
+        self._backoff = 0.0
+        self._cycles = 0
+        self._last_cycle_at: Optional[float] = None
+        self._last_cycle_ms = 0.0
+        self._pending = 0
+        self._oldest_pending_sec = 0.0
+        self._completed = 0
+        self._failed = 0
+        self._expired = 0
+        self._throttled = 0
+        self._errors = 0
+        self.detection_lag = Histogram(DETECTION_LAG_BUCKETS_SEC)
+        metrics_registry.register("transcription_reconciler", self.stats)
+
+    # -------------------------------------------------------------------
+    # Ciclo de vida (startup/shutdown de la app)
+    # -------------------------------------------------------------------
+    def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self) -> None:
+        while True:
+            # Jitter: los workers del mismo despliegue no consultan AWS a la vez
+            await asyncio.sleep(self.interval + self._backoff + random.uniform(0, self.interval * 0.1))
+            try:
+                await self.run_once()
+            except Exception:
+                self._errors += 1
+                log.exception("Transcription reconciler cycle failed")
+
+    # -------------------------------------------------------------------
+    # Un ciclo
+    # -------------------------------------------------------------------
+    async def run_once(self) -> None:
+        started = time.monotonic()
+        pending = await run_in_threadpool(self._load_pending)
+        self._pending = len(pending)
+        now = datetime.now(timezone.utc)
+        self._oldest_pending_sec = max(
+            ((now - created_at).total_seconds() for _, created_at in pending.values()), default=0.0
+        )
+
+        if pending:
+            if self._transcription is None:
+                self._transcription = await run_in_threadpool(TranscriptionService)
+            expired_before = now - self.max_age
+            recent = {name: v for name, v in pending.items() if v[1] >= expired_before}
+            old = [name for name, v in pending.items() if v[1] < expired_before]
+
+            completed, failed = await self._find_finished(recent) if recent else ([], [])
+            old_completed, old_failed = await self._check_old(old)
+            transcripts = await self._fetch_transcripts(completed + old_completed)
+            await run_in_threadpool(self._apply, pending, transcripts, failed + old_failed)
+
+        self._cycles += 1
+        self._last_cycle_at = time.time()
+        self._last_cycle_ms = (time.monotonic() - started) * 1000
+
+    def _load_pending(self) -> Pending:
+        """Página siguiente del backlog; tras la última se vuelve a empezar."""
+        updated_before = datetime.now(timezone.utc) - timedelta(seconds=self.grace)
+        with get_data_access_layer().session_scope() as db:
+            rows, self._cursor = RecordingRepository.list_processing(
+                db, updated_before=updated_before, cursor=self._cursor, limit=self.batch_size
+            )
+            return {TranscriptionService.job_name_for(r): (str(r.id), r.created_at) for r in rows}
+
+    async def _find_finished(self, pending: Pending) -> Tuple[List[dict], List[dict]]:
+        """Recorre ListTranscriptionJobs (COMPLETED y FAILED) hasta cubrir los pendientes."""
+        # Un job siempre se crea después que su recording: páginas más antiguas no aportan
+        oldest_created = min(created_at for _, created_at in pending.values())
+        found: Dict[str, List[dict]] = {"COMPLETED": [], "FAILED": []}
+        remaining = set(pending)
+
+        for status in found:
+            next_token = None
+            for _ in range(self.max_pages):
+                if not remaining:
+                    break
+                page = await self._call(self._transcription.list_jobs, status, next_token)
+                summaries = page.get("TranscriptionJobSummaries", [])
+                for summary in summaries:
+                    name = summary.get("TranscriptionJobName")
+                    if name in remaining:
+                        remaining.discard(name)
+                        found[status].append(summary)
+
+                next_token = page.get("NextToken")
+                creation_times = [s["CreationTime"] for s in summaries if s.get("CreationTime")]
+                if not next_token or (creation_times and min(creation_times) < oldest_created):
+                    break
+
+        return found["COMPLETED"], found["FAILED"]
+
+    async def _check_old(self, job_names: List[str]) -> Tuple[List[dict], List[dict]]:
+        """
+        GetTranscriptionJob para los pendientes de más de `max_age`: un job terminado
+        se aplica como los del listado; uno inexistente se da por fallido.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        completed: List[dict] = []
+        failed: List[dict] = []
+
+        async def check(name: str) -> None:
+            async with semaphore:
+                try:
+                    job = await self._call(self._transcription.get_job, name)
+                except Exception:
+                    self._errors += 1
+                    log.exception("Could not get transcription job %s", name)
+                    return
+            if job is None:
+                self._expired += 1
+                failed.append({"TranscriptionJobName": name, "FailureReason": "Transcription job not found"})
+            elif job.get("TranscriptionJobStatus") == "COMPLETED":
+                completed.append(job)
+            elif job.get("TranscriptionJobStatus") == "FAILED":
+                failed.append(job)
+
+        await asyncio.gather(*(check(name) for name in job_names))
+        return completed, failed
+
+    async def _fetch_transcripts(self, completed: List[dict]) -> List[Tuple[dict, str]]:
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def fetch(summary: dict) -> Optional[Tuple[dict, str]]:
+            async with semaphore:
+                try:
+                    text = await self._call(self._transcription.fetch_transcript, summary["TranscriptionJobName"])
+                    return summary, text
+                except Exception:
+                    self._errors += 1
+                    log.exception("Could not fetch transcript for %s", summary["TranscriptionJobName"])
+                    return None
+
+        results = await asyncio.gather(*(fetch(s) for s in completed))
+        return [r for r in results if r is not None]
+
+    def _apply(self, pending: Pending, transcripts: List[Tuple[dict, str]], failed: List[dict]) -> None:
+        now = datetime.now(timezone.utc)
+        with get_data_access_layer().session_scope() as db:
+            for summary, text in transcripts:
+                recording = self._still_processing(db, pending, summary)
+                if recording and self.recording_service.set_transcript(
+                        db, recording, text, only_from=TRANSCRIBING
+                ):
+                    self._completed += 1
+                    self._observe_lag(summary, now)
+
+            for summary in failed:
+                recording = self._still_processing(db, pending, summary)
+                reason = summary.get("FailureReason") or "Transcription failed"
+                if recording and self.recording_service.update_status(
+                        db, recording, "failed", error_message=reason, only_from=TRANSCRIBING
+                ):
+                    self._failed += 1
+                    self._observe_lag(summary, now)
+
+    def _still_processing(self, db, pending: Pending, summary: dict):
+        """
+        Filtro barato sin bloqueo; la escritura vuelve a comprobarlo con la fila
+        bloqueada (only_from), porque el webhook puede cerrarlo entre medias.
+        """
+        recording_id, _ = pending[summary["TranscriptionJobName"]]
+        recording = self.recording_service.get(db, recording_id)
+        return recording if recording and recording.status == "processing" else None
+
+    def _observe_lag(self, summary: dict, now: datetime) -> None:
+        completion = summary.get("CompletionTime")
+        if completion:
+            self.detection_lag.observe((now - completion).total_seconds())
+
+    # -------------------------------------------------------------------
+    # Backoff adaptativo
+    # -------------------------------------------------------------------
+    async def _call(self, fn, *args):
+        """
+        Llama a AWS en el threadpool. Con throttling duplica el backoff (que también
+        alarga el intervalo entre ciclos) y reintenta; cada éxito lo reduce a la mitad.
+        """
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            try:
+                result = await run_in_threadpool(fn, *args)
+                self._backoff = self._backoff / 2 if self._backoff > 1 else 0.0
+                return result
+            except ClientError as e:
+                if e.response.get("Error", {}).get("Code") not in THROTTLING_CODES or attempt == MAX_ATTEMPTS:
+                    raise
+                self._throttled += 1
+                self._backoff = min(MAX_BACKOFF_SEC, max(1.0, self._backoff * 2))
+                await asyncio.sleep(self._backoff * random.uniform(0.5, 1.0))
+
+    def stats(self) -> dict:
+        return {
+            "interval_sec": self.interval,
+            "cycles": self._cycles,
+            "last_cycle_at": self._last_cycle_at,
+            "last_cycle_ms": round(self._last_cycle_ms, 3),
+            "pending": self._pending,
+            "oldest_pending_sec": round(self._oldest_pending_sec, 1),
+            "reconciled_completed": self._completed,
+            "reconciled_failed": self._failed,
+            "expired_not_found": self._expired,
+            "throttled": self._throttled,
+            "errors": self._errors,
+            "backoff_sec": round(self._backoff, 3),
+            "detection_lag_sec": self.detection_lag.snapshot(),
+        }
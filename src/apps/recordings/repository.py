@@ -1,7 +1,13 @@
-from typing import Sequence, Optional, Tuple
-from sqlalchemy import select, func
+from typing import List, Sequence, Optional, Tuple
+from datetime import date, datetime, timedelta
+from sqlalchemy import insert, select, func, and_, true, Select, Row
 from sqlalchemy.orm import Session
-from .models import Recording
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.utils.pagination import apply_keyset, split_page
+from src.utils.search import ts_headline, ts_query
+from src.utils.totals import TotalCount, count_cache, resolve_total
+from .models import Recording, RecordingDailyRollup
+from . import rollup
 
 
 class RecordingRepository:
@@ -11,8 +17,21 @@ class RecordingRepository:
         db.add(r)
         db.flush()
         db.refresh(r)
+        rollup.apply_change(db, r, None, rollup.state_of(r))
+        count_cache.invalidate_on_commit(db, "recording", r.tenant_id)
         return r
 
+    @staticmethod
+    def create_many(db: Session, rows: List[dict]) -> Sequence[Recording]:
+        """Inserción masiva (un INSERT ... RETURNING) con un único upsert del rollup."""
+        if not rows:
+            return []
+        recordings = db.scalars(insert(Recording).returning(Recording), rows).all()
+        rollup.apply_created(db, recordings)
+        for tenant_id in {r.tenant_id for r in recordings}:
+            count_cache.invalidate_on_commit(db, "recording", tenant_id)
+        return recordings
+
     @staticmethod
     def get_by_unique(
             db: Session,
@@ -32,47 +51,182 @@ class RecordingRepository:
             )
         ).scalar_one_or_none()
 
-    @staticmethod
-    def list_by_tenant(
-            db: Session, tenant_id, *, q: Optional[str] = None, status: Optional[str] = None,
-            page: int = 1, page_size: int = 50
-    ) -> Tuple[Sequence[Recording], int]:
-        stmt = select(Recording).where(Recording.tenant_id == tenant_id)
-        if status:
-            stmt = stmt.where(Recording.status == status)
-        if q:
-            # búsqueda simple por key
-            stmt = stmt.where(Recording.key.ilike(f"%{q}%"))
-
-        count_stmt = select(func.count()).select_from(stmt.subquery())
-        total = db.execute(count_stmt).scalar_one()
-
-        offset = (page - 1) * page_size
-        rows = db.execute(
-            stmt.order_by(Recording.created_at.desc()).offset(offset).limit(page_size)
-        ).scalars().all()
-        return rows, total
-
     @staticmethod
     def get_by_id(db: Session, recording_id: str) -> Recording | None:
         r = db.get(Recording, recording_id)
         return r
 
     @staticmethod
-    def set_status(db: Session, recording: Recording, status: str, error_message: str | None = None) -> Recording:
+    def list_processing(
+            db: Session, *, updated_before: datetime, cursor: Optional[str] = None, limit: int = 500
+    ) -> Tuple[Sequence[Recording], Optional[str]]:
+        """
+        Una página de recordings en `processing` sin cambios desde `updated_before`
+        (usa ix_recording_processing), por keyset (updated_at, id). Devuelve
+        (rows, next_cursor); next_cursor es None en la última página.
+        """
+        stmt = apply_keyset(
+            select(Recording).where(Recording.status == "processing", Recording.updated_at < updated_before),
+            PROCESSING_KEYS, cursor=cursor, page_size=limit, descending=False,
+        )
+        return split_page(db.execute(stmt).scalars().all(), PROCESSING_KEYS, limit)
+
+    @staticmethod
+    def lock_for_update(
+            db: Session, recording: Recording, only_from: Optional[Sequence[str]] = None
+    ) -> Optional[Recording]:
+        """
+        Relee el Recording con SELECT ... FOR UPDATE (hasta el commit) para que el delta
+        del rollup salga del estado real y no del leído antes. Con `only_from`, None si
+        el estado ya no es uno de esos (otro camino lo cambió: webhook, reconciliador
+        o consulta de estado); None también si el Recording ya no existe.
+        """
+        locked = db.get(Recording, recording.id, with_for_update=True, populate_existing=True)
+        if locked is None or (only_from is not None and locked.status not in only_from):
+            return None
+        return locked
+
+    @staticmethod
+    def set_status(
+            db: Session, recording: Recording, status: str, error_message: str | None = None,
+            *, only_from: Optional[Sequence[str]] = None
+    ) -> Optional[Recording]:
+        recording = RecordingRepository.lock_for_update(db, recording, only_from)
+        if recording is None:
+            return None
+        before = rollup.state_of(recording)
         recording.status = status
         recording.error_message = error_message
         db.flush()
+        rollup.apply_change(db, recording, before, rollup.state_of(recording))
+        count_cache.invalidate_on_commit(db, "recording", recording.tenant_id)
         db.refresh(recording)
         return recording
 
     @staticmethod
-    def attach_transcript(db: Session, recording: Recording, transcript_text: str,
-                          duration_sec: int | None = None) -> Recording:
+    def attach_transcript(
+            db: Session, recording: Recording, transcript_text: str, duration_sec: int | None = None,
+            *, only_from: Optional[Sequence[str]] = None
+    ) -> Optional[Recording]:
+        recording = RecordingRepository.lock_for_update(db, recording, only_from)
+        if recording is None:
+            return None
+        before = rollup.state_of(recording)
         recording.transcript_text = transcript_text
         if duration_sec is not None:
             recording.duration_sec = duration_sec
         recording.status = "completed"
         db.flush()
+        rollup.apply_change(db, recording, before, rollup.state_of(recording))
+        count_cache.invalidate_on_commit(db, "recording", recording.tenant_id)
         db.refresh(recording)
         return recording
+
+
+# Orden de listados: más recientes primero (usa ix_recording_tenant_created)
+RECORDING_LIST_KEYS = (Recording.created_at, Recording.id)
+# Reconciliador: de más antiguo a más reciente (usa ix_recording_processing)
+PROCESSING_KEYS = (Recording.updated_at, Recording.id)
+
+
+def _list_stmt(tenant_id, *, q: Optional[str] = None, status: Optional[str] = None) -> Select:
+    stmt = select(Recording).where(Recording.tenant_id == tenant_id)
+    if status:
+        stmt = stmt.where(Recording.status == status)
+    if q:
+        # búsqueda simple por key
+        stmt = stmt.where(Recording.key.ilike(f"%{q}%"))
+    return stmt
+
+
+class AsyncRecordingRepository:
+    """Lecturas de Recording sobre AsyncSession (asyncpg)."""
+
+    @staticmethod
+    async def list_by_tenant(
+            db: AsyncSession, tenant_id, *, q: Optional[str] = None, status: Optional[str] = None,
+            page: int = 1, page_size: int = 50, count: str = "auto"
+    ) -> Tuple[Sequence[Recording], Optional[TotalCount]]:
+        stmt = _list_stmt(tenant_id, q=q, status=status)
+
+        total = await resolve_total(
+            db, stmt, scope="recording", tenant_id=tenant_id, filters={"q": q, "status": status}, mode=count
+        )
+
+        offset = (page - 1) * page_size
+        rows = (await db.execute(
+            stmt.order_by(Recording.created_at.desc(), Recording.id.desc()).offset(offset).limit(page_size)
+        )).scalars().all()
+        return rows, total
+
+    @staticmethod
+    async def list_by_tenant_keyset(
+            db: AsyncSession, tenant_id, *, q: Optional[str] = None, status: Optional[str] = None,
+            cursor: Optional[str] = None, page_size: int = 50
+    ) -> Tuple[Sequence[Recording], Optional[str]]:
+        """Página por keyset sobre (created_at, id): coste O(page) sin OFFSET ni count."""
+        stmt = apply_keyset(
+            _list_stmt(tenant_id, q=q, status=status), RECORDING_LIST_KEYS,
+            cursor=cursor, page_size=page_size, descending=True,
+        )
+        rows = (await db.execute(stmt)).scalars().all()
+        return split_page(rows, RECORDING_LIST_KEYS, page_size)
+
+    @staticmethod
+    async def get_by_id(db: AsyncSession, recording_id: str) -> Recording | None:
+        return await db.get(Recording, recording_id)
+
+    @staticmethod
+    async def dashboard_counts(db: AsyncSession, tenant_id, user_id=None, *, today: date) -> Row:
+        """
+        Métricas del dashboard desde recording_daily_rollup (una fila por usuario/día/estado),
+        con `sum(...) FILTER (...)` en una sola consulta. Las del usuario llevan `user_id`
+        dentro del FILTER; tiempo ahorrado y tendencias son del tenant completo.
+        Ventanas de tendencia por días completos: (hoy-30, hoy] y (hoy-60, hoy-30].
+        """
+        r = RecordingDailyRollup
+        mine = r.user_id == user_id if user_id else true()
+        completed = r.status == "completed"
+
+        def total(column, condition):
+            return func.coalesce(func.sum(column).filter(condition), 0)
+
+        stmt = select(
+            total(r.recordings, and_(mine, completed, r.day == today)).label("today_documents"),
+            total(r.recordings, mine).label("processed_total"),
+            total(r.recordings, and_(mine, r.status.in_(["uploaded", "processing"]))).label("pending"),
+            total(r.duration_sum, completed).label("time_saved_sec"),
+            total(r.recordings, and_(completed, r.day > today - timedelta(days=30))).label("last_30_days"),
+            total(
+                r.recordings,
+                and_(completed, r.day > today - timedelta(days=60), r.day <= today - timedelta(days=30)),
+            ).label("previous_30_days"),
+        ).where(r.tenant_id == tenant_id)
+        return (await db.execute(stmt)).one()
+
+    @staticmethod
+    async def search_transcripts(
+            db: AsyncSession, tenant_id, q: str, *, limit: int = 20, offset: int = 0
+    ) -> Sequence[Row]:
+        """
+        Búsqueda por relevancia en transcripciones con fragmentos resaltados.
+        Proyección compacta (sin `transcript_text`); ts_headline solo para la página.
+        """
+        query = ts_query(q)
+        rank = func.ts_rank_cd(Recording.transcript_vector, query).label("rank")
+
+        page = select(
+            Recording.id, Recording.key, Recording.status, Recording.duration_sec,
+            Recording.created_at, Recording.transcript_text, rank,
+        ).where(
+            Recording.tenant_id == tenant_id,
+            Recording.transcript_vector.op("@@")(query),
+        ).order_by(rank.desc(), Recording.created_at.desc()).limit(limit).offset(offset).subquery()
+
+        snippet = ts_headline(page.c.transcript_text, query).label("snippet")
+        return (await db.execute(
+            select(
+                page.c.id, page.c.key, page.c.status, page.c.duration_sec,
+                page.c.created_at, page.c.rank, snippet,
+            ).order_by(page.c.rank.desc(), page.c.created_at.desc())
+        )).all()
@@ -0,0 +1,150 @@
+# src/apps/recordings/rollup.py
+"""
+Mantenimiento de recording_daily_rollup.
+
+Los deltas se aplican desde RecordingRepository en la misma transacción que el
+cambio del Recording; el borrado de un usuario lo cubre un trigger de la DB
+(migración 0011), que mueve sus filas a NO_USER_ID. `rebuild` recalcula desde
+`recording` (backfill inicial o reparación si el rollup se desincroniza, p.ej.
+usuarios borrados antes de la migración 0011 o tablas creadas con create_all):
+
+    python -m src.apps.recordings.rollup [--tenant <uuid>]
+"""
+import argparse
+import logging
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import Date, cast, delete, func, literal, select, text
+from sqlalchemy.dialects.postgresql import UUID, insert
+from sqlalchemy.orm import Session
+
+from src.core.config.config import env
+from .models import NO_USER_ID, Recording, RecordingDailyRollup
+
+log = logging.getLogger(__name__)
+
+# Lo que del Recording cuenta para el rollup: (status, duration_sec)
+RollupState = Tuple[str, Optional[int]]
+
+_PK = ("tenant_id", "user_id", "day", "status")
+
+
+@lru_cache(maxsize=1)
+def dashboard_tz() -> ZoneInfo:
+    return ZoneInfo(env.DASHBOARD_TZ)
+
+
+def local_day(ts: datetime) -> date:
+    """Día del rollup (y del dashboard) en DASHBOARD_TZ."""
+    return ts.astimezone(dashboard_tz()).date()
+
+
+def state_of(recording: Recording) -> RollupState:
+    return recording.status, recording.duration_sec
+
+
+def apply_change(
+        db: Session, recording: Recording, before: Optional[RollupState], after: Optional[RollupState]
+) -> None:
+    """
+    Mueve el Recording de la fila `before` a la fila `after` del rollup
+    (None = no existía / ya no existe) con un upsert de deltas.
+    """
+    if before == after:
+        return
+
+    deltas: Dict[tuple, Tuple[int, int]] = {}
+    if before is not None:
+        _add(deltas, _row_key(recording, before[0]), -1, -(before[1] or 0))
+    if after is not None:
+        _add(deltas, _row_key(recording, after[0]), 1, after[1] or 0)
+    _upsert(db, deltas)
+
+
+def apply_created(db: Session, recordings: Iterable[Recording]) -> None:
+    """Alta de varios Recordings (inserción masiva): un único upsert con los deltas agregados."""
+    deltas: Dict[tuple, Tuple[int, int]] = {}
+    for recording in recordings:
+        status, duration = state_of(recording)
+        _add(deltas, _row_key(recording, status), 1, duration or 0)
+    _upsert(db, deltas)
+
+
+def _row_key(recording: Recording, status: str) -> tuple:
+    return recording.tenant_id, recording.user_id or NO_USER_ID, local_day(recording.created_at), status
+
+
+def _add(deltas: Dict[tuple, Tuple[int, int]], key: tuple, count: int, duration: int) -> None:
+    prev_count, prev_duration = deltas.get(key, (0, 0))
+    deltas[key] = (prev_count + count, prev_duration + duration)
+
+
+def _upsert(db: Session, deltas: Dict[tuple, Tuple[int, int]]) -> None:
+    # Orden estable de filas: dos transacciones que tocan las mismas no se bloquean en cruz
+    rows = [
+        {**dict(zip(_PK, key)), "recordings": count, "duration_sum": duration}
+        for key, (count, duration) in sorted(deltas.items())
+        if (count, duration) != (0, 0)
+    ]
+    if not rows:
+        return
+
+    stmt = insert(RecordingDailyRollup).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(_PK),
+        set_={
+            "recordings": RecordingDailyRollup.recordings + stmt.excluded.recordings,
+            "duration_sum": RecordingDailyRollup.duration_sum + stmt.excluded.duration_sum,
+        },
+    )
+    db.execute(stmt)
+
+
+def rebuild(db: Session, tenant_id: Optional[str] = None) -> int:
+    """
+    Recalcula el rollup (de un tenant o completo) agregando `recording`.
+    El LOCK hace esperar a las transacciones que ya aplicaron deltas y bloquea las
+    nuevas hasta el commit, así que no se pierden ni duplican cambios concurrentes.
+    """
+    db.execute(text("LOCK TABLE recording_daily_rollup IN SHARE ROW EXCLUSIVE MODE"))
+
+    purge = delete(RecordingDailyRollup)
+    if tenant_id:
+        purge = purge.where(RecordingDailyRollup.tenant_id == tenant_id)
+    db.execute(purge)
+
+    day = cast(func.timezone(env.DASHBOARD_TZ, Recording.created_at), Date)
+    user_id = func.coalesce(Recording.user_id, literal(NO_USER_ID, UUID(as_uuid=True)))
+    aggregate = select(
+        Recording.tenant_id, user_id, day, Recording.status,
+        func.count(), func.coalesce(func.sum(Recording.duration_sec), 0),
+    ).group_by(Recording.tenant_id, user_id, day, Recording.status)
+    if tenant_id:
+        aggregate = aggregate.where(Recording.tenant_id == tenant_id)
+
+    result = db.execute(
+        insert(RecordingDailyRollup).from_select(
+            [*_PK, "recordings", "duration_sum"], aggregate
+        )
+    )
+    return result.rowcount
+
+
+def main() -> None:
+    from src.core.connections.database import get_data_access_layer
+
+    parser = argparse.ArgumentParser(description="Backfill/reparación de recording_daily_rollup")
+    parser.add_argument("--tenant", help="UUID del tenant (por defecto, todos)")
+    args = parser.parse_args()
+
+    with get_data_access_layer().session_scope() as db:
+        rows = rebuild(db, args.tenant)
+    log.info("recording_daily_rollup reconstruido: %s filas (tenant=%s)", rows, args.tenant or "todos")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -29,6 +29,18 @@ class RecordingOut(BaseModel):
     updated_at: datetime
 
 
+class RecordingSearchHit(BaseModel):
+    """Resultado de búsqueda: sin `transcript_text`, solo el fragmento resaltado."""
+    model_config = ConfigDict(from_attributes=True)
+    id: UUID
+    key: str
+    status: str
+    duration_sec: Optional[int]
+    created_at: datetime
+    rank: float
+    snippet: str
+
+
 class RecordingUpdateStatus(BaseModel):
     status: str = Field(..., pattern="^(uploaded|processing|completed|failed)$")
     error_message: str | None = None
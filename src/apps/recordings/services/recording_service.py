@@ -1,18 +1,24 @@
 # src/apps/recordings/services/recording_service.py
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import select, func, cast, Date  # Importamos Date para comparación
-from datetime import datetime, timedelta, date
+from datetime import datetime
+from src.core.connections.database import released_connection
 from src.apps.tenant.models import Tenant
 from src.apps.users.models import User
-from ..repository import RecordingRepository
-from ..models import Recording
+from src.utils.pagination import next_cursor_for
+from ..cache import transcription_status_cache, transcription_status_flight
+from ..rollup import dashboard_tz
+from .transcription_service import TranscriptionService
+from ..repository import RecordingRepository, AsyncRecordingRepository, RECORDING_LIST_KEYS
+from ..models import Recording, TRANSCRIBING
 from typing import Sequence, Tuple
 
 
 class RecordingService:
-    def __init__(self, repo: RecordingRepository):
+    def __init__(self, repo: RecordingRepository, async_repo: AsyncRecordingRepository | None = None):
         self.repo = repo
+        self.async_repo = async_repo or AsyncRecordingRepository()
 
     # [Mantener métodos register_upload, list, get, update_status, set_transcript intactos]
     def register_upload(
@@ -44,96 +50,143 @@ class RecordingService:
                 return existing
             raise
 
-    def list(
+    def register_uploads(
+            self, db: Session, *, tenant: Tenant, user: User, bucket: str, items: Sequence[dict]
+    ) -> Sequence[Recording]:
+        """
+        Pre-registra varios audios de una vez (presign por lotes). Cada item trae
+        key, content_type y size_bytes; las keys son nuevas, así que no hay duplicados.
+        """
+        return self.repo.create_many(db, [
+            {
+                "tenant_id": tenant.id,
+                "user_id": user.id if user else None,
+                "bucket": bucket,
+                "key": item["key"],
+                "content_type": item["content_type"],
+                "size_bytes": item.get("size_bytes"),
+                "status": "uploaded",
+            }
+            for item in items
+        ])
+
+    async def list(
             self,
-            db: Session,
+            db: AsyncSession,
             *,
             tenant: Tenant,
             q=None,
             status=None,
             page=1,
-            page_size=50
+            page_size=50,
+            cursor=None,
+            count="auto",
     ):
-        return self.repo.list_by_tenant(
+        """
+        Devuelve (rows, total, next_cursor). Con `cursor` (aunque sea "") pagina por
+        keyset y no calcula el total; sin él mantiene page/page_size para clientes antiguos.
+        """
+        if cursor is not None:
+            rows, next_cursor = await self.async_repo.list_by_tenant_keyset(
+                db, tenant.id, q=q, status=status, cursor=cursor, page_size=page_size,
+            )
+            return rows, None, next_cursor
+
+        rows, total = await self.async_repo.list_by_tenant(
             db,
             tenant.id,
             q=q,
             status=status,
             page=page,
             page_size=page_size,
+            count=count,
+        )
+        return rows, total, next_cursor_for(rows, RECORDING_LIST_KEYS, page_size)
+
+    async def search_transcripts(self, db: AsyncSession, *, tenant: Tenant, q: str, page=1, page_size=20):
+        return await self.async_repo.search_transcripts(
+            db, tenant.id, q, limit=page_size, offset=(page - 1) * page_size
         )
 
     def get(self, db: Session, recording_id: str) -> Recording | None:
         return self.repo.get_by_id(db, recording_id)
 
     def update_status(self, db: Session, recording: Recording, status: str,
-                      error_message: str | None = None) -> Recording:
-        return self.repo.set_status(db, recording, status, error_message)
+                      error_message: str | None = None, *, only_from: Sequence[str] | None = None
+                      ) -> Recording | None:
+        """
+        Cambia el estado con el Recording bloqueado. `only_from`: solo si sigue en uno de
+        esos estados (None si no; nada cambia). Lo usan los caminos que compiten por
+        cerrar una transcripción (webhook, reconciliador, consulta de estado).
+        """
+        if status == "processing":
+            # Nuevo job: descarta el estado cacheado del anterior
+            transcription_status_cache.invalidate(str(recording.id))
+        return self.repo.set_status(db, recording, status, error_message, only_from=only_from)
 
     def set_transcript(self, db: Session, recording: Recording, transcript_text: str,
-                       duration_sec: int | None = None) -> Recording:
-        return self.repo.attach_transcript(db, recording, transcript_text, duration_sec)
-
-    def get_dashboard_metrics(self, db: Session, tenant_id: str, user_id: str = None) -> dict:
+                       duration_sec: int | None = None, *, only_from: Sequence[str] | None = None
+                       ) -> Recording | None:
+        return self.repo.attach_transcript(db, recording, transcript_text, duration_sec, only_from=only_from)
+
+    def get_transcription_status(
+            self, db: Session, recording: Recording, transcription_service: TranscriptionService
+    ) -> dict:
+        """
+        Estado de la transcripción sin llamar a AWS salvo que haga falta:
+          1. Estados terminales (y 'uploaded') se responden desde la BD.
+          2. Jobs en curso: cache TTL corto por recording.
+          3. Al expirar, una sola llamada a AWS por recording aunque consulten varios
+             clientes a la vez (single-flight); quien la hace persiste el resultado.
+        """
+        from_db = self._status_from_db(recording)
+        if from_db is not None:
+            return from_db
+
+        key = str(recording.id)
+        cached = transcription_status_cache.get(key)
+        if cached is not None:
+            return dict(cached)
+
+        def fetch() -> dict:
+            version = transcription_status_cache.version(key)
+            with released_connection(db):
+                result = transcription_service.get_transcription_status(recording)
+            # Solo si nadie lo cerró mientras tanto (webhook, reconciliador, otro worker)
+            if result["transcription_status"] == "COMPLETED" and result["transcript_text"]:
+                self.set_transcript(db, recording, result["transcript_text"], only_from=TRANSCRIBING)
+            elif result["transcription_status"] == "FAILED":
+                self.update_status(db, recording, "failed", error_message=result["error"], only_from=TRANSCRIBING)
+            transcription_status_cache.set(key, result, version)
+            return result
+
+        return dict(transcription_status_flight.do(key, fetch))
+
+    @staticmethod
+    def _status_from_db(recording: Recording) -> dict | None:
+        if recording.status == "completed" and recording.transcript_text:
+            return {"transcription_status": "COMPLETED", "transcript_text": recording.transcript_text, "error": None}
+        if recording.status == "failed":
+            return {"transcription_status": "FAILED", "transcript_text": None, "error": recording.error_message}
+        if recording.status == "uploaded":
+            # Sin job iniciado: /transcribe pasa el recording a 'processing'
+            return {"transcription_status": "NOT_STARTED", "transcript_text": None, "error": None}
+        return None
+
+    async def get_dashboard_metrics(self, db: AsyncSession, tenant_id: str, user_id: str = None) -> dict:
         """Obtiene métricas reales para el dashboard"""
 
-        base_query_completed_count = select(func.count(Recording.id)).where(
-            Recording.tenant_id == tenant_id,
-            Recording.status == 'completed'
-        )
-        base_query_total_count = select(func.count(Recording.id)).where(Recording.tenant_id == tenant_id)
-
-        # Filtro por usuario (si aplica)
-        if user_id:
-            base_query_completed_count = base_query_completed_count.where(Recording.user_id == user_id)
-            base_query_total_count = base_query_total_count.where(Recording.user_id == user_id)
-
-        # Métrica: Documentos generados (completados) - Hoy
-        today = datetime.now().date()
-
-        # CORRECCIÓN 1: Usamos la función de CAST para comparar solo la fecha de la columna TIMESTAMP
-        today_documents = db.execute(
-            base_query_completed_count.where(cast(Recording.created_at, Date) == today)
-        ).scalar_one_or_none() or 0
-
-        # Métrica: Dictados procesados (todos los estados) - Total
-        processed_total = db.execute(base_query_total_count).scalar_one_or_none() or 0
-
-        # Métrica: Dictados pendientes de revisión (status = 'uploaded' o 'processing')
-        pending_count = db.execute(
-            base_query_total_count.where(Recording.status.in_(['uploaded', 'processing']))
-        ).scalar_one_or_none() or 0
-
-        # Tiempo ahorrado (suma de duración) - Total
-        time_saved_sec = db.execute(
-            select(func.coalesce(func.sum(Recording.duration_sec), 0))
-            .where(Recording.tenant_id == tenant_id, Recording.status == 'completed')
-        ).scalar_one_or_none() or 0
+        # "Hoy" en la zona del rollup (DASHBOARD_TZ)
+        today = datetime.now(dashboard_tz()).date()
 
+        counts = await self.async_repo.dashboard_counts(db, tenant_id, user_id, today=today)
+        today_documents = counts.today_documents
+        processed_total = counts.processed_total
+        pending_count = counts.pending
+        time_saved_sec = int(counts.time_saved_sec)
         # Calcular tendencias (vs últimos 30 días)
-        thirty_days_ago = datetime.now() - timedelta(days=30)
-        sixty_days_ago = datetime.now() - timedelta(days=60)
-
-        # Documentos completados en los últimos 30 días (CURRENT period)
-        last_30_days_completed = db.execute(
-            select(func.count(Recording.id))
-            .where(
-                Recording.tenant_id == tenant_id,
-                Recording.status == 'completed',
-                Recording.created_at >= thirty_days_ago  # >= 30 días atrás
-            )
-        ).scalar_one_or_none() or 0
-
-        # Documentos completados en los 30 días anteriores (PREVIOUS period)
-        previous_30_days_completed = db.execute(
-            select(func.count(Recording.id))
-            .where(
-                Recording.tenant_id == tenant_id,
-                Recording.status == 'completed',
-                Recording.created_at >= sixty_days_ago,  # >= 60 días atrás
-                Recording.created_at < thirty_days_ago  # < 30 días atrás
-            )
-        ).scalar_one_or_none() or 0
+        last_30_days_completed = counts.last_30_days
+        previous_30_days_completed = counts.previous_30_days
 
         # Pacientes (proxy)
         patients_count = today_documents
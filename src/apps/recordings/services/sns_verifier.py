@@ -0,0 +1,103 @@
+# src/apps/recordings/services/sns_verifier.py
+import base64
+import logging
+import re
+import threading
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from cachetools import TTLCache
+from cryptography import x509
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import padding
+
+logger = logging.getLogger(__name__)
+
+# Solo certificados servidos por SNS (https://sns.<region>.amazonaws.com[.cn]/....pem)
+_CERT_HOST = re.compile(r"^sns\.[a-z0-9-]+\.amazonaws\.com(\.cn)?$")
+
+# Campos firmados, en el orden que exige SNS
+_SIGNED_FIELDS = {
+    "Notification": ("Message", "MessageId", "Subject", "Timestamp", "TopicArn", "Type"),
+    "SubscriptionConfirmation": ("Message", "MessageId", "SubscribeURL", "Timestamp", "Token", "TopicArn", "Type"),
+    "UnsubscribeConfirmation": ("Message", "MessageId", "SubscribeURL", "Timestamp", "Token", "TopicArn", "Type"),
+}
+_HASHES = {"1": hashes.SHA1, "2": hashes.SHA256}
+
+
+class SnsVerificationError(Exception):
+    pass
+
+
+class SnsMessageVerifier:
+    """
+    Verifica la firma de mensajes HTTP(S) de Amazon SNS.
+    Los certificados se descargan una vez y quedan en cache (rotan con poca frecuencia).
+    """
+
+    def __init__(self, *, allowed_topic_arns: tuple = (), cert_ttl: float = 24 * 3600, timeout: float = 5.0):
+        self.allowed_topic_arns = tuple(allowed_topic_arns)
+        self.timeout = timeout
+        self._certs: TTLCache = TTLCache(maxsize=16, ttl=cert_ttl)
+        self._lock = threading.Lock()
+
+    def verify(self, message: Dict) -> None:
+        msg_type = message.get("Type")
+        fields = _SIGNED_FIELDS.get(msg_type)
+        if fields is None:
+            raise SnsVerificationError(f"Unsupported SNS message type: {msg_type}")
+
+        topic_arn = message.get("TopicArn")
+        if self.allowed_topic_arns and topic_arn not in self.allowed_topic_arns:
+            raise SnsVerificationError(f"Topic not allowed: {topic_arn}")
+
+        hash_cls = _HASHES.get(str(message.get("SignatureVersion")))
+        if hash_cls is None:
+            raise SnsVerificationError("Unsupported SignatureVersion")
+
+        canonical = "".join(
+            f"{name}\n{message[name]}\n" for name in fields if message.get(name) is not None
+        ).encode("utf-8")
+
+        try:
+            signature = base64.b64decode(message["Signature"])
+        except (KeyError, ValueError):
+            raise SnsVerificationError("Missing or malformed Signature")
+
+        certificate = self._certificate(message.get("SigningCertURL") or "")
+        try:
+            certificate.public_key().verify(signature, canonical, padding.PKCS1v15(), hash_cls())
+        except InvalidSignature:
+            raise SnsVerificationError("Invalid SNS signature")
+
+    def confirm_subscription(self, message: Dict) -> None:
+        """Confirma la suscripción visitando SubscribeURL (solo tras `verify`)."""
+        url = message.get("SubscribeURL") or ""
+        self._check_aws_url(url)
+        requests.get(url, timeout=self.timeout).raise_for_status()
+        logger.info("SNS subscription confirmed for %s", message.get("TopicArn"))
+
+    def _certificate(self, url: str) -> x509.Certificate:
+        self._check_aws_url(url)
+        if not urlparse(url).path.endswith(".pem"):
+            raise SnsVerificationError("SigningCertURL is not a .pem")
+
+        with self._lock:
+            cached: Optional[x509.Certificate] = self._certs.get(url)
+        if cached is not None:
+            return cached
+
+        response = requests.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        certificate = x509.load_pem_x509_certificate(response.content)
+        with self._lock:
+            self._certs[url] = certificate
+        return certificate
+
+    @staticmethod
+    def _check_aws_url(url: str) -> None:
+        parsed = urlparse(url)
+        if parsed.scheme != "https" or not _CERT_HOST.match(parsed.hostname or ""):
+            raise SnsVerificationError(f"Untrusted SNS URL: {url}")
@@ -1,27 +1,32 @@
 # src/apps/recordings/services/transcription_service.py
-import boto3
 import json
 import os
 import logging
+import uuid
 from typing import Optional, Dict
 from botocore.exceptions import BotoCoreError, ClientError
 from sqlalchemy.orm import Session
+from src.core.connections.aws import AwsClientRegistry, get_aws_clients, is_credential_error
 from ..models import Recording
 
 logger = logging.getLogger(__name__)
 
+JOB_NAME_PREFIX = "transcribe"
+
 
 class TranscriptionService:
-    def __init__(self):
+    def __init__(self, clients: AwsClientRegistry | None = None):
         self.region = os.getenv('AWS_REGION')
         self.bucket_name = os.getenv('S3_BUCKET_AUDIO')
 
         if not self.region or not self.bucket_name:
             raise ValueError("AWS_REGION y S3_BUCKET_AUDIO deben estar configurados")
 
+        # Clientes compartidos del proceso (no se crean por request)
+        self.clients = clients or get_aws_clients()
         try:
-            self.transcribe_client = boto3.client('transcribe', region_name=self.region)
-            self.s3_client = boto3.client('s3', region_name=self.region)
+            self.transcribe_client = self.clients.client('transcribe')
+            self.s3_client = self.clients.client('s3')
         except Exception as e:
             logger.error(f"Error inicializando clientes AWS: {e}")
             raise
@@ -34,8 +39,7 @@ class TranscriptionService:
         """Inicia un trabajo de transcripción en AWS Transcribe"""
         try:
             # Generar nombre único para el job
-            job_name = f"transcribe-{recording.id}-{int(recording.created_at.timestamp())}"
-            job_name = job_name.replace('-', '')[:200]  # Limitar longitud y quitar guiones
+            job_name = self.job_name_for(recording)
 
             # Verificar que no exista un job con el mismo nombre
             try:
@@ -70,13 +74,13 @@ class TranscriptionService:
 
         except (BotoCoreError, ClientError) as e:
             logger.error(f"Error starting transcription job: {e}")
+            self._reset_if_credentials(e)
             return False
 
     def get_transcription_status(self, recording: Recording) -> Dict:
         """Obtiene el estado y resultado de la transcripción"""
         try:
-            job_name = f"transcribe-{recording.id}-{int(recording.created_at.timestamp())}"
-            job_name = job_name.replace('-', '')[:200]
+            job_name = self.job_name_for(recording)
 
             # Obtener estado del job desde Transcribe
             response = self.transcribe_client.get_transcription_job(
@@ -87,16 +91,8 @@ class TranscriptionService:
 
             if job_status == 'COMPLETED':
                 # Leer el archivo JSON de resultados desde S3
-                transcript_key = f"transcripts/{job_name}.json"
-
                 try:
-                    transcript_obj = self.s3_client.get_object(
-                        Bucket=self.bucket_name,
-                        Key=transcript_key
-                    )
-                    transcript_data = json.loads(transcript_obj['Body'].read().decode('utf-8'))
-
-                    transcript_text = transcript_data['results']['transcripts'][0]['transcript']
+                    transcript_text = self.fetch_transcript(job_name)
 
                     return {
                         "transcription_status": "COMPLETED",
@@ -136,6 +132,7 @@ class TranscriptionService:
                     "error": None
                 }
             logger.error(f"Error getting transcription status: {e}")
+            self._reset_if_credentials(e)
             return {
                 "transcription_status": "ERROR",
                 "transcript_text": None,
@@ -143,12 +140,67 @@ class TranscriptionService:
             }
         except Exception as e:
             logger.error(f"Unexpected error getting transcription status: {e}")
+            self._reset_if_credentials(e)
             return {
                 "transcription_status": "ERROR",
                 "transcript_text": None,
                 "error": str(e)
             }
 
+    def _reset_if_credentials(self, error: Exception) -> None:
+        """Credenciales caducadas: el siguiente intento re-resuelve sesión y clientes."""
+        if is_credential_error(error):
+            self.clients.reset()
+
+    @staticmethod
+    def job_name_for(recording: Recording) -> str:
+        """transcribe + uuid sin guiones (32 hex) + epoch de created_at."""
+        job_name = f"{JOB_NAME_PREFIX}-{recording.id}-{int(recording.created_at.timestamp())}"
+        return job_name.replace('-', '')[:200]  # Limitar longitud y quitar guiones
+
+    @staticmethod
+    def recording_id_from_job_name(job_name: str) -> Optional[str]:
+        """Inverso de `job_name_for`: extrae el id del Recording (None si no es uno de nuestros jobs)."""
+        if not job_name or not job_name.startswith(JOB_NAME_PREFIX):
+            return None
+        hex_id = job_name[len(JOB_NAME_PREFIX):len(JOB_NAME_PREFIX) + 32]
+        try:
+            return str(uuid.UUID(hex=hex_id))
+        except ValueError:
+            return None
+
+    def list_jobs(self, status: str, next_token: Optional[str] = None) -> Dict:
+        """
+        Una página de ListTranscriptionJobs (hasta 100 jobs) filtrada por estado y
+        por nuestro prefijo. Los errores de AWS (incluido throttling) se propagan.
+        """
+        params = {"Status": status, "JobNameContains": JOB_NAME_PREFIX, "MaxResults": 100}
+        if next_token:
+            params["NextToken"] = next_token
+        return self.transcribe_client.list_transcription_jobs(**params)
+
+    def get_job(self, job_name: str) -> Optional[Dict]:
+        """
+        TranscriptionJob por nombre, o None si no existe (nunca se creó o Transcribe
+        ya lo purgó). El resto de errores de AWS se propagan.
+        """
+        try:
+            return self.transcribe_client.get_transcription_job(TranscriptionJobName=job_name)["TranscriptionJob"]
+        except ClientError as e:
+            # Transcribe responde BadRequestException para un job inexistente
+            if e.response.get("Error", {}).get("Code") in ("BadRequestException", "NotFoundException"):
+                return None
+            raise
+
+    def fetch_transcript(self, job_name: str) -> str:
+        """Descarga el JSON de resultados del job desde S3 y devuelve el texto."""
+        transcript_obj = self.s3_client.get_object(
+            Bucket=self.bucket_name,
+            Key=f"transcripts/{job_name}.json"
+        )
+        transcript_data = json.loads(transcript_obj['Body'].read().decode('utf-8'))
+        return transcript_data['results']['transcripts'][0]['transcript']
+
     def _get_media_format(self, content_type: str) -> str:
         """Mapea content_type a formato de Transcribe"""
         format_map = {
@@ -1,7 +1,8 @@
 from typing import List, Optional
 from fastapi import APIRouter, Depends, Query, status, HTTPException
 from sqlalchemy.orm import Session
-from src.core.connections.deps import get_db, get_current_tenant, get_current_user
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.core.connections.deps import get_db, get_read_db, get_current_tenant, get_current_user
 from src.core.middlewares.permissions import require_roles
 from .schemas import AppointmentCreate, AppointmentOut
 from .services import AppointmentService
@@ -35,9 +36,9 @@ def create_appointment(
     summary="Obtener agenda diaria del usuario logueado",
     dependencies=[Depends(require_roles("owner", "admin", "staff", "viewer"))],
 )
-def get_daily_schedule(
+async def get_daily_schedule(
         date_str: str = Query(None, description="Fecha a consultar (YYYY-MM-DD). Por defecto: hoy."),
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_read_db),
         tenant=Depends(get_current_tenant),
         user=Depends(get_current_user),
         svc: AppointmentService = Depends(get_appointment_service),
@@ -47,5 +48,5 @@ def get_daily_schedule(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD.")
 
-    appointments = svc.get_daily_schedule(db, tenant=tenant, user=user, target_date=target_date)
+    appointments = await svc.get_daily_schedule(db, tenant=tenant, user=user, target_date=target_date)
     return [AppointmentOut.model_validate(a) for a in appointments]
\ No newline at end of file
@@ -1,7 +1,7 @@
 from fastapi import Depends
 
 from .services import AppointmentService
-from .repository import AppointmentRepository
+from .repository import AppointmentRepository, AsyncAppointmentRepository
 from src.apps.patients.repository import PatientRepository
 
 
@@ -9,4 +9,4 @@ def get_patient_repo() -> PatientRepository:
     return PatientRepository()
 
 def get_appointment_service(patient_repo: PatientRepository = Depends(get_patient_repo)) -> AppointmentService:
-    return AppointmentService(AppointmentRepository(), patient_repo)
\ No newline at end of file
+    return AppointmentService(AppointmentRepository(), patient_repo, AsyncAppointmentRepository())
\ No newline at end of file
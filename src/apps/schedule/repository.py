@@ -1,6 +1,7 @@
 from typing import Optional, Sequence
 from sqlalchemy import select, func, and_
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from .models import Appointment
 from datetime import date, datetime, timedelta
 
@@ -14,16 +15,20 @@ class AppointmentRepository:
         db.refresh(a)
         return a
 
+
+class AsyncAppointmentRepository:
+    """Lecturas de Appointment sobre AsyncSession (asyncpg)."""
+
     @staticmethod
-    def list_by_user_and_day(
-        db: Session, user_id: str, target_date: date, tenant_id: str
+    async def list_by_user_and_day(
+        db: AsyncSession, user_id: str, target_date: date, tenant_id: str
     ) -> Sequence[Appointment]:
         # Filtra por el día (ignorando la hora en la BD si es TIMESTAMP(timezone=True))
         # SQLA no tiene date() directo sobre TIMESTAMP con tz, por lo que usamos comparación de rango
         start_of_day = datetime(target_date.year, target_date.month, target_date.day)
         end_of_day = start_of_day + timedelta(days=1)
 
-        return db.execute(
+        return (await db.execute(
             select(Appointment)
             .where(
                 Appointment.tenant_id == tenant_id,
@@ -34,4 +39,4 @@ class AppointmentRepository:
                 )
             )
             .order_by(Appointment.start_time.asc())
-        ).scalars().all()
\ No newline at end of file
+        )).scalars().all()
\ No newline at end of file
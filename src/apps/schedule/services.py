@@ -1,18 +1,21 @@
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from src.core.errors.errors import EntityNotFoundError
 from src.apps.tenant.models import Tenant
 from src.apps.users.models import User
 from src.apps.patients.repository import PatientRepository # Para validar paciente
-from .repository import AppointmentRepository
+from .repository import AppointmentRepository, AsyncAppointmentRepository
 from .models import Appointment
 from datetime import date, datetime
 from typing import Sequence
 
 
 class AppointmentService:
-    def __init__(self, repo: AppointmentRepository, patient_repo: PatientRepository):
+    def __init__(self, repo: AppointmentRepository, patient_repo: PatientRepository,
+                 async_repo: AsyncAppointmentRepository | None = None):
         self.repo = repo
         self.patient_repo = patient_repo
+        self.async_repo = async_repo or AsyncAppointmentRepository()
 
     def create_appointment(
         self, db: Session, *, tenant: Tenant, user: User, payload: dict
@@ -29,10 +32,10 @@ class AppointmentService:
             **payload
         )
 
-    def get_daily_schedule(
-        self, db: Session, *, tenant: Tenant, user: User, target_date: date
+    async def get_daily_schedule(
+        self, db: AsyncSession, *, tenant: Tenant, user: User, target_date: date
     ) -> Sequence[Appointment]:
-        return self.repo.list_by_user_and_day(
+        return await self.async_repo.list_by_user_and_day(
             db,
             user_id=str(user.id),
             target_date=target_date,
@@ -1,16 +1,56 @@
+import math
 from uuid import uuid4
-from fastapi import APIRouter, Depends, status
-from src.core.connections.deps import get_current_user, get_current_tenant
-from .schemas import PresignPutIn, PresignPutOut
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from src.core.config.config import env
+from src.core.connections.deps import get_db, get_current_user, get_current_tenant
+from src.core.errors.errors import BadRequestError, EntityNotFoundError
+from src.core.middlewares.permissions import require_roles
+from src.apps.recordings.controllers.recording_controller import ALLOWED_CT
+from src.apps.recordings.dependencies import get_recording_service
+from src.apps.recordings.schemas import RecordingOut
+from src.apps.recordings.services.recording_service import RecordingService
+from .schemas import (
+    PresignPutIn, PresignPutOut, PresignPutBatchIn, PresignPutBatchItem, PresignPutBatchOut,
+    MultipartCreateIn, MultipartCreateOut, MultipartRef, MultipartPresignPartsIn, MultipartPresignPartsOut,
+    MultipartPartUrl, MultipartPart, MultipartPartsOut, MultipartCompleteIn, StreamUploadOut,
+)
 from .services import StorageService
+from .streaming import stream_to_s3
 
 router = APIRouter(prefix="/storage", tags=["storage"])
 
+# Roles que pueden registrar Recordings (igual que POST /recordings)
+RECORDING_WRITER_ROLES = ("owner", "admin", "staff")
+
+# Límites de S3 para multipart
+MAX_PARTS = 10_000
+MIN_PART_SIZE = 5 * 1024 * 1024
+
 
 def get_service() -> StorageService:
     return StorageService()
 
 
+def _object_key(item: PresignPutIn) -> str:
+    # Generamos una key limpia y única por carpeta
+    # Ejemplo: recordings/2025-11-12/<uuid>__nombre.ext   (simple por ahora)
+    return f"{item.folder}/{uuid4()}__{item.filename}"
+
+
+def _tenant_object_key(tenant, item: PresignPutIn) -> str:
+    # Multipart: la key viaja en cada llamada posterior, así que lleva el tenant delante
+    return f"{tenant.id}/{_object_key(item)}"
+
+
+def _ensure_tenant_key(tenant, key: str, upload_id: str) -> None:
+    """Solo se opera sobre subidas creadas por el tenant actual (404 para no revelar otras)."""
+    if not key.startswith(f"{tenant.id}/"):
+        raise EntityNotFoundError("Multipart upload", "upload_id", upload_id)
+
+
 @router.post(
     "/presign/put",
     response_model=PresignPutOut,
@@ -24,9 +64,7 @@ def presign_put(
 ):
     svc = get_service()
 
-    # Generamos una key limpia y única por carpeta
-    # Ejemplo: recordings/2025-11-12/<uuid>__nombre.ext   (simple por ahora)
-    key = f"{payload.folder}/{uuid4()}__{payload.filename}"
+    key = _object_key(payload)
 
     out = svc.presign_put(
         key=key,
@@ -34,3 +72,278 @@ def presign_put(
         expires_sec=900,  # 15 min
     )
     return PresignPutOut(**out)
+
+
+@router.post(
+    "/presign/put:batch",
+    response_model=PresignPutBatchOut,
+    status_code=status.HTTP_200_OK,
+    summary="Generar URLs prefirmadas para varios archivos (y opcionalmente registrar los Recordings)",
+)
+def presign_put_batch(
+        payload: PresignPutBatchIn,
+        db: Session = Depends(get_db),
+        me=Depends(get_current_user),
+        tenant=Depends(get_current_tenant),
+        recording_service: RecordingService = Depends(get_recording_service),
+):
+    """
+    Sincronización masiva desde la app móvil: una llamada firma hasta
+    STORAGE_PRESIGN_BATCH_MAX archivos. Con `register_recordings` los Recording se
+    crean en un solo INSERT; el cliente debe completar las subidas antes de
+    iniciar la transcripción de cada uno.
+    """
+    if len(payload.items) > env.STORAGE_PRESIGN_BATCH_MAX:
+        raise BadRequestError(f"Máximo {env.STORAGE_PRESIGN_BATCH_MAX} archivos por lote.")
+
+    if payload.register_recordings:
+        if me.role not in RECORDING_WRITER_ROLES:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Operation not allowed for role '{me.role}'. Required: {RECORDING_WRITER_ROLES}"
+            )
+        unsupported = sorted({i.content_type for i in payload.items if i.content_type not in ALLOWED_CT})
+        if unsupported:
+            raise BadRequestError(
+                f"content_type no soportado: {', '.join(unsupported)}. "
+                f"Los tipos permitidos son: {', '.join(ALLOWED_CT)}"
+            )
+
+    svc = get_service()
+    keys = [_object_key(item) for item in payload.items]
+    signed = svc.presign_put_many(
+        [(key, item.content_type) for key, item in zip(keys, payload.items)],
+        expires_sec=900,  # 15 min
+    )
+
+    recording_ids = [None] * len(keys)
+    if payload.register_recordings:
+        recordings = recording_service.register_uploads(
+            db,
+            tenant=tenant,
+            user=me,
+            bucket=svc.bucket,
+            items=[
+                {
+                    "key": key,
+                    "content_type": "audio/wav" if item.content_type == "audio/x-wav" else item.content_type,
+                    "size_bytes": item.size_bytes,
+                }
+                for key, item in zip(keys, payload.items)
+            ],
+        )
+        by_key = {r.key: r.id for r in recordings}
+        recording_ids = [by_key.get(key) for key in keys]
+
+    return PresignPutBatchOut(items=[
+        PresignPutBatchItem(**out, filename=item.filename, recording_id=recording_id)
+        for out, item, recording_id in zip(signed, payload.items, recording_ids)
+    ])
+
+
+# -------------------------------------------------------------------
+# Multipart: audios largos en partes paralelas y reanudables
+#   create -> presign-parts (las que falten) -> PUT de cada parte -> complete
+#   Para reanudar: GET parts y pedir URLs solo de las que no estén.
+# -------------------------------------------------------------------
+@router.post(
+    "/multipart/create",
+    response_model=MultipartCreateOut,
+    status_code=status.HTTP_201_CREATED,
+    summary="Iniciar una subida por partes (audios largos)",
+    dependencies=[Depends(require_roles(*RECORDING_WRITER_ROLES))],
+)
+def create_multipart(
+        payload: MultipartCreateIn,
+        tenant=Depends(get_current_tenant),
+):
+    if payload.content_type not in ALLOWED_CT:
+        raise BadRequestError(
+            f"content_type '{payload.content_type}' no es soportado. "
+            f"Los tipos permitidos son: {', '.join(ALLOWED_CT)}"
+        )
+
+    part_size = max(MIN_PART_SIZE, env.STORAGE_MULTIPART_PART_SIZE_MB * 1024 * 1024)
+    part_count = None
+    if payload.size_bytes:
+        # Archivos enormes: se agranda la parte para no pasar de 10.000
+        part_size = max(part_size, math.ceil(payload.size_bytes / MAX_PARTS))
+        part_count = math.ceil(payload.size_bytes / part_size)
+
+    svc = get_service()
+    key = _tenant_object_key(tenant, payload)
+    upload_id = svc.create_multipart(key=key, content_type=payload.content_type)
+    return MultipartCreateOut(
+        bucket=svc.bucket, key=key, upload_id=upload_id, part_size=part_size, part_count=part_count,
+    )
+
+
+@router.post(
+    "/multipart/presign-parts",
+    response_model=MultipartPresignPartsOut,
+    status_code=status.HTTP_200_OK,
+    summary="URLs prefirmadas para subir partes",
+    dependencies=[Depends(require_roles(*RECORDING_WRITER_ROLES))],
+)
+def presign_multipart_parts(
+        payload: MultipartPresignPartsIn,
+        tenant=Depends(get_current_tenant),
+):
+    _ensure_tenant_key(tenant, payload.key, payload.upload_id)
+    numbers = sorted(set(payload.part_numbers))
+    if numbers[0] < 1 or numbers[-1] > MAX_PARTS:
+        raise BadRequestError(f"Los números de parte van de 1 a {MAX_PARTS}.")
+    if len(numbers) > env.STORAGE_PRESIGN_BATCH_MAX:
+        raise BadRequestError(f"Máximo {env.STORAGE_PRESIGN_BATCH_MAX} partes por llamada.")
+
+    expires_sec = 3600  # 1 h: las partes de redes lentas tardan más que un PUT simple
+    urls = get_service().presign_parts(
+        key=payload.key, upload_id=payload.upload_id, part_numbers=numbers, expires_sec=expires_sec,
+    )
+    return MultipartPresignPartsOut(
+        upload_id=payload.upload_id,
+        parts=[MultipartPartUrl(part_number=n, upload_url=url) for n, url in urls.items()],
+        expires_in=expires_sec,
+    )
+
+
+@router.get(
+    "/multipart/parts",
+    response_model=MultipartPartsOut,
+    status_code=status.HTTP_200_OK,
+    summary="Partes ya subidas (para reanudar)",
+    dependencies=[Depends(require_roles(*RECORDING_WRITER_ROLES))],
+)
+def list_multipart_parts(
+        key: str = Query(..., max_length=1024),
+        upload_id: str = Query(..., max_length=1024),
+        tenant=Depends(get_current_tenant),
+):
+    _ensure_tenant_key(tenant, key, upload_id)
+    parts = get_service().list_parts(key=key, upload_id=upload_id)
+    return MultipartPartsOut(
+        upload_id=upload_id,
+        parts=[MultipartPart(part_number=p["PartNumber"], etag=p["ETag"], size=p["Size"]) for p in parts],
+    )
+
+
+@router.post(
+    "/multipart/complete",
+    response_model=RecordingOut,
+    status_code=status.HTTP_201_CREATED,
+    summary="Completar la subida por partes y registrar el Recording",
+    dependencies=[Depends(require_roles(*RECORDING_WRITER_ROLES))],
+)
+def complete_multipart(
+        payload: MultipartCompleteIn,
+        db: Session = Depends(get_db),
+        me=Depends(get_current_user),
+        tenant=Depends(get_current_tenant),
+        recording_service: RecordingService = Depends(get_recording_service),
+):
+    _ensure_tenant_key(tenant, payload.key, payload.upload_id)
+    svc = get_service()
+    if payload.parts:
+        parts = [{"PartNumber": p.part_number, "ETag": p.etag} for p in payload.parts]
+    else:
+        parts = svc.list_parts(key=payload.key, upload_id=payload.upload_id)
+        if not parts:
+            raise BadRequestError("La subida no tiene partes.")
+
+    obj = svc.complete_multipart(key=payload.key, upload_id=payload.upload_id, parts=parts)
+
+    content_type = obj["content_type"] or "audio/wav"
+    r = recording_service.register_upload(
+        db,
+        tenant=tenant,
+        user=me,
+        bucket=obj["bucket"],
+        key=obj["key"],
+        content_type="audio/wav" if content_type == "audio/x-wav" else content_type,
+        size_bytes=obj["size_bytes"],
+        duration_sec=payload.duration_sec,
+    )
+    return RecordingOut.model_validate(r)
+
+
+@router.post(
+    "/multipart/abort",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Abortar una subida por partes",
+    dependencies=[Depends(require_roles(*RECORDING_WRITER_ROLES))],
+)
+def abort_multipart(
+        payload: MultipartRef,
+        tenant=Depends(get_current_tenant),
+):
+    _ensure_tenant_key(tenant, payload.key, payload.upload_id)
+    get_service().abort_multipart(key=payload.key, upload_id=payload.upload_id)
+
+
+# -------------------------------------------------------------------
+# Proxy: para redes que bloquean S3, el audio pasa por el backend
+# -------------------------------------------------------------------
+@router.put(
+    "/upload",
+    response_model=StreamUploadOut,
+    status_code=status.HTTP_201_CREATED,
+    summary="Subir un audio a S3 a través del backend (streaming) y registrar el Recording",
+    dependencies=[Depends(require_roles(*RECORDING_WRITER_ROLES))],
+)
+async def upload_via_proxy(
+        request: Request,
+        filename: str = Query(..., max_length=255),
+        folder: str = Query("recordings", max_length=120),
+        duration_sec: Optional[int] = Query(None, ge=0),
+        content_type: str = Header(..., alias="Content-Type"),
+        content_length: Optional[int] = Header(None, alias="Content-Length"),
+        checksum: Optional[str] = Header(None, alias="X-Checksum-Sha256", pattern="^[0-9a-fA-F]{64}$"),
+        db: Session = Depends(get_db),
+        me=Depends(get_current_user),
+        tenant=Depends(get_current_tenant),
+        recording_service: RecordingService = Depends(get_recording_service),
+):
+    """
+    Cuerpo = bytes del audio (sin multipart/form-data). Se reenvía a S3 por
+    partes mientras llega, con memoria constante por subida.
+    Opcional: `X-Checksum-Sha256` (hex) para verificar la integridad.
+    """
+    content_type = content_type.split(";")[0].strip()
+    if content_type not in ALLOWED_CT:
+        raise BadRequestError(
+            f"content_type '{content_type}' no es soportado. "
+            f"Los tipos permitidos son: {', '.join(ALLOWED_CT)}"
+        )
+    max_bytes = env.STORAGE_PROXY_MAX_MB * 1024 * 1024
+    if content_length is not None and content_length > max_bytes:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"El archivo supera el máximo de {env.STORAGE_PROXY_MAX_MB} MB.",
+        )
+
+    svc = await run_in_threadpool(get_service)
+    key = _object_key(PresignPutIn(filename=filename, content_type=content_type, folder=folder))
+    obj = await stream_to_s3(
+        svc,
+        request.stream(),
+        key=key,
+        content_type=content_type,
+        part_size=max(MIN_PART_SIZE, env.STORAGE_MULTIPART_PART_SIZE_MB * 1024 * 1024),
+        max_bytes=max_bytes,
+        expected_sha256=checksum,
+    )
+
+    r = await run_in_threadpool(
+        recording_service.register_upload,
+        db,
+        tenant=tenant,
+        user=me,
+        bucket=obj.bucket,
+        key=obj.key,
+        content_type="audio/wav" if content_type == "audio/x-wav" else content_type,
+        size_bytes=obj.size_bytes,
+        duration_sec=duration_sec,
+    )
+    return StreamUploadOut(
+        recording=RecordingOut.model_validate(r), size_bytes=obj.size_bytes, sha256=obj.sha256, parts=obj.parts,
+    )
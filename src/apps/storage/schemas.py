@@ -1,5 +1,7 @@
 from pydantic import BaseModel, Field
-from typing import Optional, Dict
+from typing import Optional, Dict, List
+from uuid import UUID
+from src.apps.recordings.schemas import RecordingOut
 
 
 class PresignPutIn(BaseModel):
@@ -24,3 +26,76 @@ class PresignPutOut(BaseModel):
     upload_url: str
     required_headers: Dict[str, str]
     expires_in: int
+
+
+class PresignPutBatchIn(BaseModel):
+    items: List[PresignPutIn] = Field(..., min_length=1, description="Archivos a firmar (máx. STORAGE_PRESIGN_BATCH_MAX)")
+    register_recordings: bool = Field(
+        False,
+        description="Pre-registrar los Recording (status uploaded) en la misma llamada")
+
+
+class PresignPutBatchItem(PresignPutOut):
+    filename: str
+    recording_id: Optional[UUID] = None
+
+
+class PresignPutBatchOut(BaseModel):
+    items: List[PresignPutBatchItem]
+
+
+class MultipartCreateIn(PresignPutIn):
+    pass
+
+
+class MultipartCreateOut(BaseModel):
+    bucket: str
+    key: str
+    upload_id: str
+    part_size: int = Field(..., description="Tamaño sugerido de parte en bytes (la última puede ser menor)")
+    part_count: Optional[int] = Field(None, description="Partes a subir si se informó size_bytes")
+
+
+class MultipartRef(BaseModel):
+    key: str = Field(..., max_length=1024)
+    upload_id: str = Field(..., max_length=1024)
+
+
+class MultipartPresignPartsIn(MultipartRef):
+    part_numbers: List[int] = Field(..., min_length=1, description="Números de parte (1-10000)")
+
+
+class MultipartPartUrl(BaseModel):
+    part_number: int
+    upload_url: str
+
+
+class MultipartPresignPartsOut(BaseModel):
+    upload_id: str
+    parts: List[MultipartPartUrl]
+    expires_in: int
+
+
+class MultipartPart(BaseModel):
+    part_number: int = Field(..., ge=1, le=10_000)
+    etag: str = Field(..., max_length=255)
+    size: Optional[int] = None
+
+
+class MultipartPartsOut(BaseModel):
+    upload_id: str
+    parts: List[MultipartPart]
+
+
+class MultipartCompleteIn(MultipartRef):
+    parts: Optional[List[MultipartPart]] = Field(
+        None,
+        description="ETag de cada parte; si se omite se usan las partes que S3 ya tiene (reanudación)")
+    duration_sec: Optional[int] = None
+
+
+class StreamUploadOut(BaseModel):
+    recording: RecordingOut
+    size_bytes: int
+    sha256: str
+    parts: int
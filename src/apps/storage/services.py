@@ -1,6 +1,6 @@
 import os
-from typing import Dict
-import boto3
+from contextlib import contextmanager
+from typing import Dict, List, Sequence, Tuple
 from botocore.exceptions import (
     BotoCoreError,
     ClientError,
@@ -8,6 +8,7 @@ from botocore.exceptions import (
     TokenRetrievalError,
 )
 from fastapi import HTTPException, status
+from src.core.connections.aws import AwsClientRegistry, get_aws_clients
 
 
 class StorageService:
@@ -24,9 +25,12 @@ class StorageService:
       - AWS_REGION       (región, ej: us-east-1)
       - AWS_PROFILE      (perfil SSO/local)
       - AWS_SDK_LOAD_CONFIG=1  (recomendado para SSO)
+
+    El cliente S3 sale del registro del proceso (`get_aws_clients`): la sesión y
+    el pool HTTP se reutilizan entre requests en lugar de crearse en cada una.
     """
 
-    def __init__(self, *, bucket: str | None = None, region: str | None = None, profile: str | None = None):
+    def __init__(self, *, bucket: str | None = None, clients: AwsClientRegistry | None = None):
         self.bucket = bucket or os.getenv("S3_BUCKET_AUDIO")
         if not self.bucket:
             raise HTTPException(
@@ -34,18 +38,10 @@ class StorageService:
                 detail="S3_BUCKET_AUDIO no está definido en el entorno."
             )
 
-        self.region = region or os.getenv("AWS_REGION") or "us-east-1"
-
-        # Construimos la sesión de boto3 respetando AWS_PROFILE si existe
-        profile = profile or os.getenv("AWS_PROFILE")
+        self.clients = clients or get_aws_clients()
+        self.region = self.clients.region
         try:
-            if profile:
-                # Para SSO, asegúrate de exportar AWS_SDK_LOAD_CONFIG=1
-                session = boto3.session.Session(profile_name=profile, region_name=self.region)
-            else:
-                session = boto3.session.Session(region_name=self.region)
-
-            self.client = session.client("s3", region_name=self.region)
+            self.client = self.clients.client("s3")
         except (BotoCoreError, Exception) as e:
             # Cualquier error al iniciar cliente
             raise HTTPException(
@@ -58,32 +54,121 @@ class StorageService:
         Genera URL prefirmada tipo PUT para subir un objeto.
         Devuelve: { bucket, key, upload_url, required_headers, expires_in }
         """
+        with self._aws_errors():
+            return self._sign_put(key, content_type, expires_sec)
+
+    def presign_put_many(self, items: Sequence[Tuple[str, str]], *, expires_sec: int = 900) -> List[Dict[str, str]]:
+        """
+        Firma varias keys de una vez: items = [(key, content_type), ...].
+        Firmar es local (no llama a S3); el cliente compartido reutiliza el signer y
+        las credenciales ya resueltas, así que cada item cuesta microsegundos.
+        """
+        with self._aws_errors():
+            return [self._sign_put(key, content_type, expires_sec) for key, content_type in items]
+
+    # -------------------------------------------------------------------
+    # Multipart: subida por partes en paralelo y reanudable
+    # -------------------------------------------------------------------
+    def create_multipart(self, *, key: str, content_type: str) -> str:
+        """Inicia la subida por partes y devuelve el UploadId."""
+        with self._aws_errors():
+            response = self.client.create_multipart_upload(Bucket=self.bucket, Key=key, ContentType=content_type)
+            return response["UploadId"]
+
+    def presign_parts(
+            self, *, key: str, upload_id: str, part_numbers: Sequence[int], expires_sec: int = 3600
+    ) -> Dict[int, str]:
+        """URLs prefirmadas (PUT) para las partes pedidas; se firman en local, sin llamar a S3."""
+        with self._aws_errors():
+            return {
+                number: self.client.generate_presigned_url(
+                    ClientMethod="upload_part",
+                    Params={"Bucket": self.bucket, "Key": key, "UploadId": upload_id, "PartNumber": number},
+                    ExpiresIn=expires_sec,
+                    HttpMethod="PUT",
+                )
+                for number in part_numbers
+            }
+
+    def list_parts(self, *, key: str, upload_id: str) -> List[Dict]:
+        """Partes ya recibidas por S3 (para reanudar): [{PartNumber, ETag, Size}, ...]."""
+        parts: List[Dict] = []
+        params = {"Bucket": self.bucket, "Key": key, "UploadId": upload_id}
+        with self._aws_errors():
+            while True:
+                response = self.client.list_parts(**params)
+                parts.extend(
+                    {"PartNumber": p["PartNumber"], "ETag": p["ETag"], "Size": p["Size"]}
+                    for p in response.get("Parts", [])
+                )
+                if not response.get("IsTruncated"):
+                    return parts
+                params["PartNumberMarker"] = response["NextPartNumberMarker"]
+
+    def upload_part(self, *, key: str, upload_id: str, part_number: int, body: bytes | bytearray) -> str:
+        """Sube una parte desde el servidor (proxy) y devuelve su ETag."""
+        with self._aws_errors():
+            response = self.client.upload_part(
+                Bucket=self.bucket, Key=key, UploadId=upload_id, PartNumber=part_number, Body=body,
+            )
+            return response["ETag"]
+
+    def complete_multipart(self, *, key: str, upload_id: str, parts: Sequence[Dict]) -> Dict:
+        """
+        Une las partes (ordenadas por número) y devuelve el objeto final:
+        { bucket, key, size_bytes, content_type }.
+        """
+        ordered = sorted(({"PartNumber": p["PartNumber"], "ETag": p["ETag"]} for p in parts),
+                         key=lambda p: p["PartNumber"])
+        with self._aws_errors():
+            self.client.complete_multipart_upload(
+                Bucket=self.bucket, Key=key, UploadId=upload_id, MultipartUpload={"Parts": ordered},
+            )
+            head = self.client.head_object(Bucket=self.bucket, Key=key)
+        return {
+            "bucket": self.bucket,
+            "key": key,
+            "size_bytes": head["ContentLength"],
+            "content_type": head.get("ContentType"),
+        }
+
+    def abort_multipart(self, *, key: str, upload_id: str) -> None:
+        """Descarta la subida y las partes ya almacenadas (dejan de facturarse)."""
+        with self._aws_errors():
+            self.client.abort_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload_id)
+
+    def _sign_put(self, key: str, content_type: str, expires_sec: int) -> Dict[str, str]:
         # Headers requeridos por S3 para que valide ContentType
         params = {
             "Bucket": self.bucket,
             "Key": key,
             "ContentType": content_type,
         }
+        url = self.client.generate_presigned_url(
+            ClientMethod="put_object",
+            Params=params,
+            ExpiresIn=expires_sec,
+            HttpMethod="PUT",
+        )
+        return {
+            "bucket": self.bucket,
+            "key": key,
+            "upload_url": url,
+            "required_headers": {
+                "Content-Type": content_type
+            },
+            "expires_in": expires_sec,
+        }
 
+    @contextmanager
+    def _aws_errors(self):
+        """Traduce errores de boto3 a HTTPException."""
         try:
-            url = self.client.generate_presigned_url(
-                ClientMethod="put_object",
-                Params=params,
-                ExpiresIn=expires_sec,
-                HttpMethod="PUT",
-            )
-            return {
-                "bucket": self.bucket,
-                "key": key,
-                "upload_url": url,
-                "required_headers": {
-                    "Content-Type": content_type
-                },
-                "expires_in": expires_sec,
-            }
+            yield
 
         except TokenRetrievalError:
-            # Caso típico de tu log: token SSO vencido
+            # Caso típico de tu log: token SSO vencido; tras el login se re-resuelve
+            self.clients.reset()
             profile = os.getenv("AWS_PROFILE", "<tu-perfil>")
             hint = (
                 f"AWS SSO expirado. Ejecuta: 'aws sso login --profile {profile}' "
@@ -95,6 +180,7 @@ class StorageService:
             )
 
         except NoCredentialsError:
+            self.clients.reset()
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="No hay credenciales AWS válidas. Usa AWS_PROFILE o variables de acceso de IAM."
@@ -104,6 +190,16 @@ class StorageService:
             # Errores firmando/validando contra S3
             code = e.response.get("Error", {}).get("Code", "ClientError")
             msg = e.response.get("Error", {}).get("Message", str(e))
+            if code == "NoSuchUpload":
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="La subida por partes no existe (completada, abortada o expirada)."
+                )
+            if code in ("InvalidPart", "InvalidPartOrder", "EntityTooSmall"):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Partes inválidas ({code}): {msg}"
+                )
             raise HTTPException(
                 status_code=status.HTTP_502_BAD_GATEWAY,
                 detail=f"Error de AWS S3 ({code}): {msg}"
@@ -115,6 +211,9 @@ class StorageService:
                 detail=f"Error de AWS SDK: {e}"
             )
 
+        except HTTPException:
+            raise
+
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
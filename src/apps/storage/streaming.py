@@ -0,0 +1,101 @@
+# src/apps/storage/streaming.py
+import hashlib
+import logging
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Optional
+
+from fastapi import HTTPException, status
+from starlette.concurrency import run_in_threadpool
+
+from .services import StorageService
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class StreamedObject:
+    bucket: str
+    key: str
+    size_bytes: int
+    sha256: str
+    parts: int
+
+
+async def stream_to_s3(
+        svc: StorageService,
+        chunks: AsyncIterator[bytes],
+        *,
+        key: str,
+        content_type: str,
+        part_size: int,
+        max_bytes: int,
+        expected_sha256: Optional[str] = None,
+) -> StreamedObject:
+    """
+    Reenvía un cuerpo HTTP a S3 como multipart sin guardarlo entero en memoria.
+
+    Los chunks se copian a un único buffer preasignado de `part_size`; al llenarse
+    se sube como parte (en el threadpool, sin copiarlo) y se reutiliza antes de
+    seguir leyendo, así que la memoria por subida es ~1 × part_size sin importar la
+    duración del audio, y el cliente recibe contrapresión si S3 va más lento que él.
+    Tamaño y SHA-256 se calculan al vuelo; con `expected_sha256` no se completa si
+    no coincide. Ante cualquier error (incluida la desconexión del cliente) la
+    subida se aborta para no dejar partes huérfanas.
+    """
+    upload_id = await run_in_threadpool(svc.create_multipart, key=key, content_type=content_type)
+    digest = hashlib.sha256()
+    buffer = bytearray(part_size)
+    filled = 0
+    parts: List[Dict] = []
+    size = 0
+
+    async def flush() -> None:
+        nonlocal filled
+        if filled < part_size:
+            del buffer[filled:]  # última parte: se recorta en sitio, sin copiar
+        number = len(parts) + 1
+        # upload_part termina (reintentos incluidos) antes de volver: el buffer queda libre
+        etag = await run_in_threadpool(
+            svc.upload_part, key=key, upload_id=upload_id, part_number=number, body=buffer,
+        )
+        parts.append({"PartNumber": number, "ETag": etag})
+        filled = 0
+
+    try:
+        async for chunk in chunks:
+            if not chunk:
+                continue
+            size += len(chunk)
+            if size > max_bytes:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"El archivo supera el máximo de {max_bytes // (1024 * 1024)} MB.",
+                )
+            digest.update(chunk)
+
+            view = memoryview(chunk)
+            while view:
+                take = min(part_size - filled, len(view))
+                buffer[filled:filled + take] = view[:take]
+                filled += take
+                view = view[take:]
+                if filled == part_size:
+                    await flush()
+
+        if not size:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="El cuerpo está vacío.")
+        # Última parte (S3 admite que sea menor que el mínimo)
+        if filled:
+            await flush()
+        if expected_sha256 and digest.hexdigest() != expected_sha256.lower():
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="El SHA-256 no coincide.")
+
+        await run_in_threadpool(svc.complete_multipart, key=key, upload_id=upload_id, parts=parts)
+    except BaseException:
+        try:
+            await run_in_threadpool(svc.abort_multipart, key=key, upload_id=upload_id)
+        except Exception:
+            log.warning("Could not abort multipart upload %s for %s", upload_id, key, exc_info=True)
+        raise
+
+    return StreamedObject(bucket=svc.bucket, key=key, size_bytes=size, sha256=digest.hexdigest(), parts=len(parts))
@@ -0,0 +1,36 @@
+# src/apps/tenant/cache.py
+import copy
+import uuid
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Mapping
+
+from src.core.config.config import env
+from src.utils.cache import SnapshotCache
+from .models import Tenant
+
+
+@dataclass(frozen=True)
+class TenantSnapshot:
+    """Copia inmutable de un Tenant, segura para compartir entre requests."""
+    id: uuid.UUID
+    code: str
+    name: str
+    meta: Mapping[str, Any]
+    is_active: bool
+
+    @classmethod
+    def from_model(cls, tenant: Tenant) -> "TenantSnapshot":
+        return cls(
+            id=tenant.id,
+            code=tenant.code,
+            name=tenant.name,
+            meta=MappingProxyType(copy.deepcopy(dict(tenant.meta or {}))),
+            is_active=tenant.is_active,
+        )
+
+
+# Resolución de tenant por X-Tenant-Code (get_current_tenant)
+tenant_cache: SnapshotCache[TenantSnapshot] = SnapshotCache(
+    "tenant", maxsize=1024, ttl=env.TENANT_CACHE_TTL_SEC
+)
@@ -2,6 +2,7 @@
 from typing import Optional, Sequence
 from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from .models import Tenant
 
 
@@ -85,3 +86,15 @@ class TenantRepository:
             return False
         t.is_active = False
         return True
+
+
+class AsyncTenantRepository:
+    """Acceso a datos asíncrono para Tenant (solo lecturas del request path)."""
+
+    @staticmethod
+    async def get_by_id(db: AsyncSession, tenant_id: str) -> Optional[Tenant]:
+        return await db.get(Tenant, tenant_id)
+
+    @staticmethod
+    async def get_by_code(db: AsyncSession, code: str) -> Optional[Tenant]:
+        return (await db.execute(select(Tenant).where(Tenant.code == code))).scalar_one_or_none()
@@ -3,6 +3,7 @@ from typing import Sequence, Optional
 from sqlalchemy.orm import Session
 from .repository import TenantRepository
 from .models import Tenant
+from .cache import tenant_cache
 from src.core.errors.errors import (
     EntityNotFoundError,
     EntityAlreadyExistsError,
@@ -47,6 +48,7 @@ class TenantService:
     #=========================================================
     def update_name(self, db: Session, tenant_id: str, new_name: str) -> Tenant:
         t = self.get_by_id(db, tenant_id)
+        tenant_cache.invalidate_on_commit(db, t.code)
         return self.repo.update_name(db, t, new_name)
 
     def update_code(self, db: Session, tenant_id: str, new_code: str) -> Tenant:
@@ -54,14 +56,17 @@ class TenantService:
         # validar unicidad
         if self.repo.get_by_code(db, new_code) and t.code != new_code:
             raise EntityAlreadyExistsError("Tenant", "code", new_code)
+        tenant_cache.invalidate_on_commit(db, t.code, new_code)
         return self.repo.update_code(db, t, new_code)
 
     def update_status(self, db: Session, tenant_id: str, is_active: bool) -> Tenant:
         t = self.get_by_id(db, tenant_id)
+        tenant_cache.invalidate_on_commit(db, t.code)
         return self.repo.update_status(db, t, is_active)
 
     def replace_meta(self, db: Session, tenant_id: str, new_meta: dict) -> Tenant:
         t = self.get_by_id(db, tenant_id)
+        tenant_cache.invalidate_on_commit(db, t.code)
         return self.repo.replace_meta(db, t, new_meta)
 
     #=========================================================
@@ -73,6 +78,7 @@ class TenantService:
               is_active: Optional[bool] = None,
               meta: Optional[dict] = None) -> Tenant:
         t = self.get_by_id(db, tenant_id)
+        tenant_cache.invalidate_on_commit(db, *{t.code, code or t.code})
 
         if code is not None:
             if self.repo.get_by_code(db, code) and t.code != code:
@@ -95,6 +101,9 @@ class TenantService:
     #                      SOFT-DELETE
     #=========================================================
     def deactivate_tenant(self, db: Session, tenant_id: str) -> bool:
+        t = self.repo.get_by_id(db, tenant_id)
+        if t:
+            tenant_cache.invalidate_on_commit(db, t.code)
         ok = self.repo.deactivate_tenant(db, tenant_id)
         if not ok:
             raise EntityNotFoundError("Tenant", "id", tenant_id)
@@ -0,0 +1,49 @@
+# src/apps/users/cache.py
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from src.core.config.config import env
+from src.utils.cache import SnapshotCache
+from .models import User
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Usuario autenticado (sin password_hash), inmutable y cacheable entre requests."""
+    id: uuid.UUID
+    tenant_id: uuid.UUID
+    email: str
+    full_name: str
+    role: str
+    is_active: bool
+    last_login: Optional[datetime]
+
+    @classmethod
+    def from_model(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            tenant_id=user.tenant_id,
+            email=user.email,
+            full_name=user.full_name,
+            role=user.role,
+            is_active=user.is_active,
+            last_login=user.last_login,
+        )
+
+
+def principal_key(user_id, tenant_id) -> Tuple[str, str]:
+    return str(user_id), str(tenant_id)
+
+
+# Resolución de usuario autenticado (get_current_user, /auth/me)
+principal_cache: SnapshotCache[Principal] = SnapshotCache(
+    "principal", maxsize=env.PRINCIPAL_CACHE_MAXSIZE, ttl=env.PRINCIPAL_CACHE_TTL_SEC
+)
+
+
+def invalidate_principal(db: Session, user: User) -> None:
+    principal_cache.invalidate_on_commit(db, principal_key(user.id, user.tenant_id))
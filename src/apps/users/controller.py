@@ -1,17 +1,19 @@
 from typing import List
 from fastapi import APIRouter, Depends, status, Query, Response
 from sqlalchemy.orm import Session
-from src.core.connections.deps import get_db, get_current_tenant, get_current_user
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.core.connections.deps import get_db, get_read_db, get_current_tenant, get_current_user
 from .schemas import UserCreate, UserOut, UserUpdateName, UserUpdateActive, UserChangePassword
 from .services import UserService
-from .repository import UserRepository
+from .repository import UserRepository, AsyncUserRepository
 from src.core.middlewares.permissions import require_roles
+from src.utils.pagination import set_page_headers
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 
 def get_service() -> UserService:
-    return UserService(UserRepository())
+    return UserService(UserRepository(), AsyncUserRepository())
 
 
 # Crear usuario (solo owner/admin idealmente; aquí lo dejamos abierto para empezar)
@@ -45,9 +47,9 @@ def create_user(
     summary="Listar usuarios del tenant",
     dependencies=[Depends(require_roles("owner", "admin"))],
 )
-def list_users(
+async def list_users(
         response: Response,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_read_db),
         tenant=Depends(get_current_tenant),
         _=Depends(get_current_user),
         q: str | None = Query(None, description="Buscar por email/full_name"),
@@ -55,12 +57,13 @@ def list_users(
         is_active: bool | None = Query(None),
         page: int = Query(1, ge=1),
         page_size: int = Query(50, ge=1, le=200),
+        cursor: str | None = Query(None, description="X-Next-Cursor de la página anterior; vacío para empezar (sin total)"),
 ):
     svc = get_service()
-    rows, total = svc.search_users(
-        db, tenant=tenant, q=q, role=role, is_active=is_active, page=page, page_size=page_size
+    rows, total, next_cursor = await svc.search_users(
+        db, tenant=tenant, q=q, role=role, is_active=is_active, page=page, page_size=page_size, cursor=cursor
     )
-    response.headers["X-Total-Count"] = str(total)
+    set_page_headers(response, total, next_cursor)
     return [UserOut.model_validate(x) for x in rows]
 
 
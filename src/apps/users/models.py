@@ -36,6 +36,13 @@ class User(Base):
         # Índices útiles
         Index("ix_user_tenant_email", "tenant_id", "email"),
         Index("ix_user_tenant_role", "tenant_id", "role"),
+        # Listados paginados por keyset (created_at desc, id desc)
+        Index("ix_user_tenant_created", "tenant_id", "created_at", "id"),
+        # Búsqueda por subcadena (pg_trgm + btree_gin para filtrar por tenant en el mismo índice)
+        Index("ix_user_email_trgm", "tenant_id", "email", postgresql_using="gin",
+              postgresql_ops={"email": "gin_trgm_ops"}),
+        Index("ix_user_name_trgm", "tenant_id", "full_name", postgresql_using="gin",
+              postgresql_ops={"full_name": "gin_trgm_ops"}),
     )
 
     def __repr__(self) -> str:
@@ -1,8 +1,32 @@
 from typing import Optional, Sequence, Tuple
-from sqlalchemy import select, func
+from sqlalchemy import select, func, Select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.utils.pagination import apply_keyset, split_page
 from .models import User
 
+# Orden de listados: más recientes primero (usa ix_user_tenant_created)
+USER_LIST_KEYS = (User.created_at, User.id)
+
+
+def _search_stmt(
+        tenant_id,
+        q: Optional[str] = None,
+        role: Optional[str] = None,
+        is_active: Optional[bool] = None,
+) -> Select:
+    stmt = select(User).where(User.tenant_id == tenant_id)
+    if q:
+        # Búsqueda simple por email/full_name (ILIKE si Postgres)
+        stmt = stmt.where(
+            (User.email.ilike(f"%{q}%")) | (User.full_name.ilike(f"%{q}%"))
+        )
+    if role:
+        stmt = stmt.where(User.role == role)
+    if is_active is not None:
+        stmt = stmt.where(User.is_active == is_active)
+    return stmt
+
 
 class UserRepository:
 
@@ -17,16 +41,7 @@ class UserRepository:
             page: int = 1,
             page_size: int = 50,
     ) -> Tuple[Sequence[User], int]:
-        stmt = select(User).where(User.tenant_id == tenant_id)
-        if q:
-            # Búsqueda simple por email/full_name (ILIKE si Postgres)
-            stmt = stmt.where(
-                (User.email.ilike(f"%{q}%")) | (User.full_name.ilike(f"%{q}%"))
-            )
-        if role:
-            stmt = stmt.where(User.role == role)
-        if is_active is not None:
-            stmt = stmt.where(User.is_active == is_active)
+        stmt = _search_stmt(tenant_id, q=q, role=role, is_active=is_active)
 
         # total
         count_stmt = select(func.count()).select_from(stmt.subquery())
@@ -76,3 +91,52 @@ class UserRepository:
         db.flush()
         db.refresh(user)
         return user
+
+
+class AsyncUserRepository:
+    """Lecturas de User sobre AsyncSession (asyncpg)."""
+
+    @staticmethod
+    async def search_by_tenant(
+            db: AsyncSession,
+            tenant_id,
+            *,
+            q: Optional[str] = None,
+            role: Optional[str] = None,
+            is_active: Optional[bool] = None,
+            page: int = 1,
+            page_size: int = 50,
+    ) -> Tuple[Sequence[User], int]:
+        stmt = _search_stmt(tenant_id, q=q, role=role, is_active=is_active)
+
+        count_stmt = select(func.count()).select_from(stmt.subquery())
+        total = (await db.execute(count_stmt)).scalar_one()
+
+        offset = (page - 1) * page_size
+        rows = (await db.execute(
+            stmt.order_by(User.created_at.desc(), User.id.desc()).offset(offset).limit(page_size)
+        )).scalars().all()
+        return rows, total
+
+    @staticmethod
+    async def search_by_tenant_keyset(
+            db: AsyncSession,
+            tenant_id,
+            *,
+            q: Optional[str] = None,
+            role: Optional[str] = None,
+            is_active: Optional[bool] = None,
+            cursor: Optional[str] = None,
+            page_size: int = 50,
+    ) -> Tuple[Sequence[User], Optional[str]]:
+        """Página por keyset sobre (created_at, id): coste O(page) sin OFFSET ni count."""
+        stmt = apply_keyset(
+            _search_stmt(tenant_id, q=q, role=role, is_active=is_active), USER_LIST_KEYS,
+            cursor=cursor, page_size=page_size, descending=True,
+        )
+        rows = (await db.execute(stmt)).scalars().all()
+        return split_page(rows, USER_LIST_KEYS, page_size)
+
+    @staticmethod
+    async def get_by_id(db: AsyncSession, user_id: str) -> Optional[User]:
+        return await db.get(User, user_id)
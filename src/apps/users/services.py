@@ -1,14 +1,18 @@
 from sqlalchemy.orm import Session
-from src.core.errors.errors import EntityAlreadyExistsError
-from .repository import UserRepository
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.core.errors.errors import EntityAlreadyExistsError, EntityNotFoundError
+from src.utils.pagination import next_cursor_for
+from .repository import UserRepository, AsyncUserRepository, USER_LIST_KEYS
 from .models import User
+from .cache import invalidate_principal
 from src.apps.tenant.models import Tenant
 from src.core.middlewares.security import get_password_hash, verify_password
 
 
 class UserService:
-    def __init__(self, repo: UserRepository):
+    def __init__(self, repo: UserRepository, async_repo: AsyncUserRepository | None = None):
         self.repo = repo
+        self.async_repo = async_repo or AsyncUserRepository()
 
     # =================================================
     # Create
@@ -38,9 +42,9 @@ class UserService:
     # =================================================
     # Read (lista con filtros + paginación)
     # =================================================
-    def search_users(
+    async def search_users(
             self,
-            db: Session,
+            db: AsyncSession,
             *,
             tenant: Tenant,
             q=None,
@@ -48,8 +52,19 @@ class UserService:
             is_active=None,
             page=1,
             page_size=50,
+            cursor=None,
     ):
-        return self.repo.search_by_tenant(
+        """
+        Devuelve (rows, total, next_cursor). Con `cursor` (aunque sea "") pagina por
+        keyset y no calcula el total; sin él mantiene page/page_size para clientes antiguos.
+        """
+        if cursor is not None:
+            rows, next_cursor = await self.async_repo.search_by_tenant_keyset(
+                db, tenant.id, q=q, role=role, is_active=is_active, cursor=cursor, page_size=page_size,
+            )
+            return rows, None, next_cursor
+
+        rows, total = await self.async_repo.search_by_tenant(
             db,
             tenant.id,
             q=q,
@@ -58,20 +73,28 @@ class UserService:
             page=page,
             page_size=page_size,
         )
+        return rows, total, next_cursor_for(rows, USER_LIST_KEYS, page_size)
 
     # =================================================
     # Update
     # =================================================
     def update_full_name(self, db: Session, *, user: User, full_name: str) -> User:
+        invalidate_principal(db, user)
         return self.repo.update_name(db, user, full_name)
 
     def set_active(self, db: Session, *, user: User, active: bool) -> User:
+        invalidate_principal(db, user)
         return self.repo.set_active(db, user, active)
 
     def change_password(self, db: Session, *, user: User, current_password: str, new_password: str) -> None:
-        if not verify_password(current_password, user.password_hash):
+        # `user` viene de la sesión async de autenticación: se recarga en esta sesión para persistir el cambio
+        db_user = self.repo.get_by_id(db, user.id)
+        if not db_user:
+            raise EntityNotFoundError("User", "id", user.id)
+        if not verify_password(current_password, db_user.password_hash):
             from fastapi import HTTPException, status
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid current password")
 
-        user.password_hash = get_password_hash(new_password)
+        invalidate_principal(db, db_user)
+        db_user.password_hash = get_password_hash(new_password)
         db.flush()  # commit lo hace el session_scope de get_db
@@ -1,4 +1,5 @@
 import os
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 
@@ -15,6 +16,27 @@ class Environment(BaseSettings):
     DB_USERNAME: str
     DB_PASSWORD: str
     DB_DATABASE: str
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_REPLICA_HOST: Optional[str] = None
+    DB_REPLICA_PORT: Optional[str] = None
+    DB_REPLICA_STICKY_SEC: int = 5
+    TENANT_CACHE_TTL_SEC: int = 60
+    PRINCIPAL_CACHE_TTL_SEC: int = 60
+    PRINCIPAL_CACHE_MAXSIZE: int = 10_000
+    TOTALS_CACHE_TTL_SEC: int = 30
+    TOTALS_ESTIMATE_MIN_ROWS: int = 10_000
+    DASHBOARD_TZ: str = "UTC"
+    LOOP_WATCHDOG_THRESHOLD_MS: int = 250  # 0 desactiva el watchdog del event loop
+    LOOP_WATCHDOG_INTERVAL_MS: int = 100
+    TRANSCRIBE_SNS_TOPIC_ARNS: str = ""  # separados por coma; vacío = cualquier topic con firma válida
+    TRANSCRIBE_RECONCILER_INTERVAL_SEC: int = 120  # 0 desactiva el reconciliador
+    TRANSCRIBE_RECONCILER_GRACE_SEC: int = 300
+    TRANSCRIBE_RECONCILER_CONCURRENCY: int = 4
+    TRANSCRIBE_RECONCILER_MAX_AGE_SEC: int = 24 * 3600  # luego se consulta el job uno a uno; sin job -> failed
+    TRANSCRIPTION_STATUS_TTL_SEC: int = 10
     ALEMBIC_DATABASE_URL: str
     LOG_COLOR: str
     LOG_LEVEL: str
@@ -23,8 +45,26 @@ class Environment(BaseSettings):
     AWS_REGION: str
     S3_BUCKET_AUDIO: str
     AWS_PROFILE: str
+    AWS_MAX_POOL_CONNECTIONS: int = 50
+    AWS_CONNECT_TIMEOUT_SEC: int = 5
+    AWS_READ_TIMEOUT_SEC: int = 30
+    AWS_RETRY_MODE: str = "adaptive"  # legacy | standard | adaptive
+    AWS_MAX_ATTEMPTS: int = 5
+    STORAGE_PRESIGN_BATCH_MAX: int = 100
+    STORAGE_MULTIPART_PART_SIZE_MB: int = 8  # S3: mínimo 5 MiB por parte (salvo la última)
+    STORAGE_PROXY_MAX_MB: int = 2048  # tope de la subida vía proxy (PUT /storage/upload)
+    DOCUMENT_GENERATION_MODE: str = "async"  # async (202 + job) | sync (201 + documento)
+    DOCUMENT_JOB_WORKERS: int = 4
+    DOCUMENT_JOB_STALE_SEC: int = 600  # un job `running` sin avances se considera abandonado
+    DOCUMENT_JOB_SWEEP_SEC: int = 60  # cada cuánto se buscan jobs pendientes en la DB (0 = solo al arrancar)
     GEMINI_API_KEY: str
     GEMINI_MODEL: str
+    GEMINI_TIMEOUT_SEC: int = 60
+    GEMINI_MAX_CONNECTIONS: int = 20
+    GEMINI_RETRY_ATTEMPTS: int = 3
+    LLM_CACHE_TTL_SEC: int = 7 * 24 * 3600  # 0 desactiva el cache de respuestas del LLM
+    LLM_CACHE_MAX_ROWS: int = 50_000
+    LLM_CACHE_MEMORY_MAXSIZE: int = 256
 
 
     class Config:
@@ -0,0 +1,105 @@
+import logging
+import threading
+from functools import lru_cache
+from typing import Dict, Iterable, Optional
+
+import boto3
+from botocore.client import BaseClient
+from botocore.config import Config
+from botocore.exceptions import ClientError, NoCredentialsError, TokenRetrievalError
+
+from src.utils.metrics import metrics_registry
+
+log = logging.getLogger(__name__)
+
+# Códigos de AWS que indican credenciales caducadas/revocadas (hay que re-resolverlas)
+_EXPIRED_CREDENTIAL_CODES = {"ExpiredToken", "ExpiredTokenException", "RequestExpired", "InvalidClientTokenId"}
+
+
+def is_credential_error(error: Exception) -> bool:
+    if isinstance(error, (NoCredentialsError, TokenRetrievalError)):
+        return True
+    if isinstance(error, ClientError):
+        return error.response.get("Error", {}).get("Code") in _EXPIRED_CREDENTIAL_CODES
+    return False
+
+
+class AwsClientRegistry:
+    """
+    Clientes boto3 de larga vida, uno por servicio y proceso.
+
+    Los clientes de botocore son thread-safe una vez creados y mantienen su pool
+    HTTP (keep-alive) entre requests; lo que no es thread-safe es crearlos, por eso
+    la creación va bajo lock. Credenciales refrescables (rol de ECS/EC2, SSO,
+    assume-role) se renuevan solas; `reset()` descarta sesión y clientes para
+    re-resolver las que no (perfil re-logueado, claves rotadas).
+    """
+
+    def __init__(self, *, region: str, profile: Optional[str], config: Config):
+        self.region = region
+        self.profile = profile
+        self.config = config
+        self._session: Optional[boto3.session.Session] = None
+        self._clients: Dict[str, BaseClient] = {}
+        self._lock = threading.Lock()
+        self._created = 0
+        self._resets = 0
+        metrics_registry.register("aws_clients", self.stats)
+
+    def client(self, service_name: str) -> BaseClient:
+        client = self._clients.get(service_name)
+        if client is not None:
+            return client
+        with self._lock:
+            client = self._clients.get(service_name)
+            if client is None:
+                if self._session is None:
+                    self._session = boto3.session.Session(profile_name=self.profile, region_name=self.region)
+                client = self._session.client(service_name, region_name=self.region, config=self.config)
+                self._clients[service_name] = client
+                self._created += 1
+            return client
+
+    def warm_up(self, service_names: Iterable[str]) -> None:
+        """Crea los clientes al arrancar; sin credenciales no impide el arranque."""
+        for name in service_names:
+            try:
+                self.client(name)
+            except Exception as e:
+                log.warning("No se pudo crear el cliente AWS '%s' al iniciar: %s", name, e)
+
+    def reset(self) -> None:
+        with self._lock:
+            clients, self._clients, self._session = self._clients, {}, None
+            self._resets += 1
+        for client in clients.values():
+            client.close()
+        log.info("Clientes AWS descartados; las credenciales se resolverán de nuevo.")
+
+    def close(self) -> None:
+        with self._lock:
+            clients, self._clients = self._clients, {}
+        for client in clients.values():
+            client.close()
+
+    def stats(self) -> dict:
+        return {
+            "clients": sorted(self._clients),
+            "created": self._created,
+            "resets": self._resets,
+            "max_pool_connections": self.config.max_pool_connections,
+        }
+
+
+@lru_cache(maxsize=None)
+def get_aws_clients() -> AwsClientRegistry:
+    """Registro compartido del proceso (app.state.aws, servicios de S3/Transcribe)."""
+    from src.core.config.config import env
+
+    config = Config(
+        max_pool_connections=env.AWS_MAX_POOL_CONNECTIONS,
+        connect_timeout=env.AWS_CONNECT_TIMEOUT_SEC,
+        read_timeout=env.AWS_READ_TIMEOUT_SEC,
+        retries={"mode": env.AWS_RETRY_MODE, "total_max_attempts": env.AWS_MAX_ATTEMPTS},
+    )
+    return AwsClientRegistry(region=env.AWS_REGION, profile=env.AWS_PROFILE or None, config=config)
@@ -1,34 +1,167 @@
 import os
-from typing import Iterator
-from contextlib import contextmanager
+import threading
+import time
+from functools import lru_cache
+from typing import Iterator, AsyncIterator, Dict
+from contextlib import contextmanager, asynccontextmanager
 
 from sqlalchemy.engine import URL
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.orm import sessionmaker, Session, declarative_base
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from dotenv import load_dotenv
 
+from src.utils.metrics import Histogram, metrics_registry
+
 Base = declarative_base()
 load_dotenv()
 
+# Extensiones de las que dependen índices de los modelos (trigramas + GIN compuesto con tenant_id)
+REQUIRED_EXTENSIONS = ("pg_trgm", "btree_gin")
+
+
+def _database_url(drivername: str, *, host: str | None = None, port: str | None = None) -> URL:
+    return URL.create(
+        drivername,
+        host=host or os.getenv("DB_HOST"),
+        port=port or os.getenv("DB_PORT"),
+        username=os.getenv("DB_USERNAME"),
+        password=os.getenv("DB_PASSWORD"),
+        database=os.getenv("DB_DATABASE"),
+    )
+
+
+# -------------------------------------------------------------------
+# Instrumentación del pool
+# -------------------------------------------------------------------
+# Buckets en ms del tiempo que una conexión pasa fuera del pool
+HELD_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+class PoolMetrics:
+    """Latencia de checkout, tiempo de espera acumulado y tiempo de retención de un pool."""
+
+    def __init__(self):
+        self.checkout_ms = Histogram()
+        self.held_ms = Histogram(HELD_BUCKETS_MS)
+        self._wait_ms_total = 0.0
+        self._timeouts = 0
+        self._lock = threading.Lock()
+
+    def observe_checkout(self, elapsed_ms: float, timed_out: bool = False) -> None:
+        self.checkout_ms.observe(elapsed_ms)
+        with self._lock:
+            self._wait_ms_total += elapsed_ms
+            if timed_out:
+                self._timeouts += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            wait_ms_total, timeouts = self._wait_ms_total, self._timeouts
+        return {
+            "wait_ms_total": round(wait_ms_total, 3),
+            "timeouts": timeouts,
+            "checkout_latency_ms": self.checkout_ms.snapshot(),
+            "held_ms": self.held_ms.snapshot(),
+        }
+
+
+# Indexado por `pool_logging_name`, que sobrevive a `pool.recreate()`
+_pool_metrics: Dict[str, PoolMetrics] = {}
+
+
+class _InstrumentedPoolMixin:
+    def _do_get(self):
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            record = super()._do_get()
+            record.info["checked_out_at"] = time.perf_counter()
+            return record
+        except PoolTimeoutError:
+            timed_out = True
+            raise
+        finally:
+            metrics = _pool_metrics.get(self._orig_logging_name)
+            if metrics is not None:
+                metrics.observe_checkout((time.perf_counter() - start) * 1000, timed_out)
+
+    def _do_return_conn(self, record):
+        # Cuánto tiempo estuvo la conexión fuera del pool (debería seguir al trabajo en la BD)
+        checked_out_at = record.info.pop("checked_out_at", None)
+        metrics = _pool_metrics.get(self._orig_logging_name)
+        if checked_out_at is not None and metrics is not None:
+            metrics.held_ms.observe((time.perf_counter() - checked_out_at) * 1000)
+        super()._do_return_conn(record)
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def _pool_snapshot(pool, metrics: PoolMetrics, *, pool_size: int, max_overflow: int) -> dict:
+    return {
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "max_connections": pool_size + max_overflow,
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        **metrics.snapshot(),
+    }
+
+
+@contextmanager
+def released_connection(db: Session) -> Iterator[Session]:
+    """
+    Para llamadas externas largas (LLM, AWS) en medio de una request: confirma la
+    transacción en curso y devuelve la conexión al pool durante el bloque. La
+    siguiente consulta toma otra conexión; con expire_on_commit=False los objetos
+    ya cargados siguen usables sin volver a la BD.
+    """
+    db.commit()
+    yield db
+
+
+async def release_async_connection(db: AsyncSession) -> None:
+    """Devuelve al pool la conexión de una AsyncSession; la próxima consulta tomará otra."""
+    await db.commit()
+
 
 class DataAccessLayer:
     """Administra engine y session factory."""
 
-    def __init__(self):
-        sql_database_url: URL = URL.create(
-            'postgresql+psycopg2',
-            host=os.getenv("DB_HOST"),
-            port=os.getenv("DB_PORT"),
-            username=os.getenv("DB_USERNAME"),
-            password=os.getenv("DB_PASSWORD"),
-            database=os.getenv("DB_DATABASE"),
-        )
+    def __init__(
+            self,
+            *,
+            pool_size: int = 10,
+            max_overflow: int = 10,
+            pool_timeout: int = 30,
+            pool_recycle: int = 1800,
+            name: str = "primary",
+    ):
+        sql_database_url: URL = _database_url('postgresql+psycopg2')
+
+        self.name = name
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.metrics = _pool_metrics.setdefault(name, PoolMetrics())
 
         self.engine = create_engine(
             sql_database_url,
+            poolclass=InstrumentedQueuePool,
+            pool_logging_name=name,
             pool_pre_ping=True,
-            pool_size=30,
-            max_overflow=20,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=pool_timeout,
+            pool_recycle=pool_recycle,
         )
 
         self.session_factory = sessionmaker(
@@ -50,7 +183,18 @@ class DataAccessLayer:
         finally:
             db.close()
 
+    def pool_stats(self) -> dict:
+        return {
+            self.name: _pool_snapshot(
+                self.engine.pool, self.metrics,
+                pool_size=self.pool_size, max_overflow=self.max_overflow,
+            )
+        }
+
     def create_tables(self) -> None:
+        with self.engine.begin() as conn:
+            for extension in REQUIRED_EXTENSIONS:
+                conn.execute(text(f"CREATE EXTENSION IF NOT EXISTS {extension}"))
         Base.metadata.create_all(self.engine)
 
     def close_session(self) -> None:
@@ -58,3 +202,169 @@ class DataAccessLayer:
             self.engine.dispose(close=True)
         except Exception:
             pass
+
+
+class AsyncDataAccessLayer:
+    """
+    Engine y session factory asíncronos (asyncpg).
+    Las rutas `async def` lo usan para no ocupar un hilo del threadpool
+    mientras Postgres responde.
+
+    Si se indica `replica_url`, crea un segundo engine para lecturas
+    (`read_session_scope`) contra la réplica.
+    """
+
+    def __init__(
+            self,
+            *,
+            pool_size: int = 10,
+            max_overflow: int = 10,
+            pool_timeout: int = 30,
+            pool_recycle: int = 1800,
+            name: str = "primary_async",
+            replica_url: URL | None = None,
+    ):
+        sql_database_url: URL = _database_url('postgresql+asyncpg')
+
+        self.name = name
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.metrics = _pool_metrics.setdefault(name, PoolMetrics())
+
+        pool_kwargs = dict(
+            poolclass=InstrumentedAsyncQueuePool,
+            pool_pre_ping=True,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=pool_timeout,
+            pool_recycle=pool_recycle,
+        )
+
+        self.engine = create_async_engine(sql_database_url, pool_logging_name=name, **pool_kwargs)
+
+        self.session_factory = async_sessionmaker(
+            autoflush=False,
+            bind=self.engine,
+            expire_on_commit=False,
+        )
+
+        self.replica_name = f"{name}_replica"
+        self.replica_engine = None
+        self.replica_session_factory = None
+        if replica_url is not None:
+            self.replica_metrics = _pool_metrics.setdefault(self.replica_name, PoolMetrics())
+            self.replica_engine = create_async_engine(
+                replica_url, pool_logging_name=self.replica_name, **pool_kwargs
+            )
+            self.replica_session_factory = async_sessionmaker(
+                autoflush=False,
+                bind=self.replica_engine,
+                expire_on_commit=False,
+            )
+
+    @property
+    def has_replica(self) -> bool:
+        return self.replica_session_factory is not None
+
+    @asynccontextmanager
+    async def session_scope(self) -> AsyncIterator[AsyncSession]:
+        db = self.session_factory()
+        try:
+            yield db
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+        finally:
+            await db.close()
+
+    @asynccontextmanager
+    async def read_session_scope(self) -> AsyncIterator[AsyncSession]:
+        """Sesión de solo lectura contra la réplica (o el primario si no hay réplica)."""
+        if not self.has_replica:
+            async with self.session_scope() as db:
+                yield db
+            return
+
+        db = self.replica_session_factory()
+        try:
+            yield db
+        finally:
+            # Nada que confirmar: close() hace rollback y devuelve la conexión
+            await db.close()
+
+    def pool_stats(self) -> dict:
+        stats = {
+            self.name: _pool_snapshot(
+                self.engine.sync_engine.pool, self.metrics,
+                pool_size=self.pool_size, max_overflow=self.max_overflow,
+            )
+        }
+        if self.replica_engine is not None:
+            stats[self.replica_name] = _pool_snapshot(
+                self.replica_engine.sync_engine.pool, self.replica_metrics,
+                pool_size=self.pool_size, max_overflow=self.max_overflow,
+            )
+        return stats
+
+    async def close_session(self) -> None:
+        try:
+            await self.engine.dispose(close=True)
+            if self.replica_engine is not None:
+                await self.replica_engine.dispose(close=True)
+        except Exception:
+            pass
+
+
+# -------------------------------------------------------------------
+# Un único dueño de pools por proceso
+# -------------------------------------------------------------------
+def _pool_settings() -> dict:
+    from src.core.config.config import env
+
+    return {
+        "pool_size": env.DB_POOL_SIZE,
+        "max_overflow": env.DB_MAX_OVERFLOW,
+        "pool_timeout": env.DB_POOL_TIMEOUT,
+        "pool_recycle": env.DB_POOL_RECYCLE,
+    }
+
+
+@lru_cache(maxsize=None)
+def get_data_access_layer() -> DataAccessLayer:
+    """DataAccessLayer compartido del proceso (app.state.db, get_db, tareas de fondo)."""
+    return DataAccessLayer(**_pool_settings())
+
+
+@lru_cache(maxsize=None)
+def get_async_data_access_layer() -> AsyncDataAccessLayer:
+    """AsyncDataAccessLayer compartido del proceso (app.state.async_db, get_async_db, get_read_db)."""
+    from src.core.config.config import env
+
+    replica_url = None
+    if env.DB_REPLICA_HOST:
+        replica_url = _database_url(
+            'postgresql+asyncpg', host=env.DB_REPLICA_HOST, port=env.DB_REPLICA_PORT
+        )
+    return AsyncDataAccessLayer(replica_url=replica_url, **_pool_settings())
+
+
+def database_pool_stats() -> dict:
+    """
+    Estado de los pools del proceso. `max_connections_per_worker` (solo primario) es la suma
+    que hay que multiplicar por el número de workers para dimensionar `max_connections` en Postgres.
+    """
+    pools = {}
+    if get_data_access_layer.cache_info().currsize:
+        pools.update(get_data_access_layer().pool_stats())
+    if get_async_data_access_layer.cache_info().currsize:
+        pools.update(get_async_data_access_layer().pool_stats())
+    return {
+        "pools": pools,
+        "max_connections_per_worker": sum(
+            p["max_connections"] for name, p in pools.items() if not name.endswith("_replica")
+        ),
+    }
+
+
+metrics_registry.register("database", database_pool_stats)
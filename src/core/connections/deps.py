@@ -1,19 +1,92 @@
-from typing import Generator
-from fastapi import Depends, Header, HTTPException, status
+import threading
+from dataclasses import dataclass
+from typing import Generator, AsyncGenerator, Optional, Tuple
+from cachetools import TTLCache
+from fastapi import Depends, Header, HTTPException, Request, status
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.core.connections.database import DataAccessLayer
-from src.apps.tenant.repository import TenantRepository
-from src.apps.users.repository import UserRepository
+from src.core.config.config import env
+from src.core.connections.database import (
+    get_data_access_layer, get_async_data_access_layer, release_async_connection
+)
+from src.apps.tenant.repository import AsyncTenantRepository
+from src.apps.auth.repository import AsyncAuthRepository
+from src.apps.tenant.cache import TenantSnapshot, tenant_cache
+from src.apps.users.cache import Principal, principal_cache, principal_key
 from src.core.middlewares.security import decode_token
 from fastapi.security import OAuth2PasswordBearer
 
-_dal = DataAccessLayer()
-_oauth2 = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")  # url del login
+_oauth2 = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login", auto_error=False)  # url del login
 
+_SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
 
-def get_db() -> Generator[Session, None, None]:
-    with _dal.session_scope() as db:
+# Usuarios (tenant_id, user_id) que escribieron hace menos de DB_REPLICA_STICKY_SEC:
+# sus lecturas van al primario para que vean sus propios cambios (read-your-writes).
+_recent_writers: TTLCache = TTLCache(maxsize=10_000, ttl=env.DB_REPLICA_STICKY_SEC)
+_recent_writers_lock = threading.Lock()
+
+
+def _principal_key(request: Request) -> Optional[Tuple[str, str]]:
+    """(tenant_id, user_id) del bearer token, sin tocar la BD. None si no hay token válido."""
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        payload = decode_token(token)
+    except Exception:
+        return None
+    if not payload.get("sub") or not payload.get("tenant_id"):
+        return None
+    return str(payload["tenant_id"]), str(payload["sub"])
+
+
+def _remember_write(request: Request) -> None:
+    key = _principal_key(request)
+    if key is not None:
+        with _recent_writers_lock:
+            _recent_writers[key] = True
+
+
+def _recently_wrote(request: Request) -> bool:
+    key = _principal_key(request)
+    if key is None:
+        return False
+    with _recent_writers_lock:
+        return key in _recent_writers
+
+
+def get_db(request: Request) -> Generator[Session, None, None]:
+    """
+    Session síncrona de la request. Toma conexión del pool en la primera consulta
+    (no al abrirse); antes de llamadas externas largas usar `released_connection`.
+    """
+    with get_data_access_layer().session_scope() as db:
+        yield db
+    # Solo se llega aquí si el commit fue exitoso
+    if request.method not in _SAFE_METHODS:
+        _remember_write(request)
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with get_async_data_access_layer().session_scope() as db:
+        yield db
+
+
+async def get_read_db(
+        request: Request,
+        primary: AsyncSession = Depends(get_async_db),
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Sesión para rutas de solo lectura: usa la réplica si está configurada, salvo que el
+    usuario haya escrito recientemente, en cuyo caso reutiliza la sesión del primario.
+    """
+    dal = get_async_data_access_layer()
+    if not dal.has_replica or _recently_wrote(request):
+        yield primary
+        return
+
+    async with dal.read_session_scope() as db:
         yield db
 
 
@@ -23,18 +96,48 @@ def get_tenant_code(x_tenant_code: str = Header(alias="X-Tenant-Code")) -> str:
     return x_tenant_code
 
 
-def get_current_tenant(db: Session = Depends(get_db), tenant_code: str = Depends(get_tenant_code)):
-    t = TenantRepository().get_by_code(db, tenant_code)
+@dataclass(frozen=True)
+class AuthContext:
+    tenant: TenantSnapshot
+    user: Principal
+
+
+def _raise_tenant_not_found():
+    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tenant not found or inactive")
+
+
+async def get_public_tenant(
+        db: AsyncSession = Depends(get_async_db),
+        tenant_code: str = Depends(get_tenant_code),
+) -> TenantSnapshot:
+    """Tenant del header sin exigir autenticación (p.ej. login)."""
+    t = tenant_cache.get(tenant_code)
+    if t is None:
+        version = tenant_cache.version(tenant_code)
+        row = await AsyncTenantRepository.get_by_code(db, tenant_code)
+        await release_async_connection(db)
+        if row:
+            t = TenantSnapshot.from_model(row)
+            tenant_cache.set(tenant_code, t, version)
+
     if not t or not t.is_active:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tenant not found or inactive")
+        _raise_tenant_not_found()
     return t
 
 
-def get_current_user(
-        db: Session = Depends(get_db),
-        token: str = Depends(_oauth2),
-        tenant=Depends(get_current_tenant),
-):
+async def get_auth_context(
+        db: AsyncSession = Depends(get_async_db),
+        tenant_code: str = Depends(get_tenant_code),
+        token: Optional[str] = Depends(_oauth2),
+) -> Optional[AuthContext]:
+    """
+    Resuelve tenant y usuario del request. Con ambos en cache no toca la BD; si falta
+    cualquiera de los dos, una sola consulta (tenant JOIN usuario) valida el code del
+    header, el tenant_id del token y el estado del usuario. None si no hay bearer token.
+    """
+    if not token:
+        return None
+
     try:
         payload = decode_token(token)
         user_id = payload.get("sub")
@@ -45,11 +148,52 @@ def get_current_user(
     if not user_id or not token_tenant_id:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Malformed token")
 
-    # El usuario debe existir y pertenecer al mismo tenant del header
-    u = UserRepository.get_by_id(db, user_id)
-    if not u or str(u.tenant_id) != str(token_tenant_id) or str(tenant.id) != str(token_tenant_id):
+    key = principal_key(user_id, token_tenant_id)
+    t = tenant_cache.get(tenant_code)
+    u = principal_cache.get(key)
+
+    if t is None or u is None:
+        tenant_version = tenant_cache.version(tenant_code)
+        user_version = principal_cache.version(key)
+        tenant_row, user_row = await AsyncAuthRepository.get_tenant_and_user(db, tenant_code, user_id)
+        # La conexión no se retiene durante el resto de la request (rutas síncronas, LLM, AWS)
+        await release_async_connection(db)
+
+        t = TenantSnapshot.from_model(tenant_row) if tenant_row else None
+        if t:
+            tenant_cache.set(tenant_code, t, tenant_version)
+        # El join ya garantiza que el usuario pertenece al tenant del header
+        u = Principal.from_model(user_row) if user_row else None
+        if u and str(u.tenant_id) == str(token_tenant_id):
+            principal_cache.set(key, u, user_version)
+
+    if not t or not t.is_active:
+        _raise_tenant_not_found()
+
+    # El token debe corresponder al tenant del header y el usuario pertenecer a él
+    if str(t.id) != str(token_tenant_id) or not u or str(u.tenant_id) != str(token_tenant_id):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid tenant context")
 
     if not u.is_active:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User inactive")
-    return u
+    return AuthContext(tenant=t, user=u)
+
+
+async def get_current_tenant(
+        db: AsyncSession = Depends(get_async_db),
+        tenant_code: str = Depends(get_tenant_code),
+        ctx: Optional[AuthContext] = Depends(get_auth_context),
+) -> TenantSnapshot:
+    if ctx is not None:
+        return ctx.tenant
+    return await get_public_tenant(db, tenant_code)
+
+
+async def get_current_user(ctx: Optional[AuthContext] = Depends(get_auth_context)) -> Principal:
+    if ctx is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return ctx.user
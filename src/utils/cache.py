@@ -0,0 +1,136 @@
+import threading
+from typing import Any, Callable, Dict, Generic, Hashable, Optional, TypeVar
+
+from cachetools import LRUCache, TTLCache
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from src.utils.metrics import metrics_registry
+
+V = TypeVar("V")
+
+
+class SnapshotCache(Generic[V]):
+    """
+    Cache TTL/LRU local al proceso para snapshots inmutables.
+
+    Versionado por clave: quien carga desde la BD pide `version(key)` antes de la
+    consulta y guarda con `set(key, value, version)`. Si entre medias hubo un
+    `invalidate(key)`, la versión cambió y el valor (potencialmente viejo) se descarta.
+    """
+
+    def __init__(self, name: str, *, maxsize: int, ttl: float):
+        self.name = name
+        self._entries: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._versions: LRUCache = LRUCache(maxsize=maxsize * 4)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+        metrics_registry.register(f"cache.{name}", self.stats)
+
+    def get(self, key: Hashable) -> Optional[V]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+            return value
+
+    def version(self, key: Hashable) -> int:
+        with self._lock:
+            return self._versions.get(key, 0)
+
+    def set(self, key: Hashable, value: V, version: int) -> None:
+        with self._lock:
+            if self._versions.get(key, 0) == version:
+                self._entries[key] = value
+
+    def invalidate(self, *keys: Hashable) -> None:
+        with self._lock:
+            for key in keys:
+                self._versions[key] = self._versions.get(key, 0) + 1
+                self._entries.pop(key, None)
+                self._invalidations += 1
+
+    def invalidate_on_commit(self, db: Session, *keys: Hashable) -> None:
+        """
+        Invalida ya y otra vez al confirmar la transacción de `db`, para que una lectura
+        concurrente que vio la fila antes del commit no deje el valor viejo en cache.
+        """
+        self.invalidate(*keys)
+        event.listen(db, "after_commit", lambda _session: self.invalidate(*keys), once=True)
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in list(self._entries.keys()):
+                self._versions[key] = self._versions.get(key, 0) + 1
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self._entries.maxsize,
+                "ttl": self._entries.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "invalidations": self._invalidations,
+            }
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Coalescencia de llamadas concurrentes por clave (entre hilos del threadpool):
+    mientras una llamada está en curso, las demás con la misma clave esperan su
+    resultado en lugar de repetirla.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self._calls_made = 0
+        self._coalesced = 0
+        metrics_registry.register(f"singleflight.{name}", self.stats)
+
+    def do(self, key: Hashable, fn: Callable[[], V]) -> V:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._calls_made += 1
+            else:
+                self._coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"in_flight": len(self._calls), "calls": self._calls_made, "coalesced": self._coalesced}
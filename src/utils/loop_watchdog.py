@@ -0,0 +1,108 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from typing import Optional
+
+from src.utils.metrics import Histogram, metrics_registry
+
+log = logging.getLogger("app.loop_watchdog")
+
+# Buckets de lag en milisegundos (un loop sano está en 0-5 ms)
+LAG_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+def _route_of(frame) -> Optional[str]:
+    """Busca en la pila el `scope` ASGI de la request en curso (starlette lo tiene como local)."""
+    while frame is not None:
+        scope = frame.f_locals.get("scope")
+        if scope is None:
+            request = frame.f_locals.get("request")
+            scope = getattr(request, "scope", None)
+        if isinstance(scope, dict) and scope.get("type") == "http":
+            return f"{scope.get('method')} {scope.get('path')}"
+        frame = frame.f_back
+    return None
+
+
+class LoopWatchdog:
+    """
+    Mide el lag del event loop y detecta bloqueos.
+
+    Una tarea del loop se despierta cada `interval_ms` y anota cuánto tarde llegó
+    (lag). Un hilo aparte vigila ese latido: si el loop lleva más de `threshold_ms`
+    sin latir, está bloqueado por código síncrono, y el hilo registra la ruta y la
+    pila del hilo del loop en ese momento (que apunta al culpable).
+    """
+
+    def __init__(self, *, threshold_ms: float, interval_ms: float = 100):
+        self.threshold = threshold_ms / 1000
+        self.interval = interval_ms / 1000
+        self.lag = Histogram(LAG_BUCKETS_MS)
+        self._max_lag_ms = 0.0
+        self._stalls = 0
+        self._last_beat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        metrics_registry.register("event_loop", self.stats)
+
+    def start(self) -> None:
+        """Llamar desde el loop (startup)."""
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._ticker())
+        self._thread = threading.Thread(target=self._monitor, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._thread:
+            self._thread.join(timeout=self.interval * 2)
+
+    async def _ticker(self) -> None:
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag_ms = max(0.0, (now - start - self.interval) * 1000)
+            self.lag.observe(lag_ms)
+            self._max_lag_ms = max(self._max_lag_ms, lag_ms)
+            self._last_beat = now
+
+    def _monitor(self) -> None:
+        reported_beat = None
+        while not self._stop.wait(self.interval / 2):
+            beat = self._last_beat
+            blocked = time.monotonic() - beat
+            # Un aviso por bloqueo (mismo latido), no uno por vuelta del monitor
+            if blocked < self.threshold or beat == reported_beat:
+                continue
+            reported_beat = beat
+            self._stalls += 1
+
+            frame = sys._current_frames().get(self._loop_thread_id)
+            route = _route_of(frame) if frame is not None else None
+            stack = "".join(traceback.format_stack(frame)) if frame is not None else "<sin pila>"
+            log.warning(
+                "Event loop bloqueado %.0f ms (umbral %.0f ms) en %s\n%s",
+                blocked * 1000, self.threshold * 1000, route or "<fuera de una request>", stack,
+            )
+
+    def stats(self) -> dict:
+        return {
+            "threshold_ms": self.threshold * 1000,
+            "max_lag_ms": round(self._max_lag_ms, 3),
+            "stalls": self._stalls,
+            "lag_ms": self.lag.snapshot(),
+        }
@@ -0,0 +1,66 @@
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, Sequence
+
+# Buckets por defecto en milisegundos (latencias de BD, AWS, LLM...)
+DEFAULT_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Histogram:
+    """
+    Histograma acumulativo thread-safe (estilo Prometheus, en memoria del proceso).
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS_MS):
+        self._buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self._buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        idx = bisect_left(self._buckets, value)
+        with self._lock:
+            self._counts[idx] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self._sum, self._count
+
+        cumulative, buckets = 0, {}
+        for bound, c in zip(self._buckets, counts):
+            cumulative += c
+            buckets[f"le_{bound:g}"] = cumulative
+        buckets["le_inf"] = count
+        return {
+            "count": count,
+            "sum": round(total, 3),
+            "avg": round(total / count, 3) if count else 0.0,
+            "buckets": buckets,
+        }
+
+
+class MetricsRegistry:
+    """
+    Registro de proveedores de métricas del proceso.
+    Cada proveedor es un callable sin argumentos que devuelve un dict serializable.
+    """
+
+    def __init__(self):
+        self._providers: Dict[str, Callable[[], dict]] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, provider: Callable[[], dict]) -> None:
+        with self._lock:
+            self._providers[name] = provider
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            providers = dict(self._providers)
+        return {name: provider() for name, provider in providers.items()}
+
+
+metrics_registry = MetricsRegistry()
@@ -0,0 +1,105 @@
+import base64
+import binascii
+import json
+import uuid
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple, Union
+
+from fastapi import Response
+from sqlalchemy import Select, tuple_
+from sqlalchemy.orm import InstrumentedAttribute
+
+from src.core.errors.errors import BadRequestError
+from src.utils.totals import TotalCount, set_total_headers
+
+
+# -------------------------------------------------------------------
+# Cursor opaco: base64(json) con los valores de la clave de orden del último ítem
+# -------------------------------------------------------------------
+def encode_cursor(values: Sequence[Any]) -> str:
+    tagged = []
+    for v in values:
+        if isinstance(v, datetime):
+            tagged.append(["dt", v.isoformat()])
+        elif isinstance(v, uuid.UUID):
+            tagged.append(["uuid", str(v)])
+        else:
+            tagged.append(["v", v])
+    raw = json.dumps(tagged, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        tagged = json.loads(raw)
+        if not isinstance(tagged, list) or len(tagged) != size:
+            raise ValueError("cursor size mismatch")
+        values = []
+        for tag, v in tagged:
+            if tag == "dt":
+                values.append(datetime.fromisoformat(v))
+            elif tag == "uuid":
+                values.append(uuid.UUID(v))
+            else:
+                values.append(v)
+        return values
+    except (ValueError, TypeError, binascii.Error):
+        raise BadRequestError("Invalid cursor.")
+
+
+# -------------------------------------------------------------------
+# Keyset
+# -------------------------------------------------------------------
+def apply_keyset(
+        stmt: Select,
+        keys: Sequence[InstrumentedAttribute],
+        *,
+        cursor: Optional[str],
+        page_size: int,
+        descending: bool,
+) -> Select:
+    """
+    Ordena por `keys` y, si hay cursor, continúa estrictamente después del último ítem
+    con una comparación de fila `(k1, k2) < (:v1, :v2)` que el índice puede recorrer.
+    Pide `page_size + 1` filas para saber si hay una página siguiente.
+    """
+    if cursor:
+        values = decode_cursor(cursor, len(keys))
+        position = tuple_(*keys)
+        stmt = stmt.where(position < tuple_(*values) if descending else position > tuple_(*values))
+
+    order_by = [k.desc() if descending else k.asc() for k in keys]
+    return stmt.order_by(*order_by).limit(page_size + 1)
+
+
+def split_page(
+        rows: Sequence[Any], keys: Sequence[InstrumentedAttribute], page_size: int
+) -> Tuple[Sequence[Any], Optional[str]]:
+    """Recorta la fila extra de `apply_keyset` y genera el cursor de la siguiente página."""
+    if len(rows) <= page_size:
+        return rows, None
+    page = rows[:page_size]
+    last = page[-1]
+    return page, encode_cursor([getattr(last, k.key) for k in keys])
+
+
+def next_cursor_for(
+        rows: Sequence[Any], keys: Sequence[InstrumentedAttribute], page_size: int
+) -> Optional[str]:
+    """Cursor a partir de una página OFFSET completa (permite pasar de page a cursor)."""
+    if len(rows) < page_size or not rows:
+        return None
+    return encode_cursor([getattr(rows[-1], k.key) for k in keys])
+
+
+def set_page_headers(
+        response: Response, total: Optional[Union[int, TotalCount]], next_cursor: Optional[str]
+) -> None:
+    """Headers de paginación: X-Total-Count solo si se calculó, X-Next-Cursor si hay más."""
+    if isinstance(total, TotalCount):
+        set_total_headers(response, total)
+    elif total is not None:
+        response.headers["X-Total-Count"] = str(total)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
@@ -0,0 +1,29 @@
+from sqlalchemy import cast, func, literal
+from sqlalchemy.dialects.postgresql import REGCONFIG
+
+# Configuración de texto completo de Postgres (stemming y stopwords en español)
+SEARCH_CONFIG = "spanish"
+
+# Fragmentos cortos para resultados: evita devolver el contenido completo
+HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxWords=30, MinWords=10, MaxFragments=2, FragmentDelimiter=\" … \""
+
+
+def tsvector_sql(*weighted_columns: tuple) -> str:
+    """
+    Expresión SQL (para `Computed`) de un tsvector ponderado:
+    tsvector_sql(("title", "A"), ("content", "B")).
+    """
+    parts = [
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce({column}, '')), '{weight}')"
+        for column, weight in weighted_columns
+    ]
+    return " || ".join(parts)
+
+
+def ts_query(q: str):
+    """Consulta estilo buscador web: palabras, "frases", OR y -exclusión."""
+    return func.websearch_to_tsquery(cast(literal(SEARCH_CONFIG), REGCONFIG), q)
+
+
+def ts_headline(column, query):
+    return func.ts_headline(cast(literal(SEARCH_CONFIG), REGCONFIG), column, query, HEADLINE_OPTIONS)
@@ -0,0 +1,140 @@
+import json
+import threading
+from typing import Any, Dict, Hashable, NamedTuple, Optional, Tuple
+
+from cachetools import TTLCache
+from fastapi import Response
+from sqlalchemy import Select, event, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.core.config.config import env
+from src.utils.metrics import metrics_registry
+
+# Modos aceptados por el query param `count` de los listados
+COUNT_MODES = "^(auto|exact|none)$"
+
+
+class TotalCount(NamedTuple):
+    value: int
+    exact: bool
+
+
+class CountCache:
+    """
+    Cache de totales exactos por (scope, tenant, filtros).
+
+    Cada (scope, tenant) tiene una generación; las escrituras la incrementan con
+    `invalidate_on_commit` y así caducan de golpe todos los filtros de ese tenant
+    sin tener que enumerarlos. El TTL acota lo que pueda escaparse (p.ej. escrituras
+    hechas desde otro proceso).
+    """
+
+    def __init__(self, name: str, *, maxsize: int, ttl: float):
+        self.name = name
+        self._entries: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._generations: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+        metrics_registry.register(f"cache.{name}", self.stats)
+
+    def generation(self, scope: str, tenant_id) -> int:
+        with self._lock:
+            return self._generations.get((scope, str(tenant_id)), 0)
+
+    def get(self, scope: str, tenant_id, filters: Hashable) -> Optional[int]:
+        with self._lock:
+            gen = self._generations.get((scope, str(tenant_id)), 0)
+            value = self._entries.get((scope, str(tenant_id), gen, filters))
+            if value is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+            return value
+
+    def set(self, scope: str, tenant_id, filters: Hashable, value: int, generation: int) -> None:
+        with self._lock:
+            # Si hubo escrituras mientras se contaba, el valor ya no vale
+            if self._generations.get((scope, str(tenant_id)), 0) == generation:
+                self._entries[(scope, str(tenant_id), generation, filters)] = value
+
+    def invalidate(self, scope: str, tenant_id) -> None:
+        with self._lock:
+            key = (scope, str(tenant_id))
+            self._generations[key] = self._generations.get(key, 0) + 1
+            self._invalidations += 1
+
+    def invalidate_on_commit(self, db: Session, scope: str, tenant_id) -> None:
+        """Invalida ya y otra vez al confirmar `db` (mismo criterio que SnapshotCache)."""
+        self.invalidate(scope, tenant_id)
+        event.listen(db, "after_commit", lambda _session: self.invalidate(scope, tenant_id), once=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self._entries.maxsize,
+                "ttl": self._entries.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "invalidations": self._invalidations,
+            }
+
+
+count_cache = CountCache("totals", maxsize=10_000, ttl=env.TOTALS_CACHE_TTL_SEC)
+
+
+async def _estimate(db: AsyncSession, stmt: Select) -> int:
+    """Filas estimadas por el planner (EXPLAIN, sin ejecutar la consulta)."""
+    conn = await db.connection()
+    sql = stmt.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True})
+    plan = (await db.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))).scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def _exact(db: AsyncSession, stmt: Select, scope: str, tenant_id, filters: Hashable) -> int:
+    cached = count_cache.get(scope, tenant_id, filters)
+    if cached is not None:
+        return cached
+    generation = count_cache.generation(scope, tenant_id)
+    total = (await db.execute(select(func.count()).select_from(stmt.subquery()))).scalar_one()
+    count_cache.set(scope, tenant_id, filters, total, generation)
+    return total
+
+
+async def resolve_total(
+        db: AsyncSession,
+        stmt: Select,
+        *,
+        scope: str,
+        tenant_id,
+        filters: Dict[str, Any],
+        mode: str = "auto",
+) -> Optional[TotalCount]:
+    """
+    Total para X-Total-Count según `mode`:
+      - none: no se cuenta.
+      - exact: count(*) exacto, cacheado por (scope, tenant, filtros).
+      - auto: sin filtros y con muchas filas, estimación del planner; si no, como exact.
+    """
+    if mode == "none":
+        return None
+
+    active = tuple(sorted((k, v) for k, v in filters.items() if v is not None and v != ""))
+    if mode == "auto" and not active and count_cache.get(scope, tenant_id, active) is None:
+        estimate = await _estimate(db, stmt)
+        if estimate >= env.TOTALS_ESTIMATE_MIN_ROWS:
+            return TotalCount(estimate, exact=False)
+
+    return TotalCount(await _exact(db, stmt, scope, tenant_id, active), exact=True)
+
+
+def set_total_headers(response: Response, total: Optional[TotalCount]) -> None:
+    if total is None:
+        return
+    response.headers["X-Total-Count"] = str(total.value)
+    response.headers["X-Total-Count-Type"] = "exact" if total.exact else "estimated"
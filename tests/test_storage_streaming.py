@@ -0,0 +1,110 @@
+import asyncio
+import hashlib
+import tracemalloc
+
+import pytest
+
+from src.apps.storage.services import StorageService
+from src.apps.storage.streaming import stream_to_s3
+
+MiB = 1024 * 1024
+PART_SIZE = 1 * MiB
+CHUNK_SIZE = 64 * 1024
+
+
+class StubS3:
+    """S3 local: solo cuenta y hashea las partes, no guarda su contenido."""
+
+    def __init__(self):
+        self.parts = {}
+        self.digest = hashlib.sha256()
+        self.completed = False
+        self.aborted = False
+
+    def create_multipart_upload(self, *, Bucket, Key, ContentType):
+        return {"UploadId": "upload-1"}
+
+    def upload_part(self, *, Bucket, Key, UploadId, PartNumber, Body):
+        self.parts[PartNumber] = len(Body)
+        self.digest.update(Body)
+        return {"ETag": f'"{PartNumber}"'}
+
+    def complete_multipart_upload(self, *, Bucket, Key, UploadId, MultipartUpload):
+        assert [p["PartNumber"] for p in MultipartUpload["Parts"]] == sorted(self.parts)
+        self.completed = True
+
+    def head_object(self, *, Bucket, Key):
+        return {"ContentLength": sum(self.parts.values()), "ContentType": "audio/webm"}
+
+    def abort_multipart_upload(self, *, Bucket, Key, UploadId):
+        self.aborted = True
+
+
+class StubClients:
+    region = "us-east-1"
+
+    def __init__(self, s3: StubS3):
+        self.s3 = s3
+
+    def client(self, service_name: str):
+        return self.s3
+
+
+async def body(total: int, *, fail_after: int | None = None):
+    """Genera el cuerpo al vuelo, como request.stream()."""
+    sent = 0
+    while sent < total:
+        if fail_after is not None and sent >= fail_after:
+            raise RuntimeError("client disconnected")
+        size = min(CHUNK_SIZE, total - sent)
+        yield bytes([sent // CHUNK_SIZE % 256]) * size
+        sent += size
+
+
+def upload(s3: StubS3, total: int, **body_kwargs):
+    svc = StorageService(bucket="test-bucket", clients=StubClients(s3))
+    return asyncio.run(stream_to_s3(
+        svc, body(total, **body_kwargs),
+        key="t/audio.webm", content_type="audio/webm", part_size=PART_SIZE, max_bytes=1024 * MiB,
+    ))
+
+
+def traced_peak(fn) -> int:
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_stream_to_s3_memory_stays_flat():
+    small, large = StubS3(), StubS3()
+    peak_small = traced_peak(lambda: upload(small, 8 * PART_SIZE + 123))
+    peak_large = traced_peak(lambda: upload(large, 32 * PART_SIZE + 123))
+
+    assert len(large.parts) == 33 and large.completed
+    # Un único buffer de parte (más un chunk), sin importar el tamaño del cuerpo
+    assert peak_large < 1.5 * PART_SIZE
+    assert peak_large < peak_small + PART_SIZE // 2
+
+
+def test_stream_to_s3_reports_size_and_checksum():
+    s3 = StubS3()
+    total = 3 * PART_SIZE + 10
+    result = upload(s3, total)
+
+    assert s3.completed and not s3.aborted
+    assert result.size_bytes == total
+    assert result.parts == 4
+    assert result.sha256 == s3.digest.hexdigest()
+
+
+def test_stream_to_s3_aborts_when_body_fails():
+    s3 = StubS3()
+    with pytest.raises(RuntimeError):
+        upload(s3, 8 * PART_SIZE, fail_after=2 * PART_SIZE + CHUNK_SIZE)
+
+    assert s3.aborted
+    assert not s3.completed
+    assert len(s3.parts) == 2